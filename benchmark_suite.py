@@ -0,0 +1,326 @@
+"""Benchmark suite for the numbers_in_words package, with saved results and regression checks.
+
+Every case converts a generated corpus (numbers of a number of digits or decimals, phrases of a number of words, or
+numbers that repeat with a given hit rate or a Zipf distribution) a number of times, and reports the time per item.
+Cases that depend on the caches are run both cold (the caches are cleared before every run) and warm (after a
+warm-up run). The stage cases time parsing, block rendering and joining on their own.
+
+Run the suite and save the results with:
+
+    python3 benchmark_suite.py --output results.json
+
+and compare a later run with those results, failing (exit status 1) if any case is more than 10% slower, with:
+
+    python3 benchmark_suite.py --baseline results.json --threshold 0.1
+
+Only the standard library is needed, and corpora are generated from fixed seeds, so runs can be compared offline.
+"""
+
+import argparse as ap
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numbers_in_words as niw
+import numbers_in_words._numbers_in_words_modules.string_processing as sp
+
+SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = 0.1
+
+_FILLER_WORDS = ("the", "pump", "is", "deep", "records", "we", "processed", "code", "balance", "away", "from", "us")
+
+
+class Case(NamedTuple):
+    name: str
+    corpus: Callable[[int], List[str]]  # generates a corpus of the given size
+    run: Callable[[Any], object]  # converts every item of the (prepared) corpus
+    cache: str = "cold"  # "cold" clears the caches before every run, "warm" runs once before timing
+    prepare: Callable[[List[str]], Any] = list  # prepares the corpus for run, without being timed
+
+
+class Result(NamedTuple):
+    name: str
+    items: int
+    repeats: int
+    median: float  # seconds per item, as are the rest
+    mean: float
+    minimum: float
+    stdev: float
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+    ratio: float
+    regressed: bool
+
+
+def digits_corpus(digits: int, size: int, seed: int = 0) -> List[str]:
+    """Numbers of exactly digits digits."""
+    rng = random.Random(seed)
+    return [str(rng.randrange(10 ** (digits - 1), 10 ** digits)) for _ in range(size)]
+
+
+def decimals_corpus(decimals: int, size: int, seed: int = 0) -> List[str]:
+    """Numbers with a 3-digit integer and decimals decimals."""
+    rng = random.Random(seed)
+    return [f"{rng.randrange(100, 1000)}.{rng.randrange(10 ** decimals):0{decimals}}" for _ in range(size)]
+
+
+def phrase_corpus(words: int, size: int, seed: int = 0) -> List[str]:
+    """Phrases of words words, one of which is a number."""
+    rng = random.Random(seed)
+    phrases = []
+    for _ in range(size):
+        phrase = [rng.choice(_FILLER_WORDS) for _ in range(words - 1)]
+        phrase.insert(rng.randrange(words), f"{rng.randrange(10**9):,}")
+        phrases.append(" ".join(phrase))
+    return phrases
+
+
+def hit_rate_corpus(hit_rate: float, size: int, seed: int = 0) -> List[str]:
+    """Numbers of which about hit_rate are repeats of a number that came before."""
+    rng = random.Random(seed)
+    corpus: List[str] = []
+    for _ in range(size):
+        if corpus and rng.random() < hit_rate:
+            corpus.append(rng.choice(corpus))
+        else:
+            corpus.append(str(rng.randrange(10**15)))
+    return corpus
+
+
+def zipf_corpus(exponent: float, size: int, distinct: int = 1000, seed: int = 0) -> List[str]:
+    """Numbers drawn from distinct numbers, where the k-th most common number is drawn in proportion to
+    1 / k^exponent."""
+    rng = random.Random(seed)
+    pool = [str(rng.randrange(10**15)) for _ in range(distinct)]
+    weights = [1 / k ** exponent for k in range(1, distinct + 1)]
+    return rng.choices(pool, weights=weights, k=size)
+
+
+def build_cases() -> List[Case]:
+    """Returns every case in the suite."""
+    cases = []
+    for digits in (1, 3, 6, 12, 20, 42):
+        corpus = _bind(digits_corpus, digits)
+        cases.append(Case(f"digits/{digits}/cold", corpus, _convert_all))
+        cases.append(Case(f"digits/{digits}/warm", corpus, _convert_all, "warm"))
+        cases.append(Case(f"digits/{digits}/table", corpus, _convert_all_from_table, "warm"))
+
+    for decimals in (2, 10, 100):
+        cases.append(Case(f"decimals/{decimals}/warm", _bind(decimals_corpus, decimals), _convert_all, "warm"))
+
+    for words in (5, 20, 100):
+        cases.append(Case(f"phrase/{words}/warm", _bind(phrase_corpus, words), _convert_all_phrases, "warm"))
+
+    for hit_rate in (0.0, 0.5, 0.9):
+        corpus = _bind(hit_rate_corpus, hit_rate)
+        cases.append(Case(f"hit_rate/{hit_rate}/numbers/cold", corpus, _convert_all_caching_numbers))
+        cases.append(Case(f"hit_rate/{hit_rate}/numbers/warm", corpus, _convert_all_caching_numbers, "warm"))
+
+    for exponent in (1.1, 1.5):
+        corpus = _bind(zipf_corpus, exponent)
+        cases.append(Case(f"zipf/{exponent}/numbers/cold", corpus, _convert_all_caching_numbers))
+        cases.append(Case(f"zipf/{exponent}/numbers/warm", corpus, _convert_all_caching_numbers, "warm"))
+
+    # The stages of converting a 20-digit number, on their own
+    corpus = _bind(digits_corpus, 20)
+    cases.append(Case("stage/parse", corpus, _parse_all))
+    cases.append(Case("stage/render/cold", corpus, _render_all, prepare=_zero_fill_all))
+    cases.append(Case("stage/render/warm", corpus, _render_all, "warm", _zero_fill_all))
+    cases.append(Case("stage/join", corpus, _join_all, prepare=_render_all_from_table))
+
+    return cases
+
+
+def run_suite(cases: Sequence[Case], size: int = 2000, repeats: int = 7, warmups: int = 1,
+              report: Optional[Callable[[Result], None]] = None) -> List[Result]:
+    """Runs every case, repeats times, on a corpus of size items, and returns the time per item of each.
+
+    Keyword arguments:
+        size    -- default 2000, the number of items in each corpus.
+        repeats -- default 7, the number of timed runs of each case.
+        warmups -- default 1, the number of untimed runs before the timed runs of a warm case.
+        report  -- default None, called with the result of each case as soon as it is known.
+    """
+    results = []
+    for case in cases:
+        corpus = case.prepare(case.corpus(size))
+        if case.cache == "warm":
+            for _ in range(warmups):
+                case.run(corpus)
+
+        times = []
+        for _ in range(repeats):
+            if case.cache == "cold":
+                _clear_caches()
+            times.append(_time(case.run, corpus) / size)
+
+        result = Result(
+            case.name, size, repeats, statistics.median(times), statistics.mean(times), min(times),
+            statistics.stdev(times) if repeats > 1 else 0.0)
+        results.append(result)
+        if report is not None:
+            report(result)
+
+    return results
+
+
+def print_result(result: Result):
+    print(f"{result.name:<32} {result.median * 1e6:10.3f}µs ±{result.stdev * 1e6:8.3f}  "
+          f"(min {result.minimum * 1e6:.3f}µs, {result.repeats} x {result.items} items)")
+
+
+def to_json(results: Sequence[Result]) -> Dict[str, Any]:
+    """Returns the results, and the environment they were measured in, in a form that can be saved as JSON."""
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": {result.name: result._asdict() for result in results},
+    }
+
+
+def compare(results: Sequence[Result], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+    """Compares the median time of every case that is also in the baseline. A case has regressed if it is more than
+    threshold (a fraction) slower than in the baseline."""
+    if baseline.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"Expected a baseline with schema {SCHEMA_VERSION}, but got {baseline.get('schema')}")
+
+    comparisons = []
+    for result in results:
+        previous = baseline["results"].get(result.name)
+        if previous is None:
+            continue
+        ratio = result.median / previous["median"]
+        comparisons.append(Comparison(result.name, previous["median"], result.median, ratio, ratio > 1 + threshold))
+
+    return comparisons
+
+
+def print_comparison(comparison: Comparison):
+    verdict = "REGRESSED" if comparison.regressed else ""
+    print(f"{comparison.name:<32} {comparison.baseline * 1e6:10.3f}µs -> {comparison.current * 1e6:10.3f}µs "
+          f"{comparison.ratio - 1:+7.1%} {verdict}")
+
+
+def _bind(corpus: Callable[..., List[str]], parameter) -> Callable[[int], List[str]]:
+    return lambda size: corpus(parameter, size)
+
+
+def _time(run: Callable[[Any], object], corpus) -> float:
+    # Like timeit, garbage collection is switched off while timing, so that it doesn't add noise
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        run(corpus)
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _clear_caches():
+    sp.conditional_block_cache.clear()
+    sp.conditional_number_cache.clear()
+
+
+def _convert_all(corpus: List[str]):
+    return [niw.number_in_words(number) for number in corpus]
+
+
+def _convert_all_from_table(corpus: List[str]):
+    return [niw.number_in_words(number, block_table=True) for number in corpus]
+
+
+def _convert_all_caching_numbers(corpus: List[str]):
+    return [niw.number_in_words(number, cached_numbers=True) for number in corpus]
+
+
+def _convert_all_phrases(corpus: List[str]):
+    return [niw.number_in_words_from_phrase(phrase) for phrase in corpus]
+
+
+def _parse_all(corpus: List[str]):
+    parse = sp._get_number_parts_from_word.__wrapped__
+    return [parse(number) for number in corpus]
+
+
+def _zero_fill_all(corpus: List[str]) -> List[str]:
+    return [number.zfill(-(-len(number) // 3) * 3) for number in corpus]
+
+
+def _render_all(corpus: List[str]):
+    return [[sp._get_block_result(number[i:i+3]) for i in range(0, len(number), 3)] for number in corpus]
+
+
+def _render_all_from_table(corpus: List[str]):
+    table = sp._get_block_table()
+    return [[table[int(number[i:i+3])] for i in range(0, len(number), 3)] for number in _zero_fill_all(corpus)]
+
+
+def _join_all(corpus):
+    return [sp._join_block_results(block_results, len(block_results)) for block_results in corpus]
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    parser = ap.ArgumentParser(description="run the benchmark suite of the numbers_in_words package")
+    parser.add_argument(
+        "cases",
+        nargs="*",
+        help="run only the cases whose names start with any of these e.g. digits/ or stage/. All cases are run if "
+             "none are given.")
+    parser.add_argument("--quick", action="store_true", help="run smaller corpora, fewer times.")
+    parser.add_argument(
+        "--size", type=int, help="the number of items in each corpus. Default: 2000, or 200 if --quick.")
+    parser.add_argument(
+        "--repeats", type=int, help="the number of timed runs of each case. Default: 7, or 3 if --quick.")
+    parser.add_argument("--warmups", type=int, default=1, help="the number of untimed runs of warm cases. Default: 1.")
+    parser.add_argument("--output", help="save the results to OUTPUT as JSON.")
+    parser.add_argument("--baseline", help="compare the results with those saved in BASELINE.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"how much slower (as a fraction) than the baseline a case may be. Default: {DEFAULT_THRESHOLD}.")
+    args = parser.parse_args(arguments)
+
+    cases = [case for case in build_cases() if not args.cases or case.name.startswith(tuple(args.cases))]
+    if not cases:
+        parser.error(f"no cases start with: {', '.join(args.cases)}")
+
+    size = args.size or (200 if args.quick else 2000)
+    repeats = args.repeats or (3 if args.quick else 7)
+    print(f"Time per item, the median of {repeats} runs ± standard deviation:\n")
+    results = run_suite(cases, size, repeats, args.warmups, print_result)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(to_json(results), output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            comparisons = compare(results, json.load(baseline), args.threshold)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):\n")
+        for comparison in comparisons:
+            print_comparison(comparison)
+        if any(comparison.regressed for comparison in comparisons):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,764 @@
+"""Benchmarks for the numbers_in_words package.
+
+Run all benchmarks with:
+
+    python3 benchmarks.py
+
+or a selection of them with:
+
+    python3 benchmarks.py block_table
+"""
+
+import argparse as ap
+import asyncio
+import csv
+import importlib.util
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+import numbers_in_words as niw
+import numbers_in_words._numbers_in_words_modules.string_processing as sp
+
+NUMBER_OF_RUNS = 100000
+SETUP = "import numbers_in_words as niw"
+
+
+def _report(description: str, statement: str, number: int = NUMBER_OF_RUNS, setup: str = SETUP,
+            globals: Optional[Dict] = None) -> float:
+    t = round(timeit.timeit(stmt=statement, setup=setup, number=number, globals=globals), 5)
+    print(f"{description:<90}: {t}s")
+    return t
+
+
+def block_table():
+    """Compares the precomputed block table with the cached and uncached block rendering paths."""
+    print("Block rendering engines:\n")
+    for number in ("99", "9" * 42):
+        label = number if len(number) < 10 else f"a {len(number)}-digit number"
+        _report(f"Convert {label} to words, without caching, {NUMBER_OF_RUNS} times",
+                f"niw.number_in_words('{number}', cached_blocks=False)")
+        _report(f"Convert {label} to words, with block caching, {NUMBER_OF_RUNS} times",
+                f"niw.number_in_words('{number}')")
+        _report(f"Convert {label} to words, with the block table, {NUMBER_OF_RUNS} times",
+                f"niw.number_in_words('{number}', block_table=True)")
+    print("")
+
+
+def _report_rows_per_second(description: str, convert: Callable[[], object], rows: int) -> float:
+    start = time.perf_counter()
+    convert()
+    rows_per_second = rows / (time.perf_counter() - start)
+    print(f"{description:<90}: {rows_per_second:,.0f} rows/s")
+    return rows_per_second
+
+
+def _amounts(rows: int, distinct: int = 10000, seed: int = 0) -> List[int]:
+    rng = random.Random(seed)
+    pool = [rng.randrange(-10**12, 10**12) for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def batch(rows: int = 200000):
+    """Compares the throughput of numbers_in_words_batch with calling number_in_words in a loop."""
+    print(f"Batch conversion of {rows} amounts (10 000 distinct values):\n")
+    ints = _amounts(rows)
+    strings = [str(n) for n in ints]
+
+    _report_rows_per_second(
+        "number_in_words in a loop, over strings",
+        lambda: [niw.number_in_words(s) for s in strings], rows)
+    _report_rows_per_second(
+        "numbers_in_words_batch, over strings",
+        lambda: niw.numbers_in_words_batch(strings), rows)
+    _report_rows_per_second(
+        "numbers_in_words_batch, over ints",
+        lambda: niw.numbers_in_words_batch(ints), rows)
+
+    if importlib.util.find_spec("numpy"):
+        import numpy
+
+        array = numpy.array(ints, dtype=numpy.int64)
+        _report_rows_per_second(
+            "numbers_in_words_batch, over a NumPy int64 array",
+            lambda: niw.numbers_in_words_batch(array), rows)
+    print("")
+
+
+def threads(calls_per_thread: int = 20000):
+    """Measures throughput as threads are added, while half of the threads switch caching off for their calls."""
+    print(f"Multi-threaded conversion, {calls_per_thread} calls per thread:\n")
+    numbers = [str(n) for n in _amounts(calls_per_thread, distinct=500)]
+
+    # The words in the number cache, which a call with caching on returns as they are, and one with caching off
+    # never does, since it builds its words anew. The cache is made large enough that none of them are evicted from
+    # any of its stripes.
+    before = niw.cache_info()["number"]
+    niw.configure_cache("number", maxsize=100 * len(set(numbers)), policy="lru")
+    with niw.cache_policy(cached_numbers=True):
+        cached = {number: niw.number_in_words(number) for number in numbers}
+
+    for thread_count in (1, 2, 4, 8):
+        interference: List[str] = []
+
+        def work(uncached: bool):
+            # A call whose words don't match what its own cache policy gives saw another thread's cache policy
+            if uncached:
+                for number in numbers:
+                    words = niw.number_in_words(number, cached_blocks=False, cached_numbers=False)
+                    if words is cached[number] or words != cached[number]:
+                        interference.append(number)
+                return
+
+            with niw.cache_policy(cached_numbers=True):
+                for number in numbers:
+                    if niw.number_in_words(number) is not cached[number]:
+                        interference.append(number)
+
+        workers = [threading.Thread(target=work, args=(i % 2 == 1,)) for i in range(thread_count)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        calls = thread_count * calls_per_thread
+        print(f"{thread_count} thread(s): {calls / elapsed:>12,.0f} calls/s, "
+              f"{len(interference)} calls saw another thread's cache policy")
+
+    niw.configure_cache("number", maxsize=before.maxsize, policy=before.policy, ttl=before.ttl)
+    print("")
+
+
+def _invoice_workload(rows: int, repeated: int = 2000, unique_share: float = 0.3, seed: int = 0) -> List[str]:
+    # Repeated invoice totals, some much more common than others, plus a long tail of values seen only once
+    rng = random.Random(seed)
+    totals = [f"{rng.randrange(1, 10**6)}.{rng.randrange(100):02}" for _ in range(repeated)]
+    weights = [1 / rank for rank in range(1, repeated + 1)]
+    workload = rng.choices(totals, weights=weights, k=rows)
+    for i in range(rows):
+        if rng.random() < unique_share:
+            workload[i] = f"{rng.randrange(10**9, 10**12)}.{rng.randrange(100):02}"
+    return workload
+
+
+def cache_sizing(rows: int = 100000):
+    """Shows the hit rate, throughput and memory of the number cache, per eviction policy and size."""
+    print(f"Number cache sizing, {rows} invoice totals (Zipf-distributed repeats plus a 30% long tail):\n")
+    workload = _invoice_workload(rows)
+
+    for policy in ("lru", "lfu", "ttl"):
+        for maxsize in (100, 1000, 10000):
+            niw.configure_cache("number", maxsize=maxsize, policy=policy, ttl=60 if policy == "ttl" else None)
+            sp.conditional_number_cache.clear()
+            start = time.perf_counter()
+            with niw.cache_policy(cached_numbers=True):
+                for number in workload:
+                    niw.number_in_words(number)
+            elapsed = time.perf_counter() - start
+            info = niw.cache_info()["number"]
+            print(f"{policy} maxsize={maxsize:<6}: hit rate {info.hits / (info.hits + info.misses):6.1%}, "
+                  f"{rows / elapsed:>9,.0f} calls/s, {info.evictions:>6} evictions, ~{info.memory / 1024:,.0f} KiB")
+
+    niw.configure_cache("number", maxsize=1000, policy="lru")
+    sp.conditional_number_cache.clear()
+    print("")
+
+
+def parallel(lines: int = 400000):
+    """Shows how the conversion of a large file scales with the number of worker processes."""
+    print(f"Parallel conversion of a file of {lines} lines, on {os.cpu_count()} CPUs:\n")
+    with open("example.txt", "r") as fread:
+        example = fread.read().splitlines(keepends=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "lines.txt")
+        with open(file_name, "w") as fwrite:
+            fwrite.writelines(example[i % len(example)] for i in range(lines))
+
+        for use_mmap in (False, True):
+            for workers in (1, 2, 4, 8, 16):
+                _report_rows_per_second(
+                    f"{workers} worker(s){', memory-mapped' if use_mmap else ''}",
+                    lambda: sum(1 for _ in niw.convert_file_parallel(file_name, workers, use_mmap=use_mmap)),
+                    lines)
+    print("")
+
+
+def scanner(number: int = 1000):
+    """Compares the single-pass scanner with splitting phrases into words and parsing each number-like word."""
+    print("Finding numbers in phrases:\n")
+    import numbers_in_words._numbers_in_words_modules.scanner as sc
+
+    rng = random.Random(0)
+    words = ["the", "pump", "is", "deep", "underground", "records", "processed", "ZIP", "code"]
+    paragraph = " ".join(str(rng.randrange(10**6)) if rng.random() < 0.1 else rng.choice(words) for _ in range(5000))
+    for suffix_length in (100, 10000):
+        pathological = f"The total is 1,234{'x' * suffix_length}"
+        for description, phrase in (("a paragraph of 5000 words", paragraph),
+                                    (f"a number with a {suffix_length} character suffix", pathological)):
+            runs = number if len(phrase) < 10000 else number // 10
+            _report(f"Split and parse {description}, {runs} times",
+                    "[parse(w) for w in phrase.split(' ') if sp._is_number_like(w)]", runs, setup="",
+                    globals={"phrase": phrase, "sp": sp, "parse": sp._get_number_parts_from_word.__wrapped__})
+            _report(f"Scan {description}, {runs} times",
+                    "list(sc.scan_number_parts(phrase))", runs, setup="", globals={"phrase": phrase, "sc": sc})
+    print("")
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+def event_loop(lines: int = 100000):
+    """Measures how late a 1ms ticker task runs while lines are converted in the same event loop."""
+    print(f"Event loop latency while converting {lines} lines:\n")
+    with open("example.txt", "r") as fread:
+        example = fread.read().splitlines()
+    source = [example[i % len(example)] for i in range(lines)]
+
+    async def line_source():
+        for line in source:
+            yield line
+
+    async def blocking():
+        for line in source:
+            niw.number_in_words_from_phrase(line)
+
+    async def streamed(**kwargs):
+        async for _ in niw.convert_lines_async(line_source(), **kwargs):
+            pass
+
+    async def measure(convert):
+        lateness: List[float] = []
+        done = asyncio.Event()
+
+        async def ticker():
+            while not done.is_set():
+                before = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lateness.append(time.perf_counter() - before - 0.001)
+
+        ticks = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0.01)  # let the ticker get going
+        start = time.perf_counter()
+        await convert
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ticks
+        return elapsed, lateness
+
+    for description, convert in (
+            ("number_in_words_from_phrase in a loop", blocking),
+            ("convert_lines_async, batches of 1000", lambda: streamed(batch_size=1000)),
+            ("convert_lines_async, batches of 100", lambda: streamed(batch_size=100)),
+            ("convert_lines_async, batches of 1000, offloaded", lambda: streamed(batch_size=1000, offload=True))):
+        elapsed, lateness = asyncio.run(measure(convert()))
+        print(f"{description:<50}: {elapsed:6.2f}s, tick lateness p50 {_percentile(lateness, 50) * 1000:7.2f}ms, "
+              f"p99 {_percentile(lateness, 99) * 1000:7.2f}ms, max {max(lateness) * 1000:7.2f}ms")
+    print("")
+
+
+def long_integers():
+    """Shows that rendering an integer takes time linear in its number of digits."""
+    print("Rendering long integers:\n")
+    rng = random.Random(0)
+    for digits in (1000, 10000, 100000):
+        number = "".join(rng.choice("0123456789") for _ in range(digits))
+        runs = max(1, 100000 // digits)
+        t = timeit.timeit(lambda: niw.number_in_words(number, block_table=True), number=runs) / runs
+        print(f"{digits:>7} digits: {t * 1000:9.3f}ms per number, {t / (digits / 3) * 1e6:6.3f}µs per block")
+    print("")
+
+
+_LONG_DECIMALS_SCRIPT = """
+import os, resource, sys, time, tracemalloc
+import numbers_in_words as niw
+
+digits, streamed = int(sys.argv[1]), sys.argv[2] == "streamed"
+number = "3." + "1415926535" * (digits // 10)
+
+
+def convert():
+    with open(os.devnull, "w") as output:
+        if streamed:
+            niw.write_number_in_words(number, output)
+        else:
+            output.write(niw.number_in_words(number, block_table=True))
+
+
+start = time.perf_counter()
+convert()
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+# tracemalloc slows everything down, so the peak is measured in a second run
+tracemalloc.start()
+convert()
+peak = tracemalloc.get_traced_memory()[1]
+
+print(elapsed, peak, rss)
+"""
+
+
+def long_decimals():
+    """Compares the time and peak memory of number_in_words and write_number_in_words as decimals grow.
+
+    Every run is in a new process, so that its peak RSS is its own. tracemalloc's peak is the memory allocated by
+    Python while converting, which excludes the interpreter and the input itself.
+    """
+    print("Rendering long decimals (peak RSS includes the interpreter and the input):\n")
+    for digits in (10**4, 10**5, 10**6):
+        for mode in ("whole", "streamed"):
+            output = subprocess.run(
+                [sys.executable, "-c", _LONG_DECIMALS_SCRIPT, str(digits), mode],
+                capture_output=True, text=True, check=True).stdout
+            elapsed, peak, rss = (float(value) for value in output.split())
+            print(f"{digits:>9} decimals, {mode:<8}: {elapsed:7.3f}s, peak allocated {peak / 2**20:8.1f} MiB, "
+                  f"peak RSS {rss / 2**20:8.1f} MiB")
+    print("")
+
+
+def parse_memory(tokens: int = 100000):
+    """Measures the memory kept by parsed numbers, what is allocated while rejecting words, and the parse time."""
+    print(f"Parsing {tokens} words:\n")
+    rng = random.Random(0)
+    parse = sp._get_number_parts_from_word.__wrapped__
+    valid = [f"{rng.randrange(10**9):,}.{rng.randrange(100):02}kg" for _ in range(tokens)]
+    invalid = [f"{rng.randrange(10**6)}.{rng.randrange(100)}.{rng.randrange(100)}" for _ in range(tokens)]
+    for label, words in (("valid", valid), ("invalid", invalid)):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        results = [parse(word) for word in words]
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        retained -= before + sys.getsizeof(results)  # the list that holds the results isn't part of the parse
+
+        t = timeit.timeit(lambda: [parse(word) for word in words], number=1) / tokens
+        print(f"{label:<7} words: {retained / tokens:6.1f} bytes kept per result, "
+              f"peak {(peak - before) / 2**20:5.1f} MiB, {t * 1e6:5.3f}µs per word")
+    print("")
+
+
+def locales(number: int = 100000):
+    """Compares the time per conversion in every locale with the en-GB path that doesn't take a locale."""
+    print(f"Converting 1000 numbers, {number // 1000} times, per locale:\n")
+    rng = random.Random(0)
+    amounts = [rng.randrange(10**12) + rng.randrange(100) / 100 for _ in range(1000)]
+    written = {
+        "en-GB": [f"{amount:,.2f}" for amount in amounts],
+        "en-US": [f"{amount:,.2f}" for amount in amounts],
+        "en-IN": [_lakh_crore_format(amount) for amount in amounts],
+        "en-150": [f"{amount:,.2f}".translate(str.maketrans(",.", ".,")) for amount in amounts],
+    }
+
+    runs = number // 1000
+    for block_table in (False, True):
+        t = timeit.timeit(
+            lambda: [niw.number_in_words(n, block_table=block_table) for n in written["en-GB"]], number=runs)
+        print(f"{'no locale, block_table=' + str(block_table):<30}: {t / number * 1e6:6.3f}µs per number")
+    for locale, numbers in written.items():
+        t = timeit.timeit(lambda: [niw.number_in_words(n, locale=locale) for n in numbers], number=runs)
+        print(f"{'locale=' + locale:<30}: {t / number * 1e6:6.3f}µs per number")
+    print("")
+
+
+def _lakh_crore_format(amount: float) -> str:
+    integer, decimals = f"{amount:.2f}".split(".")
+    head, tail = integer[:-3], integer[-3:]
+    groups = []
+    while head:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return ",".join(groups + [tail]) + f".{decimals}"
+
+
+def round_trip(rows: int = 100000):
+    """Measures the throughput of checking amounts against their words with words_to_number."""
+    print(f"Round trip of {rows} amounts:\n")
+    amounts = [f"{amount}.{amount % 100:02}" for amount in _amounts(rows, distinct=rows)]
+    words = [niw.number_in_words(amount, block_table=True) for amount in amounts]
+
+    _report_rows_per_second(
+        "number_in_words", lambda: [niw.number_in_words(amount, block_table=True) for amount in amounts], rows)
+    _report_rows_per_second("words_to_number", lambda: [niw.words_to_number(w) for w in words], rows)
+    _report_rows_per_second(
+        "verify (words_to_number(words) == amount)",
+        lambda: all(niw.words_to_number(w) == amount for w, amount in zip(words, amounts)), rows)
+
+    print("")
+    for digits in (1000, 10000, 100000):
+        number = "9" * digits
+        words = niw.number_in_words(number, block_table=True)
+        t = timeit.timeit(lambda: niw.words_to_number(words), number=1)
+        print(f"{digits:>7} digits: {t * 1000:9.3f}ms, {t / len(words) * 1e9:6.1f}ns per character of words")
+    print("")
+
+
+def native_numbers(number: int = 20000):
+    """Compares converting ints with converting the same numbers as strings, for 1 to 42 digits."""
+    print(f"Converting ints and strings, {number} times each (µs per number):\n")
+    print(f"{'digits':>6} {'str':>8} {'str, table':>11} {'int':>8} {'Decimal':>8}")
+    rng = random.Random(0)
+    for digits in (1, 3, 6, 9, 12, 18, 24, 30, 36, 42):
+        value = rng.randrange(10 ** (digits - 1), 10 ** digits)
+        text, decimal = str(value), Decimal(value)
+        times = [
+            timeit.timeit(lambda: niw.number_in_words(text), number=number),
+            timeit.timeit(lambda: niw.number_in_words(text, block_table=True), number=number),
+            timeit.timeit(lambda: niw.number_in_words(value), number=number),
+            timeit.timeit(lambda: niw.number_in_words(decimal), number=number),
+        ]
+        print(f"{digits:>6} " + " ".join(f"{t / number * 1e6:{width}.3f}" for t, width in zip(times, (8, 11, 8, 8))))
+    print("")
+
+
+def incremental(ticks: int = 100000):
+    """Compares IncrementalConverter with number_in_words on monotonically increasing 30-digit counters."""
+    print(f"Converting {ticks} ticks of a 30-digit counter (µs per tick):\n")
+    rng = random.Random(0)
+    start = rng.randrange(10 ** 29, 10 ** 30 - ticks * 1000)
+    counters = {
+        "+1 per tick": list(range(start, start + ticks)),
+        "+1 to +1000 per tick": list(itertools.accumulate(rng.randrange(1, 1001) for _ in range(ticks - 1))),
+    }
+    counters["+1 to +1000 per tick"] = [start] + [start + step for step in counters["+1 to +1000 per tick"]]
+
+    print(f"{'counter':<24} {'type':>4} {'number_in_words':>16} {'incremental':>12} {'speedup':>8}")
+    for description, values in counters.items():
+        for kind, numbers in (("str", [str(value) for value in values]), ("int", values)):
+            full = timeit.timeit(lambda: [niw.number_in_words(n, block_table=True) for n in numbers], number=1)
+            converter = niw.IncrementalConverter()
+            delta = timeit.timeit(lambda: [converter.number_in_words(n) for n in numbers], number=1)
+            print(f"{description:<24} {kind:>4} {full / ticks * 1e6:>16.3f} {delta / ticks * 1e6:>12.3f} "
+                  f"{full / delta:>7.2f}x")
+        print(f"{'':<24} blocks rendered per tick: {converter.blocks_rendered / ticks:.2f} of 10")
+    print("")
+
+
+# style : the currency it is benchmarked with
+STYLES = {"cardinal": None, "ordinal": None, "cheque": "USD", "currency": "ZAR"}
+
+
+def styles(number: int = 20000):
+    """Compares every style with cardinal output, for amounts of 2 to 42 digits, with and without the block table."""
+    print(f"Converting 1000 amounts, {number // 1000} times, per style (µs per number, and the ratio to cardinal):\n")
+    rng = random.Random(0)
+    runs = number // 1000
+    print(f"{'digits':>6} {'block_table':>11} " + " ".join(f"{style:>17}" for style in STYLES))
+    for digits in (2, 6, 12, 42):
+        amounts = [f"{rng.randrange(10 ** (digits - 1), 10 ** digits)}.{rng.randrange(100):02}" for _ in range(1000)]
+        integers = [amount.split(".")[0] for amount in amounts]
+        for block_table in (False, True):
+            times = []
+            for style, currency in STYLES.items():
+                # Ordinals have no decimals, so every style is given the integers, and the amounts are only used by
+                # the styles that say the cents
+                numbers = amounts if currency else integers
+                t = timeit.timeit(
+                    lambda: [niw.number_in_words(n, block_table=block_table, style=style, currency=currency)
+                             for n in numbers], number=runs)
+                times.append(t / number * 1e6)
+            print(f"{digits:>6} {str(block_table):>11} " + " ".join(
+                f"{t:>9.3f} ({t / times[0]:4.2f}x)" for t in times))
+    print("")
+
+
+def instrumentation(number: int = 20000):
+    """Shows what instrumentation costs when it is off (nothing) and when it is on."""
+    print(f"Converting a phrase {number} times:\n")
+    phrase = "We processed 66,723,107,008 records."
+    convert = lambda: niw.number_in_words_from_phrase(phrase)  # noqa: E731
+
+    off = timeit.timeit(convert, number=number)
+    hook = lambda name, value: None  # noqa: E731
+    niw.add_instrumentation_hook(hook)
+    try:
+        on = timeit.timeit(convert, number=number)
+    finally:
+        niw.remove_instrumentation_hook(hook)
+    off_again = timeit.timeit(convert, number=number)
+
+    print(f"{'instrumentation off':<30}: {off / number * 1e6:6.3f}µs per phrase")
+    print(f"{'instrumentation on':<30}: {on / number * 1e6:6.3f}µs per phrase")
+    print(f"{'instrumentation off again':<30}: {off_again / number * 1e6:6.3f}µs per phrase")
+    print("")
+    with niw.profile(sys.stdout):
+        for _ in range(number):
+            convert()
+    print("")
+
+
+def persistent_cache(rows: int = 100000):
+    """Compares a warm start from the persistent cache, as in a new process, with converting the numbers again."""
+    print(f"Persistent cache, {rows} distinct amounts:\n")
+    amounts = [f"{amount}.{amount % 100:02}" for amount in _amounts(rows, distinct=rows)]
+    long_amounts = [f"{amount}{abs(amount):012}{abs(amount):012}.{amount % 100:02}"
+                    for amount in _amounts(rows, distinct=rows)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for description, numbers in (("amounts", amounts), ("42-digit amounts", long_amounts)):
+            path = os.path.join(directory, f"{len(numbers[0])}.sqlite")
+            corpus = os.path.join(directory, "corpus.txt")
+            with open(corpus, "w") as f:
+                f.write("\n".join(numbers))
+
+            _report_rows_per_second(
+                f"{description}: numbers_in_words_batch, recomputed",
+                lambda: niw.numbers_in_words_batch(numbers), rows)
+            with niw.PersistentCache(path) as cache:
+                _report_rows_per_second(
+                    f"{description}: warm the cache from a corpus file", lambda: cache.warm(corpus), rows)
+            with niw.PersistentCache(path) as cache:  # a new connection, as a new process would open
+                _report_rows_per_second(
+                    f"{description}: PersistentCache.numbers_in_words, warm start",
+                    lambda: cache.numbers_in_words(numbers), rows)
+                _report_rows_per_second(
+                    f"{description}: PersistentCache.number_in_words in a loop, warm start",
+                    lambda: [cache.number_in_words(n) for n in numbers[:rows // 10]], rows // 10)
+            for locale in ("en-US", "en-IN"):
+                _report_rows_per_second(
+                    f"{description}: number_in_words in {locale}, recomputed",
+                    lambda: [niw.number_in_words(n, locale=locale) for n in numbers], rows)
+                with niw.PersistentCache(path) as cache:
+                    cache.warm(corpus, locale=locale)
+                    _report_rows_per_second(
+                        f"{description}: PersistentCache.numbers_in_words in {locale}, warm start",
+                        lambda: cache.numbers_in_words(numbers, locale=locale), rows)
+    print("")
+
+
+def _write_csv(path: str, rows: int, distinct: int):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "amount", "description"])
+        for i, amount in enumerate(_amounts(rows, distinct)):
+            writer.writerow([i, f"{amount / 100:,.2f}", f"item {i}"])
+
+
+def columns(rows: int = 200000):
+    """Compares convert_column with a loop over the rows of a CSV file, and shows that its memory stays bounded."""
+    print(f"Converting a column of a CSV file of {rows} rows ({rows // 10} distinct amounts):\n")
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "amounts.csv")
+        destination = os.path.join(directory, "words.csv")
+        _write_csv(source, rows, rows // 10)
+
+        def loop():
+            with open(source, newline="") as fread, open(destination, "w", newline="") as fwrite:
+                reader = csv.DictReader(fread)
+                writer = csv.DictWriter(fwrite, reader.fieldnames + ["amount_words"])
+                writer.writeheader()
+                for row in reader:
+                    row["amount_words"] = niw.number_in_words_from_phrase(row["amount"])
+                    writer.writerow(row)
+
+        _report_rows_per_second("number_in_words_from_phrase, in a loop over csv.DictReader", loop, rows)
+        _report_rows_per_second(
+            "convert_column", lambda: niw.convert_column(source, destination, "amount"), rows)
+
+        if importlib.util.find_spec("pyarrow"):
+            import pyarrow.csv
+            import pyarrow.parquet
+
+            parquet_source = os.path.join(directory, "amounts.parquet")
+            pyarrow.parquet.write_table(pyarrow.csv.read_csv(source), parquet_source)
+            _report_rows_per_second(
+                "convert_column, Parquet",
+                lambda: niw.convert_column(parquet_source, os.path.join(directory, "words.parquet"), "amount"), rows)
+
+        # The cache holds every distinct amount, up to cache_size, so the memory of the rows themselves is shown with
+        # the same amounts in every file
+        print("")
+        for size in (rows // 4, rows, rows * 4):
+            _write_csv(source, size, rows // 10)
+            tracemalloc.start()
+            niw.convert_column(source, destination, "amount")
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>8} rows: peak memory {peak / 2**20:6.2f}MiB")
+    print("")
+
+
+def _load_test(description: str, convert: Callable[[str], object], requests: List[str], thread_count: int):
+    # Every thread converts its share of the requests, one at a time, timing each one
+    latencies: List[List[float]] = [[] for _ in range(thread_count)]
+
+    def work(i: int):
+        timings = latencies[i]
+        for request in requests[i::thread_count]:
+            start = time.perf_counter()
+            convert(request)
+            timings.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(thread_count)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    every = [latency for timings in latencies for latency in timings]
+    print(f"{description:<50}: {len(requests) / elapsed:>9,.0f} requests/s, "
+          f"p50 {_percentile(every, 50) * 1e6:7.1f}µs, p99 {_percentile(every, 99) * 1e6:7.1f}µs")
+
+
+def server(requests: int = 20000):
+    """Load-tests main.py --serve, over a Unix domain socket and TCP, against calls in the same process."""
+    print(f"Conversion server, {requests} invoice totals:\n")
+    phrases = [f"Total: {total} EUR" for total in _invoice_workload(requests)]
+
+    for thread_count in (1, 8):
+        _load_test(f"in-process, {thread_count} thread(s)",
+                   lambda p: niw.number_in_words_from_phrase(p, block_table=True), phrases, thread_count)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for address, argument in ((os.path.join(directory, "niw.sock"), None), (("127.0.0.1", 47231), "47231")):
+            kind = "Unix socket" if argument is None else "TCP"
+            process = subprocess.Popen([sys.executable, "main.py", "--serve", argument or address],
+                                       stderr=subprocess.DEVNULL)
+            try:
+                client = niw.ConversionClient(address)
+                for _ in range(100):  # until the server is up
+                    try:
+                        client.number_in_words("1")
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+
+                for thread_count in (1, 8, 32):
+                    _load_test(f"{kind}, {thread_count} thread(s)", client.number_in_words_from_phrase, phrases,
+                               thread_count)
+                _report_rows_per_second(f"{kind}, pipelined batches of 1000",
+                                        lambda: client.batch(phrases, phrases=True), requests)
+                client.close()
+            finally:
+                process.terminate()
+                process.wait()
+    print("")
+
+
+# The most that "import numbers_in_words" may take, in ms, as reported by python -X importtime
+IMPORT_TIME_BUDGET_MS = 30
+
+# The cold starts of the package as it was before any of its fast paths were added, in ms over "python -c pass",
+# recorded on the machine that the budget was set on. Startup is compared with these, rather than with the package
+# itself, so that a regression shows.
+BASELINE_COLD_START_MS = {
+    "import numbers_in_words": 17.0,
+    "convert a number": 17.0,
+    "main.py -f example.txt": 30.0,
+}
+
+# The most that a cold start may take over its baseline, in ms. Cold starts vary by a few ms from run to run.
+COLD_START_BUDGET_MS = 6.0
+
+
+def _cold_start(command: List[str], env: Optional[Dict[str, str]] = None, runs: int = 15) -> float:
+    # The median wall time, in ms, of running command in a new process
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[runs // 2] * 1000
+
+
+def _import_time(runs: int = 15) -> float:
+    # The median time, in ms, that python -X importtime reports for importing the package and what it imports
+    times = []
+    for _ in range(runs):
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import numbers_in_words"],
+                                stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+        for line in stderr.splitlines():
+            _, cumulative, name = line.split("|")
+            if name.strip() == "numbers_in_words":
+                times.append(int(cumulative) / 1000)
+    return sorted(times)[runs // 2]
+
+
+def startup():
+    """Checks the import time against its budget, and the cold starts of a process that imports the package, one
+    that converts a number and the command line tool against the package before its fast paths were added."""
+    print("Startup:\n")
+    import_time = _import_time()
+    verdict = "within" if import_time <= IMPORT_TIME_BUDGET_MS else "OVER"
+    print(f"{'import numbers_in_words (python -X importtime)':<60}: {import_time:6.1f}ms, "
+          f"{verdict} the budget of {IMPORT_TIME_BUDGET_MS}ms")
+
+    interpreter = _cold_start([sys.executable, "-c", "pass"])
+    print(f"{'Cold start, python -c pass':<60}: {interpreter:6.1f}ms")
+    for description, command in (
+            ("import numbers_in_words", [sys.executable, "-c", "import numbers_in_words"]),
+            ("convert a number",
+             [sys.executable, "-c", "import numbers_in_words as niw; niw.number_in_words('1234')"]),
+            ("main.py -f example.txt", [sys.executable, "main.py", "-f", "example.txt"])):
+        over = _cold_start(command) - interpreter
+        baseline = BASELINE_COLD_START_MS[description]
+        verdict = "within" if over - baseline <= COLD_START_BUDGET_MS else "OVER"
+        print(f"{'Cold start, ' + description:<60}: {over:6.1f}ms over python, {over - baseline:+5.1f}ms on the "
+              f"baseline, {verdict} the budget of +{COLD_START_BUDGET_MS}ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = os.path.join(directory, "tables.snapshot")
+        sp.locales.write_table_snapshot(snapshot)
+        with_snapshot = dict(os.environ, NUMBERS_IN_WORDS_TABLE_SNAPSHOT=snapshot)
+
+        convert = "niw.number_in_words('1234', block_table=True); niw.number_in_words('1234', locale='en-US')"
+        for description, env in (("convert with block tables", None),
+                                 ("convert with block tables, from a snapshot", with_snapshot)):
+            code = f"import numbers_in_words as niw; {convert}"
+            print(f"{'Cold start, ' + description:<60}: {_cold_start([sys.executable, '-c', code], env):6.1f}ms")
+    print("")
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "block_table": block_table,
+    "batch": batch,
+    "threads": threads,
+    "cache_sizing": cache_sizing,
+    "parallel": parallel,
+    "scanner": scanner,
+    "event_loop": event_loop,
+    "long_integers": long_integers,
+    "long_decimals": long_decimals,
+    "parse_memory": parse_memory,
+    "locales": locales,
+    "round_trip": round_trip,
+    "native_numbers": native_numbers,
+    "styles": styles,
+    "incremental": incremental,
+    "instrumentation": instrumentation,
+    "startup": startup,
+    "persistent_cache": persistent_cache,
+    "columns": columns,
+    "server": server,
+}
+
+
+if __name__ == "__main__":
+    parser = ap.ArgumentParser(description="run some benchmarks against the numbers_in_words package")
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"the benchmarks to run, any of: {', '.join(BENCHMARKS)}. All of them are run if none are given.")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,463 @@
+"""Differential fuzzing of the numbers_in_words package.
+
+Generates random and adversarial numbers and phrases, converts each of them with the reference implementation and
+with every engine of the package (the block-by-block renderer, the block table, the caches, batch conversion, the
+int, Decimal and Fraction paths, streaming, the scanner, the incremental converter and the persistent cache), and
+reports every case where an engine says something else than the reference, or raises where it doesn't. The reference
+shares no code with the engines, other than the names of the scales: it matches numbers with a regular expression of
+its own, and says their blocks with a block table of its own, so that a mistake in the parser or the renderer of the
+package can't hide by being made by the reference too. It never raises for a string, so a case for which it raises is
+reported as a failure of the reference.
+
+Every failing case is shrunk to a minimal input that still fails, by taking characters out of it and simplifying its
+digits, so that it is easy to see what an engine gets wrong. The time that each engine spends on the cases is
+recorded too, so that correctness and speed are checked together.
+
+Cases that an engine doesn't take (e.g. strings that aren't plain integers, for the int path) are skipped for that
+engine. Run 10000 cases with:
+
+    python3 fuzz.py --cases 10000 --seed 1
+
+which fails (exit status 1) if any engine disagrees with the reference.
+"""
+
+import argparse as ap
+import random
+import re
+import sys
+import time
+from decimal import Decimal
+from fractions import Fraction
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numbers_in_words as niw
+import numbers_in_words._numbers_in_words_modules.scale_names as scales
+import numbers_in_words._numbers_in_words_modules.streaming as streaming
+import numbers_in_words._numbers_in_words_modules.string_processing as sp
+
+_FILLER_WORDS = ("the", "pump", "is", "deep", "records", "we", "processed", "code", "balance", "-", "a1", "", "km")
+_SUFFIXES = ("km", "kg.", "%", "-", ".", ",", "x1", "e5", "!")
+_MUTATIONS = "0123456789,.- k"
+
+# Strings that the int, Decimal and Fraction paths can be compared on: no separators, suffixes or leading zeros
+_PLAIN_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?")
+
+# The most digits of the strings that are given to int(), below sys.get_int_max_str_digits()
+_MAX_INT_DIGITS = 4000
+
+
+class Case(NamedTuple):
+    text: str
+    phrase: bool  # converted with number_in_words_from_phrase, rather than number_in_words
+
+
+class Engine(NamedTuple):
+    name: str
+    convert: Callable[[Case], Optional[str]]  # returns None for cases that the engine doesn't take
+
+
+class Failure(NamedTuple):
+    engine: str
+    case: Case
+    shrunk: Case  # the smallest case found that still fails
+    expected: str  # the words of the reference for the shrunk case, or "", if the reference raised
+    actual: str  # the words, or the exception, of the engine for the shrunk case
+
+
+class EngineStats(NamedTuple):
+    cases: int
+    seconds: float
+
+
+class FuzzReport(NamedTuple):
+    cases: int
+    failures: List[Failure]
+    stats: Dict[str, EngineStats]  # "reference" and every engine
+
+
+def reference(case: Case) -> str:
+    """The words of a case, worked out from the documented grammar of a number and a block table of its own, so that
+    the reference shares neither the parser nor the renderer of the engines that it checks."""
+    if not case.phrase:
+        return _reference_number(case.text)
+
+    number_like = [word for word in case.text.split(" ")
+                   if word[:1].isdigit() or (word[:1] == "-" and word[1:2].isdigit())]
+    return _reference_number(number_like[0]) if len(number_like) == 1 else "number invalid"
+
+
+# A number is an optional "-", then digits in groups of three (except for the first group, and for the last one of
+# a number without decimals), or digits without separators, then optional decimals. Whatever follows the last ASCII
+# digit is a suffix, which is ignored.
+_REFERENCE_NUMBER = re.compile(r"""
+    (?P<negative>-?)
+    (?:
+        (?P<grouped_with_decimals>[0-9]{1,3}(?:,[0-9]{3})+)\.(?P<group_decimals>[0-9]+)
+        | (?P<grouped>[0-9]{1,3}(?:,[0-9]{3})*,[0-9]+)
+        | (?P<plain>[0-9]+)(?:\.(?P<plain_decimals>[0-9]+))?
+    )
+    [^0-9]*""", re.VERBOSE | re.DOTALL)
+
+_REFERENCE_ONES = (
+    "", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven", "twelve",
+    "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen")
+_REFERENCE_TENS = ("", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety")
+_REFERENCE_DIGITS = ("zero",) + _REFERENCE_ONES[1:10]
+
+
+def _reference_block(block: int) -> str:
+    hundreds, rest = divmod(block, 100)
+    tens, ones = divmod(rest, 10)
+    if rest < 20:
+        rest_words = _REFERENCE_ONES[rest]
+    else:
+        rest_words = _REFERENCE_TENS[tens] + (f"-{_REFERENCE_ONES[ones]}" if ones else "")
+    if not hundreds:
+        return rest_words
+    return f"{_REFERENCE_ONES[hundreds]} hundred" + (f" and {rest_words}" if rest_words else "")
+
+
+_REFERENCE_BLOCKS = tuple(_reference_block(block) for block in range(1000))
+
+
+def _reference_number(word: str) -> str:
+    match = _REFERENCE_NUMBER.fullmatch(word)
+    if not match:
+        return "number invalid"
+
+    integer = (match["grouped_with_decimals"] or match["grouped"] or match["plain"]).replace(",", "")
+    decimals = match["group_decimals"] or match["plain_decimals"]
+    if not integer.strip("0"):  # zero, which is said without its decimals or sign
+        return "zero"
+
+    # Leading zeros are kept, and the blocks that they fill are said like every other block, e.g. "0001" is the
+    # blocks "000" and "001", i.e. " and one"
+    integer = integer.zfill(-(-len(integer) // 3) * 3)
+    blocks = [int(integer[i:i + 3]) for i in range(0, len(integer), 3)]
+    words = ["negative "] if match["negative"] else []
+    for i, block in enumerate(blocks):
+        if block:
+            if i > 0:
+                words.append(" and " if block < 100 else ", ")
+            words.append(_REFERENCE_BLOCKS[block])
+            if i < len(blocks) - 1:
+                words.append(f" {scales.scale_name(len(blocks) - i - 1)}")
+    if decimals:
+        words.append(f" point {' '.join(_REFERENCE_DIGITS[int(digit)] for digit in decimals)}")
+    return "".join(words)
+
+
+# The name that the reference is reported by, in the stats and in its failures
+REFERENCE = "reference"
+
+
+def build_engines() -> List[Engine]:
+    """Returns every accelerated engine, each converting a case the way the reference does."""
+    converter = niw.IncrementalConverter()  # shared by every case, so that it splices numbers of any kind together
+    table_converter = niw.IncrementalConverter(block_table=False)
+    persistent_cache = niw.PersistentCache(":memory:")
+
+    def twice(convert: Callable[[], str]) -> str:
+        convert()
+        return convert()  # from the cache, the second time
+
+    def render(convert: Callable[[], str]) -> str:
+        with sp.cache_policy(cached_blocks=False, cached_numbers=False):
+            return convert()  # every block of every number, without any caching
+
+    engines = [
+        Engine("renderer", _either(
+            lambda text: render(lambda: sp._number_in_words(text)),
+            lambda text: render(lambda: sp._number_in_words_from_phrase(text)))),
+        Engine("block_table", _either(
+            lambda text: niw.number_in_words(text, block_table=True),
+            lambda text: niw.number_in_words_from_phrase(text, block_table=True))),
+        Engine("block_cache", _either(
+            lambda text: niw.number_in_words(text, cached_blocks=True),
+            lambda text: niw.number_in_words_from_phrase(text, cached_blocks=True))),
+        Engine("number_cache", _either(
+            lambda text: twice(lambda: niw.number_in_words(text, cached_numbers=True)),
+            lambda text: twice(lambda: niw.number_in_words_from_phrase(text, cached_numbers=True)))),
+        Engine("locale", _either(
+            lambda text: niw.number_in_words(text, locale="en-GB"),
+            lambda text: niw.number_in_words_from_phrase(text, locale="en-GB"))),
+        Engine("style", _either(
+            lambda text: niw.number_in_words(text, style="cardinal", locale="en-GB", block_table=True),
+            lambda text: niw.number_in_words_from_phrase(text, style="cardinal", locale="en-GB"))),
+        Engine("batch", _either(lambda text: niw.numbers_in_words_batch([text])[0], None)),
+        Engine("int", _plain(lambda text: niw.number_in_words(int(text)), decimals=False)),
+        Engine("decimal", _plain(lambda text: niw.number_in_words(Decimal(text)), decimals=True)),
+        Engine("fraction", _plain(lambda text: niw.number_in_words(Fraction(text)), decimals=True, fraction=True)),
+        Engine("streaming", _either(
+            lambda text: "".join(niw.iter_number_in_words(text, chunk_size=1)),
+            lambda text: next(streaming.convert_lines([text]))[2])),
+        Engine("scanner", _scanner),
+        Engine("incremental", _either(converter.number_in_words, converter.number_in_words_from_phrase)),
+        Engine("incremental/rendered", _either(
+            table_converter.number_in_words, table_converter.number_in_words_from_phrase)),
+        Engine("persistent_cache", _either(lambda text: twice(lambda: persistent_cache.number_in_words(text)), None)),
+    ]
+
+    try:
+        import numpy
+    except ImportError:
+        return engines
+
+    def convert_int_array(text: str) -> str:
+        return niw.numbers_in_words_batch(numpy.array([int(text)], dtype=numpy.int64))[0]
+
+    engines.append(Engine("batch/numpy", _plain(convert_int_array, decimals=False, max_digits=18)))
+    return engines
+
+
+def _either(convert_number: Optional[Callable[[str], str]],
+            convert_phrase: Optional[Callable[[str], str]]) -> Callable[[Case], Optional[str]]:
+    def convert(case: Case) -> Optional[str]:
+        f = convert_phrase if case.phrase else convert_number
+        return None if f is None else f(case.text)
+
+    return convert
+
+
+def _plain(convert_number: Callable[[str], str], decimals: bool, fraction: bool = False,
+           max_digits: int = _MAX_INT_DIGITS) -> Callable[[Case], Optional[str]]:
+    # Only numbers that the value is said exactly like are converted, e.g. not "007", whose leading zero blocks are
+    # said, or "1.50" as a Fraction, which is 3/2
+    def convert(case: Case) -> Optional[str]:
+        text = case.text
+        if case.phrase or not _PLAIN_NUMBER.fullmatch(text) or len(text) > max_digits:
+            return None
+        if ("." in text) != decimals or (fraction and text.endswith("0")):
+            return None
+        return convert_number(text)
+
+    return convert
+
+
+def _scanner(case: Case) -> Optional[str]:
+    # The scanner finds every number in a phrase, so it is only compared on phrases with one number-like word, which
+    # the reference says "number invalid" for if the scanner finds no number in it
+    if not case.phrase or sum(map(sp._is_number_like, case.text.split(" "))) != 1:
+        return None
+    found = niw.numbers_in_words_from_phrase(case.text)
+    return found[0] if found else "number invalid"
+
+
+def generate_case(rng: random.Random) -> Case:
+    """Returns a random case: a number, an adversarial number (e.g. misplaced separators, two decimal points, a
+    negative prefix in the wrong place), a mutation of one, or a phrase with any number of them in it."""
+    if rng.random() < 0.25:
+        words = [rng.choice(_FILLER_WORDS) for _ in range(rng.randrange(6))]
+        for _ in range(rng.choice((0, 1, 1, 1, 2))):
+            words.insert(rng.randrange(len(words) + 1), generate_number(rng))
+        return Case(" ".join(words), True)
+
+    return Case(generate_number(rng), False)
+
+
+def generate_number(rng: random.Random) -> str:
+    digits = _generate_digits(rng)
+    kind = rng.randrange(10)
+
+    if kind == 0:  # separated by thousands, correctly
+        number = _group(digits)
+    elif kind == 1:  # separated, with one group a digit too long or too short
+        groups = _group(digits).split(",")
+        i = rng.randrange(len(groups))
+        groups[i] = groups[i] + "0" if rng.random() < 0.5 else groups[i][:-1]
+        number = ",".join(groups)
+    elif kind == 2:  # with decimals, some of them separated
+        number = f"{_group(digits) if rng.random() < 0.5 else digits}.{_generate_digits(rng)}"
+    elif kind == 3:  # with separators or decimal points where they don't belong
+        number = rng.choice((".", ",", "-", ",,", "..")).join(
+            (digits, _generate_digits(rng), *((_generate_digits(rng),) if rng.random() < 0.3 else ())))
+    elif kind == 4:  # leading zeros
+        number = "0" * rng.randrange(1, 8) + digits
+    elif kind == 5:  # the edges: empty, lone signs and points, zeros
+        number = rng.choice(("", "-", ".", ",", "0", "-0", "00", "000", "0.0", "0.5", ".5", "5.", "-.5", "-0.00",
+                             "1,000", "1,000,000.000", "999", "1000", "1001", "-1", "1" + "0" * 45))
+    elif kind == 6:  # mutated: characters inserted, removed or replaced
+        number = _group(digits) if rng.random() < 0.5 else f"{digits}.{_generate_digits(rng)}"
+        for _ in range(rng.randrange(1, 4)):
+            i = rng.randrange(len(number) + 1)
+            choice = rng.randrange(3)
+            if choice == 0:
+                number = number[:i] + rng.choice(_MUTATIONS) + number[i:]
+            elif choice == 1:
+                number = number[:i] + number[i + 1:]
+            else:
+                number = number[:i] + rng.choice(_MUTATIONS) + number[i + 1:]
+    else:
+        number = digits
+
+    if rng.random() < 0.2:
+        number = "-" + number
+    if rng.random() < 0.15:
+        number += rng.choice(_SUFFIXES)
+    return number
+
+
+def _generate_digits(rng: random.Random) -> str:
+    # Mostly short, sometimes up to the scales named with the Conway-Wechsler system, and now and then very long
+    length = rng.choice((rng.randrange(1, 7), rng.randrange(1, 19), rng.randrange(1, 60), rng.randrange(1, 400)))
+    return str(rng.randrange(1, 10)) + "".join(rng.choice("0123456789") for _ in range(length - 1))
+
+
+def _group(digits: str) -> str:
+    head = len(digits) % 3 or 3
+    return ",".join([digits[:head]] + [digits[i:i + 3] for i in range(head, len(digits), 3)])
+
+
+def run_fuzz(cases: int = 1000, seed: int = 0, engines: Optional[Sequence[Engine]] = None,
+             shrink: bool = True) -> FuzzReport:
+    """Converts cases random cases with the reference and every engine, and returns the failures and the timings.
+
+    Keyword arguments:
+        cases   -- default 1000, the number of cases that are generated.
+        seed    -- default 0, the seed of the cases, so that a run can be repeated.
+        engines -- default None, the engines to check. None checks every engine of build_engines.
+        shrink  -- default True, indicates whether failing cases are shrunk.
+    """
+    engines = build_engines() if engines is None else engines
+    rng = random.Random(seed)
+    seconds = {engine.name: 0.0 for engine in engines}
+    counts = {engine.name: 0 for engine in engines}
+    reference_seconds = 0.0
+    failures: List[Failure] = []
+    failed = set()  # each engine is reported once, for the first case it fails
+
+    for _ in range(cases):
+        case = generate_case(rng)
+        start = time.perf_counter()
+        try:
+            expected = reference(case)
+        except Exception:
+            # There is nothing to compare the engines with, so the case fails the reference itself
+            if REFERENCE not in failed:
+                failed.add(REFERENCE)
+                failures.append(_reference_failure(case, shrink))
+            continue
+        finally:
+            reference_seconds += time.perf_counter() - start
+
+        for engine in engines:
+            start = time.perf_counter()
+            actual = _run(engine, case)
+            elapsed = time.perf_counter() - start
+            if actual is None:
+                continue
+            seconds[engine.name] += elapsed
+            counts[engine.name] += 1
+
+            if actual != expected and engine.name not in failed:
+                failed.add(engine.name)
+                shrunk = shrink_case(engine, case) if shrink else case
+                failures.append(Failure(engine.name, case, shrunk, reference(shrunk), str(_run(engine, shrunk))))
+
+    stats = {REFERENCE: EngineStats(cases, reference_seconds)}
+    stats.update((name, EngineStats(counts[name], seconds[name])) for name in seconds)
+    return FuzzReport(cases, failures, stats)
+
+
+def _reference_failure(case: Case, shrink: bool) -> Failure:
+    shrunk = shrink_case(Engine(REFERENCE, reference), case) if shrink else case
+    try:
+        actual = reference(shrunk)
+    except Exception as e:
+        actual = f"{type(e).__name__}: {e}"
+    return Failure(REFERENCE, case, shrunk, "", actual)
+
+
+def _run(engine: Engine, case: Case) -> Optional[str]:
+    # Exceptions are answers too, that never match the reference, which doesn't raise for the cases it is run on
+    try:
+        return engine.convert(case)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def _fails(engine: Engine, case: Case) -> bool:
+    # The reference fails by raising. Any other engine fails by disagreeing with it, on a case it doesn't raise for.
+    try:
+        expected = reference(case)
+    except Exception:
+        return engine.name == REFERENCE
+    if engine.name == REFERENCE:
+        return False
+    actual = _run(engine, case)
+    return actual is not None and actual != expected
+
+
+def shrink_case(engine: Engine, case: Case) -> Case:
+    """Returns the smallest case found that engine still fails: with as many characters taken out as possible, and
+    then as many of the others made "1" or "0"."""
+    text = case.text
+    changed = True
+    while changed:
+        changed = False
+        for candidate in _iter_smaller(text):
+            if _fails(engine, Case(candidate, case.phrase)):
+                text, changed = candidate, True
+                break
+
+    return Case(text, case.phrase)
+
+
+def _iter_smaller(text: str):
+    # Every candidate is shorter, or has fewer characters other than "0" and "1", or fewer other than "0", so that
+    # shrinking always ends
+    size = len(text) // 2
+    while size >= 1:
+        for start in range(0, len(text), size):
+            yield text[:start] + text[start + size:]
+        size //= 2
+
+    for i, c in enumerate(text):
+        if c != "0":
+            yield text[:i] + "0" + text[i + 1:]
+        if c not in "01":
+            yield text[:i] + "1" + text[i + 1:]
+
+
+def print_report(report: FuzzReport, output=sys.stdout):
+    print(f"{report.cases} cases\n", file=output)
+    reference_stats = report.stats[REFERENCE]
+    reference_per_case = reference_stats.seconds / reference_stats.cases if reference_stats.cases else 0.0
+    print(f"{'engine':<22} {'cases':>7} {'µs/case':>9} {'vs reference':>13}", file=output)
+    for name, stats in report.stats.items():
+        per_case = stats.seconds / stats.cases if stats.cases else 0.0
+        ratio = per_case / reference_per_case if reference_per_case else 0.0
+        print(f"{name:<22} {stats.cases:>7} {per_case * 1e6:>9.3f} {ratio:>12.2f}x", file=output)
+
+    for failure in report.failures:
+        problem = "raises" if failure.engine == REFERENCE else "disagrees with the reference"
+        print(f"\n{failure.engine} {problem} on {failure.case.text[:200]!r}"
+              f"{' (a phrase)' if failure.case.phrase else ''}, shrunk to {failure.shrunk.text!r}:", file=output)
+        if failure.engine != REFERENCE:
+            print(f"    expected: {failure.expected[:200]!r}", file=output)
+        print(f"    actual:   {failure.actual[:200]!r}", file=output)
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    parser = ap.ArgumentParser(description="check every engine of the numbers_in_words package against the reference")
+    parser.add_argument("--cases", type=int, default=10000, help="the number of cases to generate. Default: 10000.")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the cases. Default: 0.")
+    parser.add_argument(
+        "--engines",
+        nargs="*",
+        help="check only the engines whose names start with any of these e.g. int or batch. Every engine is checked "
+             "if none are given.")
+    parser.add_argument("--no-shrink", action="store_true", help="report failing cases as they were generated.")
+    args = parser.parse_args(arguments)
+
+    engines = [engine for engine in build_engines() if not args.engines or engine.name.startswith(tuple(args.engines))]
+    if not engines:
+        parser.error(f"no engines start with: {', '.join(args.engines)}")
+
+    report = run_fuzz(args.cases, args.seed, engines, not args.no_shrink)
+    print_report(report, sys.stdout)
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,16 @@
 import argparse as ap
+import sys
 from typing import List
 import timeit
 
 import numbers_in_words as niw
 
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# The FORMATTERS of the streaming module, which is only imported for --stream, so that the other options don't pay
+# for it at startup
+OUTPUT_FORMATS = ("tsv", "jsonl")
+
 
 def demo():
     test_cases: List[str] = [
@@ -34,29 +41,68 @@ def run_file(file_name):
             print(f"Outcome: {niw.number_in_words_from_phrase(line)}\n")
 
 
+def run_stream(file_name, output_format="tsv", input_encoding="utf-8", output_encoding="utf-8",
+               buffer_size=DEFAULT_BUFFER_SIZE, workers=None, use_mmap=False):
+    # Reads FILE (or stdin, if FILE is "-" or not given) and writes one result per line to stdout
+    from numbers_in_words._numbers_in_words_modules import streaming
+
+    start = timeit.default_timer()
+
+    with open(sys.stdout.fileno(), "w", encoding=output_encoding, buffering=buffer_size, closefd=False) as fwrite:
+        if workers:
+            results = niw.convert_file_parallel(file_name, workers, use_mmap=use_mmap, encoding=input_encoding)
+            count = streaming.write_results(results, fwrite, output_format)
+        else:
+            if file_name and file_name != "-":
+                fread = open(file_name, "r", encoding=input_encoding, buffering=buffer_size)
+            else:
+                fread = open(sys.stdin.fileno(), "r", encoding=input_encoding, buffering=buffer_size, closefd=False)
+
+            with fread:
+                count = streaming.write_results(streaming.convert_lines(fread), fwrite, output_format)
+
+    elapsed = timeit.default_timer() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"Converted {count} lines in {elapsed:.3f}s ({rate:,.0f} lines/s)", file=sys.stderr)
+
+
+def run_column(file_name, column, output=None, words_column=None, batch_size=10000, input_encoding="utf-8",
+               output_encoding="utf-8", buffer_size=DEFAULT_BUFFER_SIZE):
+    # Writes FILE (or stdin, if FILE is "-") with a column of words added to OUTPUT (or stdout, for CSV)
+    start = timeit.default_timer()
+
+    if file_name.endswith((".parquet", ".pq")):
+        count = niw.convert_column(file_name, output, column, words_column, batch_size=batch_size)
+    else:
+        fread = open(sys.stdin.fileno() if file_name == "-" else file_name, "r", encoding=input_encoding,
+                     buffering=buffer_size, newline="", closefd=file_name != "-")
+        fwrite = open(output or sys.stdout.fileno(), "w", encoding=output_encoding, buffering=buffer_size,
+                      newline="", closefd=bool(output))
+        with fread, fwrite:
+            count = niw.convert_column(fread, fwrite, column, words_column, batch_size=batch_size)
+
+    elapsed = timeit.default_timer() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"Converted {count} rows in {elapsed:.3f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+def run_server(address):
+    from numbers_in_words._numbers_in_words_modules import server
+
+    address = server.parse_address(address)
+    print(f"Serving on {address}, until stopped with Ctrl+C", file=sys.stderr)
+    try:
+        server.serve(address)
+    except KeyboardInterrupt:
+        pass
+
+
 def time():
-    setup = "import numbers_in_words as niw"
-
-    statement1 = "niw.number_in_words_from_phrase('99', cached_blocks=False)"
-    statement2 = "niw.number_in_words_from_phrase('99')"
-    statement3 = "niw.number_in_words_from_phrase('99', cached_numbers=True)"
-    statement4 = "niw.number_in_words_from_phrase('99999999999999999999', cached_blocks=False)"
-    statement5 = "niw.number_in_words_from_phrase('99999999999999999999')"
-    statement6 = "niw.number_in_words_from_phrase('99999999999999999999', cached_numbers=False)"
-
-    t1 = round(timeit.timeit(stmt=statement1, setup=setup, number=100000), 5)
-    print(f"Convert 99 to words, without caching, 100 000 times                                 : {t1}s")
-    t2 = round(timeit.timeit(stmt=statement2, setup=setup, number=100000), 5)
-    print(f"Convert 99 to words, with block caching, 100 000 times                              : {t2}s")
-    t3 = round(timeit.timeit(stmt=statement3, setup=setup, number=100000), 5)
-    print(f"Convert 99 to words, with block and number caching, 100 000 times                   : {t3}s")
-
-    t4 = round(timeit.timeit(stmt=statement4, setup=setup, number=100000), 5)
-    print(f"Convert 99999999999999999999 to words, without caching, 100 000 times               : {t4}s")
-    t5 = round(timeit.timeit(stmt=statement5, setup=setup, number=100000), 5)
-    print(f"Convert 99999999999999999999 to words, with block caching, 100 000 times            : {t5}s")
-    t6 = round(timeit.timeit(stmt=statement6, setup=setup, number=100000), 5)
-    print(f"Convert 99999999999999999999 to words, with block and number caching, 100 000 times : {t6}s")
+    # A quick run of the benchmark suite. Run benchmark_suite.py itself to save results and compare them.
+    import benchmark_suite  # imported here, so that the other options don't pay for it at startup
+
+    print("Time per item, the median of 3 runs ± standard deviation:\n")
+    benchmark_suite.run_suite(benchmark_suite.build_cases(), size=200, repeats=3, report=benchmark_suite.print_result)
 
 
 if __name__ == "__main__":
@@ -74,18 +120,119 @@ if __name__ == "__main__":
         type=str,
         help="process the contents of FILE, if it exists.")
 
+    parser.add_argument(
+        "-s", "--stream",
+        action="store_true",
+        help="stream the contents of FILE (or stdin, if no FILE is given or FILE is -) to stdout, "
+             "as one machine-readable result per line.")
+
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="tsv",
+        help="the output format of --stream: tsv (line, number, words) or jsonl. Default: tsv.")
+
+    parser.add_argument(
+        "--input-encoding",
+        default="utf-8",
+        help="the encoding of the input of --stream and --column. Default: utf-8.")
+
+    parser.add_argument(
+        "--output-encoding",
+        default="utf-8",
+        help="the encoding of the output of --stream and --column. Default: utf-8.")
+
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        help=f"the size in bytes of the read and write buffers of --stream and --column. "
+             f"Default: {DEFAULT_BUFFER_SIZE}.")
+
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        help="convert FILE with --stream in parallel, using WORKERS processes.")
+
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="with --workers, have the worker processes memory-map FILE instead of reading it.")
+
+    parser.add_argument(
+        "-c", "--column",
+        help="add a column with the value in words of COLUMN of FILE (CSV, or Parquet if pyarrow is installed and "
+             "FILE ends in .parquet), and write the result to OUTPUT. CSV is read from stdin if FILE is -, and "
+             "written to stdout if there is no OUTPUT.")
+
+    parser.add_argument(
+        "-o", "--output",
+        help="the file that --column writes to.")
+
+    parser.add_argument(
+        "--words-column",
+        help="the name of the column of words that --column adds. Default: COLUMN_words.")
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10000,
+        help="the number of rows that --column reads, converts and writes at a time. Default: 10000.")
+
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="run a conversion server on ADDRESS: a path for a Unix domain socket, PORT for a TCP port on "
+             "localhost, or HOST:PORT. See ConversionClient.")
+
     parser.add_argument(
         "-t", "--timeit",
         action="store_true",
-        help="display the results of some timed runs, to get a sense of what the cached functionality achieves.")
+        help="display the results of a quick run of the benchmark suite, to get a sense of what the cached "
+             "functionality achieves. Run benchmark_suite.py for the full suite.")
+
+    parser.add_argument(
+        "--write-table-snapshot",
+        metavar="SNAPSHOT",
+        help="write the block tables of every locale to SNAPSHOT, which is loaded instead of rendering "
+             "the tables when the NUMBERS_IN_WORDS_TABLE_SNAPSHOT environment variable is set to its path.")
 
     args = parser.parse_args()
 
+    if args.workers is not None:
+        if args.workers < 1:
+            parser.error("--workers has to be at least 1")
+        if not args.stream or not args.file or args.file == "-":
+            parser.error("--workers can only be used with --stream and a FILE")
+
+    if args.column is not None:
+        if not args.file:
+            parser.error("--column needs a FILE")
+        if args.file.endswith((".parquet", ".pq")) and not args.output:
+            parser.error("--column needs an OUTPUT for Parquet files")
+        if args.batch_size < 1:
+            parser.error("--batch-size has to be at least 1")
+
+    if args.write_table_snapshot:
+        from numbers_in_words._numbers_in_words_modules import locales
+
+        locales.write_table_snapshot(args.write_table_snapshot)
+        print(f"Wrote the block tables of {', '.join(locales.LOCALES)} to {args.write_table_snapshot}", file=sys.stderr)
+
     if args.demo:
         demo()
 
-    if args.file:
+    if args.column is not None:
+        run_column(args.file, args.column, args.output, args.words_column, args.batch_size, args.input_encoding,
+                   args.output_encoding, args.buffer_size)
+    elif args.stream:
+        run_stream(args.file, args.format, args.input_encoding, args.output_encoding, args.buffer_size,
+                   args.workers, args.mmap)
+    elif args.file:
         run_file(args.file)
 
     if args.timeit:
         time()
+
+    if args.serve:
+        run_server(args.serve)
@@ -6,14 +6,44 @@ NAME
 DESCRIPTION
     A small module that helps with the output of the value of an integer in words.
     The package makes two functions available to achieve this, namely 'number_in_words'
-    and 'number_in_words_from_phrase'.
+    and 'number_in_words_from_phrase'. Large collections of numbers can be converted in one call
+    with 'numbers_in_words_batch', and large files in parallel with 'convert_file_parallel'.
+    'convert_column' adds the value in words of a column of a CSV or Parquet file to the file.
+    'ConversionServer' converts numbers for many processes through one shared cache, and
+    'ConversionClient' sends it requests over a Unix domain socket or TCP.
+    asyncio applications can use 'number_in_words_async', 'number_in_words_from_phrase_async'
+    and 'convert_lines_async', which don't block the event loop on large inputs.
 
     The two functions allow for the optional use of an LRU cached, at the expense
-    of a little bit of additional memory consumption.
+    of a little bit of additional memory consumption. Caching can be switched on or off per call, or
+    for a block of code with 'cache_policy', without affecting other threads or asyncio tasks.
+    'cache_info' reports how well the caches are doing and 'configure_cache' sets their size and
+    eviction policy (LRU, LFU or TTL). 'PersistentCache' keeps results in an SQLite database on disk,
+    which outlives the process and can be shared by several processes.
 
-    The range of numbers that can be expressed is any negative or positive number where the whole
-    number component does not exceed 999,999,999,999,999,999,999,999,999,999,999,999,999,999
-    (14 groups of three 9's). The decimal component is limited only by your machine's memory.
+    'words_to_number' does the reverse of 'number_in_words', and turns words back into digits.
+
+    Numbers can be written and said the way a region does it by passing a locale, e.g. locale="en-US"
+    or locale="en-IN". More locales can be added with 'register_locale'.
+
+    Numbers can also be said as ordinals ("twenty-first"), as on a cheque ("fifty-four and 45/100") or as an
+    amount of money ("fifty-four rand and forty-five cents"), by passing style="ordinal", "cheque" or
+    "currency". More currencies can be added with 'register_currency'.
+
+    'IncrementalConverter' converts a counter that changes a little at a time, rendering only the blocks that
+    changed since its last value.
+
+    'profile' breaks down the time spent converting numbers in a with block by stage, and
+    'add_instrumentation_hook' sends the same timings and counters to a metrics exporter. Neither
+    costs anything when it isn't in use.
+
+    number_in_words also accepts ints, Decimals and Fractions, which are converted without being parsed.
+
+    The contents of the package are imported on first use, so that importing it is quick.
+
+    There is no limit to the range of numbers that can be expressed, other than your machine's memory.
+    Scales beyond "tredecillion" (10^42) are named with the Conway-Wechsler system e.g. "quattuordecillion",
+    "vigintillion", "centillion" and "millinillion".
 
 ASSUMPTIONS
     - Numbers can have both whole number and decimal components.
@@ -22,15 +52,40 @@ ASSUMPTIONS
         number.
     - Suffixes ("km", "kg", "ikko", etc.) can exist and are treated as arbitrary i.e. we don't get
         involved with the meaning of "ikko".
-    - Decimal points are "."
-    - Thousands separators are "," and are optional. However, if they are present in a string they
-        must be used concistently through the string.
-    - Only phrases with one number in them will be successfully procesed. If it appears that there
-        is more than one number, an invalid response is returned.
+    - Decimal points are "." (or the decimal point of the locale, e.g. "," in "en-150")
+    - Thousands separators are "," (or the separator of the locale) and are optional. However, if they
+        are present in a string they must be used concistently through the string.
+    - Only phrases with one number in them will be successfully procesed by number_in_words_from_phrase.
+        If it appears that there is more than one number, an invalid response is returned. Use
+        numbers_in_words_from_phrase to get the value of every number in a phrase.
 
 CONTENTS
     number_in_words (function)
     number_in_words_from_phrase (function)
+    numbers_in_words_from_phrase (function)
+    iter_number_in_words (generator function)
+    write_number_in_words (function)
+    IncrementalConverter (class)
+    words_to_number (function)
+    numbers_in_words_batch (function)
+    convert_file_parallel (function)
+    convert_column (function)
+    ConversionServer (class)
+    ConversionClient (class)
+    number_in_words_async (coroutine function)
+    number_in_words_from_phrase_async (coroutine function)
+    convert_lines_async (async generator function)
+    cache_policy (context manager)
+    cache_info (function)
+    configure_cache (function)
+    PersistentCache (class)
+    Locale (class)
+    profile (context manager)
+    add_instrumentation_hook (function)
+    remove_instrumentation_hook (function)
+    register_locale (function)
+    Currency (class)
+    register_currency (function)
     _conditional_cache (module)
     _string_processing (module)
 
@@ -40,4 +95,75 @@ AUTHOR:
 """
 
 
-from ._numbers_in_words_modules.string_processing import number_in_words, number_in_words_from_phrase
+# Rather than typing.TYPE_CHECKING, which would import typing (the largest part of the import time) for a constant
+_TYPE_CHECKING = False
+
+# name : the module that it is imported from, on first use. Nothing is imported until it is needed, so that e.g. a
+# command line tool that only calls number_in_words doesn't pay for asyncio and multiprocessing at startup.
+_lazy_members = {
+    "number_in_words": "string_processing",
+    "number_in_words_from_phrase": "string_processing",
+    "cache_policy": "string_processing",
+    "iter_number_in_words": "string_processing",
+    "write_number_in_words": "string_processing",
+    "IncrementalConverter": "incremental",
+    "numbers_in_words_from_phrase": "scanner",
+    "numbers_in_words_batch": "batch",
+    "cache_info": "conditional_cache",
+    "configure_cache": "conditional_cache",
+    "convert_file_parallel": "parallel",
+    "convert_column": "columns",
+    "ConversionServer": "server",
+    "ConversionClient": "server",
+    "Locale": "locales",
+    "register_locale": "locales",
+    "Currency": "styles",
+    "register_currency": "styles",
+    "words_to_number": "word_parsing",
+    "PersistentCache": "persistent_cache",
+    "profile": "instrumentation",
+    "add_instrumentation_hook": "instrumentation",
+    "remove_instrumentation_hook": "instrumentation",
+    "number_in_words_async": "async_api",
+    "number_in_words_from_phrase_async": "async_api",
+    "convert_lines_async": "async_api",
+}
+
+__all__ = list(_lazy_members)
+
+
+def __getattr__(name: str):
+    try:
+        module = _lazy_members[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'") from None
+
+    # __import__ rather than importlib.import_module, which would import importlib (and warnings) at startup. With a
+    # fromlist, it returns the module itself rather than the package.
+    value = getattr(__import__(f"{__name__}._numbers_in_words_modules.{module}", fromlist=[name]), name)
+    globals()[name] = value  # so that __getattr__ is only called once per name
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_members))
+
+
+if _TYPE_CHECKING:
+    from ._numbers_in_words_modules.string_processing import (
+        number_in_words, number_in_words_from_phrase, cache_policy, iter_number_in_words, write_number_in_words)
+    from ._numbers_in_words_modules.incremental import IncrementalConverter
+    from ._numbers_in_words_modules.scanner import numbers_in_words_from_phrase
+    from ._numbers_in_words_modules.batch import numbers_in_words_batch
+    from ._numbers_in_words_modules.conditional_cache import cache_info, configure_cache
+    from ._numbers_in_words_modules.parallel import convert_file_parallel
+    from ._numbers_in_words_modules.columns import convert_column
+    from ._numbers_in_words_modules.server import ConversionServer, ConversionClient
+    from ._numbers_in_words_modules.locales import Locale, register_locale
+    from ._numbers_in_words_modules.styles import Currency, register_currency
+    from ._numbers_in_words_modules.word_parsing import words_to_number
+    from ._numbers_in_words_modules.persistent_cache import PersistentCache
+    from ._numbers_in_words_modules.instrumentation import (
+        profile, add_instrumentation_hook, remove_instrumentation_hook)
+    from ._numbers_in_words_modules.async_api import (
+        number_in_words_async, number_in_words_from_phrase_async, convert_lines_async)
@@ -0,0 +1,138 @@
+"""Help on module async_api:
+
+NAME
+    async_api
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    asyncio-friendly versions of number_in_words and number_in_words_from_phrase, and an async generator that
+    converts a stream of lines. Small inputs are converted in the event loop, since handing them to another
+    thread costs more than converting them. Large inputs (and batches, when asked to) are offloaded to an
+    executor, so that the event loop isn't blocked while they are converted.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
+
+from . import streaming
+from . import string_processing as sp
+
+# Inputs of at least this many characters are offloaded to an executor by default
+OFFLOAD_THRESHOLD = 10000
+
+
+async def number_in_words_async(
+        number: sp.Number, offload: Optional[bool] = None, executor: Optional[Executor] = None, **kwargs) -> str:
+    """Returns the value of an integer-like string, an int, a Decimal or a Fraction in words, without blocking the
+    event loop on large inputs.
+
+    Arguments:
+        number -- a string, representing a number, or an int, Decimal or Fraction
+
+    Keyword arguments:
+        offload  -- default None, indicates whether the conversion is done by the executor. None offloads inputs
+                        of at least OFFLOAD_THRESHOLD characters (of the number as a string, for numbers that
+                        aren't strings).
+        executor -- default None, the executor to offload to. None uses the event loop's default executor.
+
+    Any other keyword arguments are passed on to number_in_words.
+    """
+    return await _run(partial(sp.number_in_words, number, **kwargs), _size(number), offload, executor)
+
+
+async def number_in_words_from_phrase_async(
+        phrase: str, offload: Optional[bool] = None, executor: Optional[Executor] = None, **kwargs) -> str:
+    """Finds a number-like substring in a phrase and returns the value in words, without blocking the event loop
+    on large inputs.
+
+    Arguments:
+        phrase -- a collection of words, separated by spaces
+
+    Keyword arguments:
+        offload  -- default None, indicates whether the conversion is done by the executor. None offloads inputs
+                        of at least OFFLOAD_THRESHOLD characters.
+        executor -- default None, the executor to offload to. None uses the event loop's default executor.
+
+    Any other keyword arguments are passed on to number_in_words_from_phrase.
+    """
+    return await _run(partial(sp.number_in_words_from_phrase, phrase, **kwargs), _size(phrase), offload, executor)
+
+
+async def convert_lines_async(
+        lines: AsyncIterable[str], batch_size=100, offload=False,
+        executor: Optional[Executor] = None) -> AsyncIterator[Tuple[str, str, str]]:
+    """Converts a stream of lines, yielding control to the event loop after every batch of lines.
+
+    Arguments:
+        lines -- an async iterable of lines, each of which may contain a number
+
+    Keyword arguments:
+        batch_size -- default 100, the number of lines converted at a time. Smaller batches keep the event loop
+                        more responsive, larger batches have less overhead.
+        offload    -- default False, indicates whether batches are converted by the executor rather than in the
+                        event loop.
+        executor   -- default None, the executor to offload to. None uses the event loop's default executor.
+
+    Yields:
+        Tuple[str, str, str] -- the line (without its line ending), the number found in it and that number in
+                                    words, for every line, in order.
+    """
+    batch: List[str] = []
+    async for line in lines:
+        batch.append(line)
+        if len(batch) == batch_size:
+            for result in await _convert_batch(batch, offload, executor):
+                yield result
+            batch = []
+
+    if batch:
+        for result in await _convert_batch(batch, offload, executor):
+            yield result
+
+
+async def _convert_batch(batch: List[str], offload: bool, executor: Optional[Executor]) -> List[Tuple[str, str, str]]:
+    if offload:
+        return await _run(partial(_convert_lines, batch), 0, True, executor)
+
+    results = _convert_lines(batch)
+    await asyncio.sleep(0)  # let other tasks run before the next batch
+    return results
+
+
+def _convert_lines(lines: List[str]) -> List[Tuple[str, str, str]]:
+    return list(streaming.convert_lines(lines))
+
+
+def _size(number: sp.Number) -> int:
+    # The number of characters of the input, which ints, Decimals and Fractions don't have a len() of
+    if isinstance(number, str):
+        return len(number)
+    if isinstance(number, int):
+        # About its number of digits, since str() refuses ints of more than sys.get_int_max_str_digits() digits
+        return abs(number).bit_length() * 30103 // 100000 + 1
+    if hasattr(number, "denominator"):  # a Fraction, whose numerator and denominator are ints
+        return _size(number.numerator) + _size(number.denominator)
+    return len(str(number))
+
+
+async def _run(func, size: int, offload: Optional[bool], executor: Optional[Executor]):
+    if offload is None:
+        offload = size >= OFFLOAD_THRESHOLD
+
+    if not offload:
+        return func()
+
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):  # contexts can't be sent to another process
+        return await loop.run_in_executor(executor, func)
+
+    # Run in a copy of the current context, so that a cache_policy set by the calling task still applies
+    return await loop.run_in_executor(executor, contextvars.copy_context().run, func)
@@ -0,0 +1,98 @@
+"""Help on module batch:
+
+NAME
+    batch
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from . import locales
+from . import string_processing as sp
+
+_MAX_INT64_BLOCKS = 7  # 18,446,744,073,709,551,615 is the largest (unsigned) 64 bit integer, and it has 7 blocks
+
+
+def numbers_in_words_batch(numbers: Iterable[sp.Number]) -> List[str]:
+    """Returns the values of a collection of numbers in words.
+
+    Arguments:
+        numbers -- an iterable of integer-like strings, ints, Decimals and/or Fractions. NumPy integer and object
+                    arrays are accepted too, and integer arrays are split into blocks with vectorised arithmetic.
+
+    Returns:
+        List[str] -- the value of each number in words, in the order the numbers were given. Each value is exactly
+                        what number_in_words(number) returns.
+    """
+    dtype = getattr(numbers, "dtype", None)
+    if dtype is not None and dtype.kind in "iu":
+        return _get_numbers_in_words_from_int_array(numbers)
+
+    # Repeated values are only converted once. The type is part of the key, since values of different types can be
+    # equal and still have different words (e.g. 1 and Decimal("1.0")), or not be numbers at all (e.g. True).
+    converted: Dict[Tuple[type, Any], str] = {}
+    results = []
+    for number in numbers:
+        key = (type(number), number)
+        words = converted.get(key)
+        if words is None:
+            words = converted[key] = _get_number_in_words(number)
+        results.append(words)
+
+    return results
+
+
+def _get_number_in_words(number: sp.Number) -> str:
+    if isinstance(number, str):
+        parts = sp._get_number_parts_from_word.__wrapped__(number)
+        return sp._get_number_in_words_from_parts(parts, block_table=True)
+
+    return sp._get_number_in_words_from_value(number, locales.EN_GB)
+
+
+def _get_numbers_in_words_from_int_array(array) -> List[str]:
+    import numpy
+
+    # Every distinct value is only rendered once, however often it appears
+    values, inverse = numpy.unique(numpy.ravel(array), return_inverse=True)
+
+    if values.dtype.kind == "i":
+        negative = values < 0
+        # -(value + 1) can't overflow, not even for the smallest int64
+        magnitudes = numpy.where(negative, -(values + 1), values).astype(numpy.uint64) + negative
+    else:
+        negative = numpy.zeros(values.shape, dtype=bool)
+        magnitudes = values.astype(numpy.uint64)
+
+    columns = []
+    for _ in range(_MAX_INT64_BLOCKS):
+        magnitudes, block = numpy.divmod(magnitudes, numpy.uint64(1000))
+        columns.append(block)
+    blocks = numpy.stack(columns[::-1], axis=1)  # Most significant block first
+
+    # The number of leading zero blocks to skip. Zero itself is rendered from its last block.
+    first_blocks = numpy.where(blocks.any(axis=1), (blocks != 0).argmax(axis=1), _MAX_INT64_BLOCKS - 1)
+
+    rendered = [
+        sp._get_number_in_words_from_blocks(row[first:], neg)
+        for row, first, neg in zip(blocks.tolist(), first_blocks.tolist(), negative.tolist())]
+
+    return [rendered[i] for i in numpy.ravel(inverse).tolist()]
+
+
+def _iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    # Splits items into lists of size items, and a last, shorter one with whatever is left, without reading ahead
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,192 @@
+"""Help on module columns:
+
+NAME
+    columns
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Adds a column with the value in words of a numeric column of a CSV or Parquet file, reading and writing the
+    file in batches of rows, so that memory use stays bounded however large the file is.
+
+    Every batch is converted through the same cache of the values converted so far (up to cache_size of them,
+    evicting the one used least recently) and the precomputed block tables, so that values that repeat throughout a
+    file are only converted once. Parquet files are read and written with pyarrow, which is only needed (and
+    imported) for Parquet files.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import csv
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, List, Optional, TextIO, Union
+
+from . import batch as bt
+from . import conditional_cache as cc
+from . import locales
+from . import string_processing as sp
+
+FILE_FORMATS = ("csv", "parquet")
+
+# The words of a value that isn't a number
+INVALID = "number invalid"
+
+# Converts the values of a batch of rows into words
+Converter = Callable[[List[Any]], List[Optional[str]]]
+
+
+def convert_column(
+        source: Union[str, TextIO], destination: Union[str, TextIO], column: str, words_column: Optional[str] = None,
+        file_format: Optional[str] = None, batch_size: int = 10000, cache_size: int = 100000,
+        locale: sp.LocaleArgument = None, encoding: str = "utf-8", delimiter: str = ",") -> int:
+    """Copies a CSV or Parquet file, with a column added that has the value in words of one of its columns.
+
+    Example:
+        convert_column("invoices.csv", "invoices_in_words.csv", "total")
+
+    Arguments:
+        source      -- the path of the file to read, or for CSV, a text file
+        destination -- the path of the file to write, or for CSV, a text file
+        column      -- the name of the column of numbers
+
+    Keyword arguments:
+        words_column -- default None, the name of the column of words. None is the name of column + "_words".
+        file_format  -- default None, "csv" or "parquet". None is "parquet" for paths that end in ".parquet" or
+                        ".pq", and "csv" otherwise.
+        batch_size   -- default 10000, the number of rows that are read, converted and written at a time.
+        cache_size   -- default 100000, the most values that are kept, to be converted only once.
+                        The value that was used least recently is evicted first.
+        locale       -- default None, the name of the locale or a Locale. None is "en-GB".
+        encoding     -- default "utf-8", the encoding of CSV files.
+        delimiter    -- default ",", the delimiter of CSV files.
+
+    Returns:
+        int -- the number of rows converted.
+
+    Values that aren't numbers are "number invalid", and empty values and nulls have no words. Parquet files need
+    pyarrow to be installed.
+    """
+    if file_format is None:
+        file_format = "parquet" if isinstance(source, str) and source.endswith((".parquet", ".pq")) else "csv"
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"file_format must be one of {', '.join(FILE_FORMATS)}, not '{file_format}'")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be 1 or more, not {batch_size}")
+
+    words_column = f"{column}_words" if words_column is None else words_column
+    convert = _get_converter(locales.EN_GB if locale is None else locales.get_locale(locale), cache_size)
+
+    if file_format == "parquet":
+        return _convert_parquet(source, destination, column, words_column, batch_size, convert)
+
+    with _open(source, "r", encoding) as fread, _open(destination, "w", encoding) as fwrite:
+        return _convert_csv(fread, fwrite, column, words_column, batch_size, convert, delimiter)
+
+
+def _get_converter(locale: locales.Locale, cache_size: int) -> Converter:
+    # The cache is shared by every batch of the file. It is a store of the LRU cache, rather than the cache, since
+    # it is neither switched on and off nor reported, and it evicts the value that was used least recently, so that
+    # the values that repeat throughout the file stay in it. The values of a column all have the same type, so
+    # values that are equal (e.g. 5 and 5.0) but have different words never share an entry.
+    converted = cc._LRUStore(cache_size)
+
+    def convert(values: List[Any]) -> List[Optional[str]]:
+        words = []
+        for value in values:
+            result = converted.get(value)
+            if result is cc._MISSING:
+                result = _get_words(value, locale)
+                converted.put(value, result)
+            words.append(result)
+        return words
+
+    return convert
+
+
+def _get_words(value: Any, locale: locales.Locale) -> Optional[str]:
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        parts = sp._get_number_parts_from_word.__wrapped__(value, locale)
+        if not parts.is_valid:
+            return INVALID
+        return sp._get_number_in_words_from_parts(parts, True, locale)
+
+    if isinstance(value, float):
+        # Floats are said as their shortest repr, e.g. 2.675 is "two point six seven five", not as their binary value
+        if value != value or value in (float("inf"), float("-inf")):
+            return INVALID
+        from decimal import Decimal
+
+        value = Decimal(repr(value))
+
+    try:
+        return sp._get_number_in_words_from_value(value, locale)
+    except (TypeError, ValueError):
+        return INVALID
+
+
+def _open(file: Union[str, TextIO], mode: str, encoding: str) -> ContextManager[TextIO]:
+    if isinstance(file, str):
+        return open(file, mode, encoding=encoding, newline="")
+    return nullcontext(file)  # closed by whoever opened it
+
+
+def _convert_csv(fread: TextIO, fwrite: TextIO, column: str, words_column: str, batch_size: int,
+                 convert: Converter, delimiter: str) -> int:
+    reader = csv.reader(fread, delimiter=delimiter)
+    writer = csv.writer(fwrite, delimiter=delimiter, lineterminator="\n")
+
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("the file is empty, and has no header")
+    index = _get_column_index(header, column, words_column)
+    writer.writerow(header + [words_column])
+    width = len(header)
+
+    count = 0
+    for rows in bt._iter_batches(reader, batch_size):
+        words = convert([row[index] if index < len(row) else None for row in rows])
+        # Rows with fewer values than the header are filled up, so that the words are in their column
+        writer.writerows((row if len(row) >= width else row + [""] * (width - len(row))) + [w]
+                         for row, w in zip(rows, words))
+        count += len(rows)
+
+    return count
+
+
+def _convert_parquet(source, destination, column: str, words_column: str, batch_size: int,
+                     convert: Converter) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow is needed for Parquet files, and isn't installed") from None
+
+    reader = pq.ParquetFile(source)
+    schema = reader.schema_arrow
+    index = _get_column_index(schema.names, column, words_column)
+    field = pa.field(words_column, pa.string())
+
+    count = 0
+    with pq.ParquetWriter(destination, schema.append(field)) as writer:
+        for batch in reader.iter_batches(batch_size=batch_size):
+            words = pa.array(convert(batch.column(index).to_pylist()), pa.string())
+            writer.write_table(pa.Table.from_batches([batch]).append_column(field, words))
+            count += batch.num_rows
+
+    return count
+
+
+def _get_column_index(names: List[str], column: str, words_column: str) -> int:
+    if column not in names:
+        raise ValueError(f"there is no column '{column}', only: {', '.join(names)}")
+    if words_column in names:
+        raise ValueError(f"there is a column '{words_column}' already")
+    return names.index(column)
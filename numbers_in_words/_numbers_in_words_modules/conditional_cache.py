@@ -6,33 +6,353 @@ NAME
 DESCRIPTION
     A private module belonging to numbers_in_words package.
 
+    Each ConditionalLRUCache has its own bounded store, which is split into stripes that each have their own
+    lock. Where the eviction policy allows it (LRU and TTL), reads don't take a lock at all, since single
+    OrderedDict operations are atomic, and writes only lock their own stripe, so that threads working on
+    different keys rarely wait on each other.
+
+    Whether a cache is enabled is held in a context variable, so that a policy set by one thread (or asyncio
+    task) never affects another.
+
+    Every cache registers itself by name, so that its statistics can be read with cache_info and its size and
+    eviction policy can be changed with configure_cache. A cache that belongs to an object (e.g. a server) rather
+    than to the module can be registered only for as long as the object is in use.
+
 AUTHOR:
     Francois Wessels
     https://github.com/francoiswessels/numbers_in_words
 """
 
-from functools import lru_cache
+import sys
+from _thread import allocate_lock as Lock  # as functools does, so that threading isn't imported at startup
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar, Token
+from functools import wraps
+from time import monotonic
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+_MISSING = object()
+
+EVICTION_POLICIES = ("lru", "lfu", "ttl")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+    memory: int  # approximate, in bytes
+    policy: str
+    ttl: Optional[float]
+
+
+class _LRUStore:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.lock = Lock()
+        self.evictions = 0
+        self.data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key, _MISSING)
+        if value is not _MISSING:
+            try:
+                self.data.move_to_end(key)
+            except KeyError:  # evicted by another thread in the meantime, which is fine
+                pass
+        return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        with self.lock:
+            return list(self.data.items())
+
+
+class _LFUStore:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.lock = Lock()
+        self.evictions = 0
+        self.data: Dict[Any, List] = {}  # key: [value, number of uses]
+        self.uses: Dict[int, OrderedDict] = defaultdict(OrderedDict)  # number of uses: keys, oldest first
+        self.min_uses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return _MISSING
+
+            uses = entry[1]
+            keys = self.uses[uses]
+            del keys[key]
+            if not keys:
+                del self.uses[uses]
+                if self.min_uses == uses:
+                    self.min_uses = uses + 1
+            self.uses[uses + 1][key] = None
+            entry[1] = uses + 1
+
+            return entry[0]
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.data:  # another thread got here first
+                return
+            if len(self.data) >= self.maxsize:
+                if not self.data:  # maxsize is 0
+                    return
+                keys = self.uses[self.min_uses]
+                evicted, _ = keys.popitem(last=False)
+                if not keys:
+                    del self.uses[self.min_uses]
+                del self.data[evicted]
+                self.evictions += 1
+
+            self.data[key] = [value, 1]
+            self.uses[1][key] = None
+            self.min_uses = 1
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        with self.lock:
+            return [(key, entry[0]) for key, entry in self.data.items()]
+
+
+class _TTLStore:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = Lock()
+        self.evictions = 0
+        self.data: OrderedDict = OrderedDict()  # key: (value, expiry time), oldest first
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return _MISSING
+
+        if entry[1] <= monotonic():
+            with self.lock:
+                if self.data.get(key) is entry:
+                    del self.data[key]
+                    self.evictions += 1
+            return _MISSING
+
+        return entry[0]
+
+    def put(self, key, value):
+        with self.lock:
+            now = monotonic()
+            self.data.pop(key, None)
+            self.data[key] = (value, now + self.ttl)
+
+            # Entries are in order of expiry, so expired entries (and the oldest ones) are at the front
+            while self.data and (len(self.data) > self.maxsize or next(iter(self.data.values()))[1] <= now):
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        with self.lock:
+            return [(key, entry[0]) for key, entry in self.data.items()]
+
+
+class _UnbuiltStore:
+    # Stands in for the stores of a cache until the first result is put in it, so that a cache that is never used
+    # (e.g. in a short-lived process) costs nothing to create. It is replaced by the real stores on the first put.
+    evictions = 0
+
+    def __init__(self, cache: "ConditionalLRUCache"):
+        self.cache = cache
+        self.data: Dict = {}
+
+    def get(self, key):
+        return _MISSING
+
+    def put(self, key, value):
+        self.cache._build_stripes()
+        stripes = self.cache._stripes
+        stripes[hash(key) % len(stripes)].put(key, value)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        return []
+
+
+_caches: Dict[str, "ConditionalLRUCache"] = {}
 
 
 class ConditionalLRUCache:
-    def __init__(self, starting_condition=True):
-        self.enabled = starting_condition
-        self.f = None
+    """A cache that can be switched on and off per context, with an LRU, LFU or TTL eviction policy."""
 
-    def __call__(self, f):
-        self.f = f
+    def __init__(self, starting_condition=True, maxsize=1000, name="cache", stripes=16, policy="lru", ttl=None,
+                 register=True):
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._enabled: ContextVar[bool] = ContextVar(f"{name}_cache_enabled", default=starting_condition)
+        self._stripe_count = stripes
+        self._stripes: List[Any] = []
+        self._build_lock = Lock()
+        self._evictions = 0
+        self.configure(maxsize, policy, ttl)
+        if register:
+            self.register()
 
-        def wrap(*args, **kwargs):
-            if self.enabled:
-                return self._cached_call(*args, **kwargs)
+    def register(self):
+        """Makes the cache known to cache_info and configure_cache by its name, in place of any other of that name."""
+        _caches[self.name] = self
+
+    def unregister(self):
+        """Makes the cache unknown to cache_info and configure_cache, unless another of its name has replaced it."""
+        if _caches.get(self.name) is self:
+            del _caches[self.name]
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled.get()
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        # Only applies to the current context i.e. to the current thread or asyncio task
+        self._enabled.set(value)
+
+    def set_enabled(self, value: bool) -> Token:
+        return self._enabled.set(value)
+
+    def reset_enabled(self, token: Token):
+        self._enabled.reset(token)
+
+    def configure(self, maxsize: Optional[int] = None, policy: Optional[str] = None, ttl: Optional[float] = None):
+        """Changes the size and/or eviction policy. This empties the cache, but keeps its statistics."""
+        maxsize = self.maxsize if maxsize is None else maxsize
+        policy = self.policy if policy is None else policy.lower()
+        ttl = self.ttl if ttl is None else ttl
+
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be 0 or more, not {maxsize}")
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(EVICTION_POLICIES)}, not '{policy}'")
+        if policy == "ttl" and not (ttl and ttl > 0):
+            raise ValueError("a ttl (in seconds) greater than 0 is required with the 'ttl' policy")
+
+        # The evictions counted by the stores that are being replaced are kept
+        self._evictions += sum(store.evictions for store in self._stripes)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.ttl = ttl
+        self._stripes = [_UnbuiltStore(self)]
+
+    def _build_stripes(self):
+        with self._build_lock:
+            if not isinstance(self._stripes[0], _UnbuiltStore):  # another thread got here first
+                return
+
+            stripe_count = max(1, min(self._stripe_count, self.maxsize))
+            size, remainder = divmod(self.maxsize, stripe_count)
+            sizes = [size + (1 if i < remainder else 0) for i in range(stripe_count)]
+
+            if self.policy == "lru":
+                self._stripes = [_LRUStore(s) for s in sizes]
+            elif self.policy == "lfu":
+                self._stripes = [_LFUStore(s) for s in sizes]
             else:
+                self._stripes = [_TTLStore(s, self.ttl) for s in sizes]
+
+    def clear(self):
+        """Empties the cache and resets its statistics."""
+        self.configure()
+        self._evictions = self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self._evictions + sum(store.evictions for store in self._stripes),
+            maxsize=self.maxsize,
+            currsize=len(self),
+            memory=self._approximate_memory(),
+            policy=self.policy,
+            ttl=self.ttl if self.policy == "ttl" else None)
+
+    def __len__(self) -> int:
+        return sum(len(store.data) for store in self._stripes)
+
+    def __call__(self, f):
+        @wraps(f)
+        def wrap(*args, **kwargs):
+            if not self._enabled.get():
                 return f(*args, **kwargs)
 
+            # f is part of the key, so that functions sharing a cache don't receive each other's results
+            key = (f, args, tuple(kwargs.items())) if kwargs else (f, args)
+            stripes = self._stripes
+            store = stripes[hash(key) % len(stripes)]
+
+            # The statistics are updated without a lock, so they can undercount a little when many threads are busy
+            result = store.get(key)
+            if result is not _MISSING:
+                self.hits += 1
+                return result
+
+            self.misses += 1
+            result = f(*args, **kwargs)  # computed outside of any lock, so other threads aren't held up
+            store.put(key, result)
+
+            return result
+
         return wrap
 
-    @lru_cache(maxsize=1000)
-    def _cached_call(self, *args, **kwargs):
-        return self.f(*args, **kwargs)
+    def _approximate_memory(self) -> int:
+        memory = 0
+        for store in self._stripes:
+            memory += sys.getsizeof(store.data)
+            for key, value in store.items():
+                # The function at the front of the key is shared by all of the entries, so it isn't counted
+                memory += _approximate_size(key[1:]) + _approximate_size(value)
+        return memory
+
+
+def _approximate_size(obj) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(_approximate_size(o) for o in obj)
+    elif hasattr(obj, "__dict__"):
+        size += sum(_approximate_size(o) for o in vars(obj).values())
+    return size
+
+
+def cache_info() -> Dict[str, CacheInfo]:
+    """Returns the statistics of each of the caches, by name i.e. 'block' and 'number'.
+
+    Each CacheInfo has the number of hits, misses and evictions, the maximum and current number of entries,
+    the approximate memory used by the entries in bytes, the eviction policy and, for the 'ttl' policy,
+    the number of seconds that an entry is kept for.
+    """
+    return {name: cache.info() for name, cache in _caches.items()}
+
+
+def configure_cache(name: str, maxsize: Optional[int] = None, policy: Optional[str] = None,
+                    ttl: Optional[float] = None):
+    """Changes the size and/or eviction policy of a cache. This empties the cache, but keeps its statistics.
+
+    Arguments:
+        name -- the name of the cache i.e. 'block' or 'number'
 
-    def _uncached_call(self, *args, **kwargs):
-        return self.f(*args, **kwargs)
+    Keyword arguments:
+        maxsize -- default None, the maximum number of entries. None keeps the current size.
+        policy  -- default None, the eviction policy: 'lru' (least recently used), 'lfu' (least frequently used)
+                    or 'ttl' (entries expire after ttl seconds). None keeps the current policy.
+        ttl     -- default None, the number of seconds that an entry is kept for. Required with the 'ttl' policy.
+    """
+    if name not in _caches:
+        raise ValueError(f"name must be one of {', '.join(_caches)}, not '{name}'")
+    _caches[name].configure(maxsize, policy, ttl)
@@ -0,0 +1,191 @@
+"""Help on module incremental:
+
+NAME
+    incremental
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Converts a number that changes a little at a time, e.g. a counter on a dashboard, without rendering all of it
+    again every time it changes.
+
+    An IncrementalConverter remembers the words of the last number it converted, and where the words of each
+    block start in them. The words of a block only depend on its value and its place, so when the next number has
+    as many blocks, the words up to the first block that changed are kept, and only the blocks that changed are
+    rendered again and spliced in after them. A counter that goes up by one usually changes only its last block.
+
+    Locales that group by lakhs and crores say "crore" after the last group of a level that isn't zero, so the
+    words of their groups depend on each other. Their numbers are converted in full every time.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+from math import ceil
+from typing import List, Optional, Union, cast
+
+from . import locales
+from . import number_parts as np
+from . import scale_names as scales
+from . import string_processing as sp
+from . import value_maps as maps
+
+# The digits of a block of a string, or the value of a block of an int
+Block = Union[str, int]
+
+
+class IncrementalConverter:
+    """Converts a number that changes a little at a time, re-rendering only the blocks that changed since the
+    number it converted last. Its words are always what number_in_words returns.
+
+    Example:
+        counter = IncrementalConverter()
+        for processed in count():
+            print(f"We processed {counter.number_in_words(processed)} records.")
+
+    Keyword arguments:
+        block_table -- default True, indicates whether blocks are looked up in the precomputed block table, instead
+                        of being rendered (or cached) per call.
+        locale      -- default None, the name of the locale or a Locale. None is "en-GB".
+
+    blocks_rendered and blocks_reused count the blocks that were rendered, and that were kept from the last number.
+    An IncrementalConverter remembers one number, so each counter (and each thread) should have its own.
+    """
+
+    def __init__(self, block_table=True, locale: sp.LocaleArgument = None):
+        self.block_table = block_table
+        self.locale = locales.EN_GB if locale is None else locales.get_locale(locale)
+        self.blocks_rendered = 0
+        self.blocks_reused = 0
+        self.reset()
+
+    def number_in_words(self, number: sp.Number) -> str:
+        """Returns the value of an integer-like string, an int, a Decimal or a Fraction in words."""
+        if type(number) is int:
+            if self.locale.grouping != (3,):
+                return sp._get_number_in_words_from_value(number, self.locale)
+            magnitude = -number if number < 0 else number
+            high, low = divmod(magnitude, 1000)
+            if high and high == self._high:  # only the last block can have changed, so the others aren't split again
+                blocks = self._blocks[:-1] + [low]
+            else:
+                blocks = sp._get_blocks_from_int(magnitude)[0]
+            self._high = high
+            return self._join(self._convert(blocks), number < 0, "")
+
+        if not isinstance(number, str):
+            return sp._get_number_in_words_from_value(number, self.locale)
+
+        # A counter is usually nothing but digits, which is all that the parser would find in it
+        if number.isdigit() and number.isascii():
+            return self._join(self._convert_integer(number), False, "")
+
+        return self._convert_parts(sp._get_number_parts_from_word.__wrapped__(number, self.locale))
+
+    def number_in_words_from_phrase(self, phrase: str) -> str:
+        """Finds a number-like substring in a phrase and returns the value in words, or 'number invalid'."""
+        number_parts = sp._get_number_parts_from_phrase(phrase, self.locale)
+        if not number_parts.is_valid:
+            return "number invalid"
+
+        return self._convert_parts(number_parts)
+
+    def reset(self):
+        """Forgets the last number, so that the next one is rendered in full."""
+        self._blocks: List[Block] = []  # the blocks of the integer of the last number
+        self._words = ""  # the words of the integer of the last number
+        self._offsets: List[int] = [0]  # where the words of each block start in _words, and where they end
+        self._high: Optional[int] = None  # the last number // 1000, if it was an int
+
+    def _convert_parts(self, number_parts: np.NumberParts) -> str:
+        if not number_parts.is_valid:
+            return "number invalid"
+
+        words = self._convert_integer(cast(str, number_parts.integer))
+
+        # Like number_in_words, the decimals of a number whose integer is zero aren't said
+        decimals = ""
+        if words and number_parts.has_decimals:
+            digit_words = maps.num_to_words_map
+            decimals = f" {self.locale.point} " + " ".join(digit_words[d] for d in number_parts.iter_decimals())
+
+        return self._join(words, number_parts.negative, decimals)
+
+    def _convert_integer(self, number_str: str) -> str:
+        self._high = None
+        if self.locale.grouping != (3,):
+            return "".join(sp._iter_lakh_crore_parts(number_str, self.locale))
+
+        num_of_blocks = ceil(len(number_str)/3)
+        number_str = number_str.zfill(num_of_blocks*3)
+        return self._convert([number_str[i*3:i*3+3] for i in range(num_of_blocks)])
+
+    def _convert(self, blocks: List[Block]) -> str:
+        # Returns the words of the integer of blocks, which are the digits of the blocks of a string, or the values of
+        # the blocks of an int, most significant first. The blocks of a string are never equal to the blocks of an int,
+        # so they are never mixed up.
+        last = self._blocks
+        num_of_blocks = len(blocks)
+
+        if blocks == last:
+            self.blocks_reused += num_of_blocks
+        else:
+            if num_of_blocks != len(last):
+                first_changed = 0  # a number of another size has other scales, so nothing can be kept
+            elif blocks[:-1] == last[:-1]:  # the usual case, for a counter
+                first_changed = num_of_blocks - 1
+            else:
+                first_changed = 0
+                while blocks[first_changed] == last[first_changed]:
+                    first_changed += 1
+
+            self.blocks_reused += first_changed
+            self._splice(blocks, first_changed)
+
+        return self._words
+
+    def _splice(self, blocks: List[Block], first_changed: int):
+        # Keeps the words up to the first block that changed, and renders the blocks after it that changed
+        last, words, offsets = self._blocks, self._words, self._offsets
+        num_of_blocks = len(blocks)
+        kept = len(last) == num_of_blocks
+
+        parts = [words[:offsets[first_changed]]]
+        new_offsets = offsets[:first_changed + 1]
+        end = new_offsets[-1]
+        for i in range(first_changed, num_of_blocks):
+            if kept and blocks[i] == last[i]:
+                part = words[offsets[i]:offsets[i+1]]
+                self.blocks_reused += 1
+            else:
+                part = self._render_block(blocks[i], i, num_of_blocks)
+                self.blocks_rendered += 1
+            parts.append(part)
+            end += len(part)
+            new_offsets.append(end)
+
+        self._blocks, self._words, self._offsets = blocks, "".join(parts), new_offsets
+
+    def _render_block(self, block: Block, i: int, num_of_blocks: int) -> str:
+        # The words of a block as _iter_block_parts says them: its glue, unless it is the first block, and its scale.
+        # Like number_in_words, the blocks of ints are always looked up in the table.
+        if type(block) is int:
+            block_result, block_glue = self.locale.blocks[block]
+        elif self.block_table or self.locale is not locales.EN_GB:
+            block_result, block_glue = self.locale.blocks[int(block)]
+        else:
+            block_result, block_glue = sp._get_block_result(block)
+
+        if not block_result:
+            return ""
+
+        glue = block_glue if i > 0 else ""
+        if i < num_of_blocks - 1:  # Not the last block
+            return f"{glue}{block_result} {scales.scale_name(num_of_blocks - i - 1)}"
+        return f"{glue}{block_result}"
+
+    def _join(self, words: str, negative: bool, decimals: str) -> str:
+        if not words:  # Every block is empty
+            return "zero"
+        return f"{self.locale.negative} {words}{decimals}" if negative else f"{words}{decimals}"
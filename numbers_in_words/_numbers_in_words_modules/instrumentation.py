@@ -0,0 +1,268 @@
+"""Help on module instrumentation:
+
+NAME
+    instrumentation
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Opt-in timers and counters for the stages of converting a number:
+        tokenize -- _get_number_parts_from_phrase, splitting a phrase into words and finding the number in it
+        validate -- _get_number_parts_from_word, checking a word and finding its parts
+        render   -- _get_block_result, rendering (or looking up in the block cache) a block, or
+                    _get_block_results, looking up a block in the block table of a locale
+        join     -- _get_number_in_words_from_parts and _get_number_in_words_from_blocks, putting the words of a
+                    number together
+    and counters of the tokens scanned, the candidates rejected, the numbers converted and the blocks in them.
+
+    The time of a stage excludes the time of the stages it calls, so the stages add up to the total. Every block
+    that is rendered or looked up is a call of render, whichever path it takes, but the blocks of ints (and of every
+    number in a locale that groups by lakhs and crores) are looked up as they are joined, so their rendering is part
+    of join. Streamed numbers (iter_number_in_words) have no join, since their words are never put together.
+
+    Instrumentation is switched on by installing timed wrappers of these functions in string_processing, and
+    switched off by putting the originals back, so it costs nothing when it is off. It applies to every thread
+    while it is on. The wrappers have the names of the functions they wrap, so sampling profilers still show
+    time spent in the stages under the stages' own names.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from math import ceil
+from time import perf_counter
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, TextIO, Tuple
+
+from . import conditional_cache as cc
+from . import locales
+from . import number_parts as np
+from . import string_processing as sp
+
+STAGES = ("tokenize", "validate", "render", "join")
+COUNTERS = ("tokens", "rejected", "numbers", "blocks")
+
+# Called with the name of a stage and the seconds spent in it, or the name of a counter and how much it went up by
+Hook = Callable[[str, float], None]
+
+# Replaced, rather than changed, when a hook is added or removed, so that it can be read without the lock
+_hooks: Tuple[Hook, ...] = ()
+_lock = threading.Lock()
+_originals: Dict[str, Callable] = {}
+_local = threading.local()
+
+
+class StageStats(NamedTuple):
+    calls: int
+    seconds: float
+
+
+class Profile:
+    """The stage timings and counters collected by profile. Counts from several threads at once may be slightly
+    low, since they aren't locked."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {stage: StageStats(0, 0.0) for stage in STAGES}
+        self.counters: Dict[str, int] = {counter: 0 for counter in COUNTERS}
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_misses: Dict[str, int] = {}
+
+    def record(self, name: str, value: float):
+        stats = self.stages.get(name)
+        if stats is None:
+            self.counters[name] += int(value)
+        else:
+            self.stages[name] = StageStats(stats.calls + 1, stats.seconds + value)
+
+    def report(self, output: TextIO = sys.stderr):
+        """Writes a per-stage breakdown of the time spent, and the counters."""
+        total = sum(stats.seconds for stats in self.stages.values())
+        print(f"{'stage':<10} {'calls':>10} {'seconds':>10} {'share':>7} {'µs/call':>9}", file=output)
+        for stage, stats in self.stages.items():
+            share = stats.seconds / total if total else 0.0
+            per_call = stats.seconds / stats.calls * 1e6 if stats.calls else 0.0
+            print(f"{stage:<10} {stats.calls:>10} {stats.seconds:>10.4f} {share:>7.1%} {per_call:>9.3f}",
+                  file=output)
+
+        counters = ", ".join(f"{name} {value}" for name, value in self.counters.items())
+        caches = ", ".join(
+            f"{name} cache {self.cache_hits[name]} hits/{self.cache_misses[name]} misses" for name in self.cache_hits)
+        print(f"{counters}; {caches}", file=output)
+
+
+def add_instrumentation_hook(hook: Hook):
+    """Calls hook with every stage timing and counter increment, until it is removed. Instrumentation is on for as
+    long as there are hooks."""
+    global _hooks
+    with _lock:
+        if not _hooks:
+            _install()
+        _hooks = _hooks + (hook,)
+
+
+def remove_instrumentation_hook(hook: Hook):
+    """Stops calling hook. Instrumentation is switched off when the last hook is removed."""
+    global _hooks
+    with _lock:
+        hooks = list(_hooks)
+        hooks.remove(hook)
+        _hooks = tuple(hooks)
+        if not _hooks:
+            _uninstall()
+
+
+@contextmanager
+def profile(output: Optional[TextIO] = sys.stderr):
+    """Collects the stage timings and counters of the conversions done in a with block, in any thread, and writes
+    a per-stage breakdown to output at the end of the block.
+
+    Example:
+        with profile() as p:
+            words = [number_in_words_from_phrase(line) for line in lines]
+        p.stages["validate"].seconds
+
+    Keyword arguments:
+        output -- default sys.stderr, where the breakdown is written. None doesn't write it.
+    """
+    result = Profile()
+    before = cc.cache_info()
+    add_instrumentation_hook(result.record)
+    try:
+        yield result
+    finally:
+        remove_instrumentation_hook(result.record)
+        for name, info in cc.cache_info().items():
+            if name in before:
+                result.cache_hits[name] = info.hits - before[name].hits
+                result.cache_misses[name] = info.misses - before[name].misses
+        if output is not None:
+            result.report(output)
+
+
+def _emit(name: str, value: float):
+    for hook in _hooks:
+        hook(name, value)
+
+
+def _start() -> float:
+    # The time spent in the stages that a stage calls is taken off its own time, using a stack of the time spent in
+    # the stages that each stage on the stack has called so far
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    stack.append(0.0)
+    return perf_counter()
+
+
+def _stop(stage: str, start: float):
+    elapsed = perf_counter() - start
+    stack = _local.stack
+    own = elapsed - stack.pop()
+    if stack:
+        stack[-1] += elapsed
+    _emit(stage, own)
+
+
+def _timed(stage: str, f: Callable, count: Optional[Callable] = None) -> Callable:
+    @wraps(f)
+    def timed(*args, **kwargs):
+        start = _start()
+        try:
+            result = f(*args, **kwargs)
+        finally:
+            _stop(stage, start)
+
+        if count is not None:
+            count(args, result)
+        return result
+
+    # Callers of __wrapped__ (e.g. batch and iter_number_in_words) want the function without its cache, so that is
+    # what they get, timed all the same
+    wrapped = getattr(f, "__wrapped__", None)
+    timed.__wrapped__ = f if wrapped is None else _timed(stage, wrapped, count)  # type: ignore
+    return timed
+
+
+def _timed_items(stage: str, items: Iterator, num_of_items: int) -> Iterator:
+    # Times getting each of the items as a call of stage, as they are taken, so that nothing is computed early
+    for _ in range(num_of_items):
+        start = _start()
+        try:
+            item = next(items)
+        finally:
+            _stop(stage, start)
+        yield item
+
+
+def _timed_block_results(f: Callable) -> Callable:
+    @wraps(f)
+    def timed_block_results(number_str: str, block_table: bool, locale: locales.Locale):
+        block_results, num_of_blocks = f(number_str, block_table, locale)
+        # Blocks that are rendered per call are timed by _get_block_result, and only those that are looked up in a
+        # table are timed here
+        if block_table or locale is not locales.EN_GB:
+            block_results = _timed_items("render", block_results, num_of_blocks)
+        return block_results, num_of_blocks
+
+    return timed_block_results
+
+
+def _counted(f: Callable, count: Callable) -> Callable:
+    # For generators, which can't be timed, since their callers take their items in their own time
+    @wraps(f)
+    def counted(*args, **kwargs):
+        count(args, None)
+        return f(*args, **kwargs)
+
+    return counted
+
+
+def _count_tokens(args, result):
+    _emit("tokens", args[0].count(" ") + 1)
+
+
+def _count_rejected(args, result):
+    if result is np.INVALID:
+        _emit("rejected", 1)
+
+
+def _count_blocks(args, result):
+    _emit("numbers", 1)
+    _emit("blocks", ceil(len(args[0].integer) / 3))
+
+
+def _count_int_blocks(args, result):
+    _emit("numbers", 1)
+    _emit("blocks", len(args[0]))
+
+
+def _install():
+    _originals.update(
+        _get_number_parts_from_phrase=sp._get_number_parts_from_phrase,
+        _get_number_parts_from_word=sp._get_number_parts_from_word,
+        _get_block_result=sp._get_block_result,
+        _get_block_results=sp._get_block_results,
+        _iter_number_words=sp._iter_number_words,
+        _get_number_in_words_from_parts=sp._get_number_in_words_from_parts,
+        _get_number_in_words_from_blocks=sp._get_number_in_words_from_blocks)
+
+    sp._get_number_parts_from_phrase = _timed("tokenize", sp._get_number_parts_from_phrase, _count_tokens)
+    sp._get_number_parts_from_word = _timed("validate", sp._get_number_parts_from_word, _count_rejected)
+    sp._get_block_result = _timed("render", sp._get_block_result)
+    sp._get_block_results = _timed_block_results(sp._get_block_results)
+    # The numbers and blocks of strings, Decimals and Fractions are counted as their words are produced, which
+    # covers both the numbers that are joined and those that are streamed
+    sp._iter_number_words = _counted(sp._iter_number_words, _count_blocks)
+    sp._get_number_in_words_from_parts = _timed("join", sp._get_number_in_words_from_parts)
+    sp._get_number_in_words_from_blocks = _timed("join", sp._get_number_in_words_from_blocks, _count_int_blocks)
+
+
+def _uninstall():
+    for name, f in _originals.items():
+        setattr(sp, name, f)
+    _originals.clear()
@@ -0,0 +1,224 @@
+"""Help on module locales:
+
+NAME
+    locales
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    A Locale describes how numbers are written (thousands separator, decimal point and digit grouping) and
+    how they are said (the words for "negative" and "point", and how blocks are joined) in a region. Each
+    locale renders all 1000 block values once, on first use, into a lookup table. After that, converting a
+    number in one locale costs the same as in any other, so a locale can be chosen per call.
+
+    Locales that ship with the package:
+        en-GB  -- 1,234,567.89, "one million, two hundred and thirty-four thousand, ..." (the default)
+        en-US  -- 1,234,567.89, "one million two hundred thirty-four thousand ..."
+        en-IN  -- 12,34,567.89, "twelve lakh thirty-four thousand five hundred and sixty-seven"
+        en-150 -- 1.234.567,89, said as in en-GB
+
+    Other locales can be added with register_locale.
+
+    The tables can also be loaded from a snapshot written by write_table_snapshot, which is quicker than
+    rendering them, by setting NUMBERS_IN_WORDS_TABLE_SNAPSHOT to the path of the snapshot. Tables that aren't
+    in the snapshot, and snapshots that can't be read or were written by another version, are rendered as usual.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import marshal
+import os
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from . import value_maps as maps
+
+# The groupings that can be rendered: thousands, millions, ... or thousands, lakhs, crores
+GROUPINGS = ((3,), (3, 2))
+
+# Snapshots of any other version are ignored
+SNAPSHOT_VERSION = 1
+
+# (conjunction, block_separator) : blocks, read from the snapshot on first use
+_snapshot: Optional[Dict[Tuple[str, str], Tuple[Tuple[str, str], ...]]] = None
+
+
+class Locale:
+    """The way numbers are written and said in a region.
+
+    Arguments:
+        name -- the name that the locale is registered under e.g. "en-GB"
+
+    Keyword arguments:
+        separator       -- default ",", the thousands separator
+        decimal_point   -- default ".", the decimal point
+        grouping        -- default (3,), the number of digits in each group between separators, from the right.
+                            The last size repeats. (3,) groups by thousands, (3, 2) by thousands, lakhs and crores.
+        conjunction     -- default " and ", what joins hundreds to tens and units ("one hundred and one"),
+                            and what comes before a block without hundreds ("one thousand and one").
+        block_separator -- default ", ", what comes before any other block ("one thousand, one hundred").
+        negative        -- default "negative", the word in front of negative numbers.
+        point           -- default "point", the word for the decimal point.
+    """
+
+    __slots__ = (
+        "name", "separator", "decimal_point", "grouping", "conjunction", "block_separator", "negative", "point",
+        "_blocks")
+
+    def __init__(
+            self,
+            name: str,
+            separator: str = ",",
+            decimal_point: str = ".",
+            grouping: Tuple[int, ...] = (3,),
+            conjunction: str = " and ",
+            block_separator: str = ", ",
+            negative: str = "negative",
+            point: str = "point"):
+
+        if grouping not in GROUPINGS:
+            raise ValueError(f"grouping must be one of: {', '.join(str(g) for g in GROUPINGS)}")
+        if separator == decimal_point:
+            raise ValueError("separator and decimal_point must be different")
+
+        self.name = name
+        self.separator = separator
+        self.decimal_point = decimal_point
+        self.grouping = grouping
+        self.conjunction = conjunction
+        self.block_separator = block_separator
+        self.negative = negative
+        self.point = point
+        self._blocks: Optional[Tuple[Tuple[str, str], ...]] = None
+
+    @property
+    def blocks(self) -> Tuple[Tuple[str, str], ...]:
+        """The (words, glue) of every block value 000 - 999, indexed by the integer value of the block. The glue is
+        what joins the block to the block in front of it."""
+        # The table is immutable once built, so two threads racing to build it will simply produce equal tables.
+        if self._blocks is None:
+            self._blocks = _get_snapshot_blocks(self) or tuple(self.render_block(f"{n:03}") for n in range(1000))
+        return self._blocks
+
+    def group_size(self, group: int) -> int:
+        """Returns the number of digits in a group between separators, counting from 0 at the right."""
+        return self.grouping[group] if group < len(self.grouping) else self.grouping[-1]
+
+    def render_block(self, block: str) -> Tuple[str, str]:
+        """Returns the words and glue of a block of three digits."""
+        num_100 = block[0]
+        num_10 = block[1]
+        num_1 = block[2]
+
+        words_100, words_10, words_1 = "", "", ""
+        glue_100_to_10, glue_10_to_1, block_glue = "", "", self.block_separator
+
+        if not num_100 == "0":  # This block has a 100 value
+            words_100 = f"{maps.num_to_words_map[num_100]} hundred"
+            if not (num_10 == "0" and num_1 == "0"):  # ... and this block has either a 10 or a 1 value
+                glue_100_to_10 = self.conjunction
+        elif not (num_10 == "0" and num_1 == "0"):  # This block has NO 100 value and has either a 10 or a 1 value
+            block_glue = self.conjunction
+
+        if not (num_10 == "0" or num_1 == "0"):  # There is a 10 and a 1 that need to be joined.
+            glue_10_to_1 = "-"
+
+        if num_10 == "1":  # Number is in the teens
+            words_teen = maps.num_to_words_map[f"{num_10}{num_1}"]
+            block_result = f"{words_100}{glue_100_to_10}{words_teen}"
+        else:  # Number is NOT in the teens
+            words_10 = "" if num_10 == "0" else maps.num_to_words_map[f"{num_10}0"]
+            words_1 = "" if num_1 == "0" else maps.num_to_words_map[num_1]
+            block_result = f"{words_100}{glue_100_to_10}{words_10}{glue_10_to_1}{words_1}"
+
+        return block_result, block_glue
+
+    def __repr__(self):
+        return f"<Locale {self.name}/>"
+
+
+EN_GB = Locale("en-GB")
+
+LOCALES: Dict[str, Locale] = {
+    "en-GB": EN_GB,
+    "en-US": Locale("en-US", conjunction=" ", block_separator=" "),
+    "en-IN": Locale("en-IN", grouping=(3, 2), block_separator=" "),
+    "en-150": Locale("en-150", separator=".", decimal_point=","),
+}
+
+
+def register_locale(locale: Locale):
+    """Makes a locale available by its name, replacing any locale that was registered under the same name."""
+    LOCALES[locale.name] = locale
+
+
+def get_locale(locale: Union[str, Locale]) -> Locale:
+    """Returns the locale registered under a name. Locales are returned as they are."""
+    if isinstance(locale, Locale):
+        return locale
+
+    try:
+        return LOCALES[locale]
+    except KeyError:
+        raise ValueError(f"unknown locale '{locale}', expected one of: {', '.join(LOCALES)}") from None
+
+
+def write_table_snapshot(path: str, locales: Optional[Iterable[Union[str, Locale]]] = None):
+    """Writes the block tables of locales to a file, which is loaded instead of rendering the tables when
+    NUMBERS_IN_WORDS_TABLE_SNAPSHOT is set to its path.
+
+    Keyword arguments:
+        locales -- default None, the locales (or their names) whose tables are written. None writes the tables of
+                    every registered locale.
+    """
+    tables = {}
+    for locale in map(get_locale, LOCALES if locales is None else locales):
+        tables[(locale.conjunction, locale.block_separator)] = locale.blocks
+
+    with open(path, "wb") as f:
+        marshal.dump({"version": SNAPSHOT_VERSION, "tables": tables}, f)
+
+
+def _get_snapshot_blocks(locale: Locale) -> Optional[Tuple[Tuple[str, str], ...]]:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = _read_table_snapshot(os.environ.get("NUMBERS_IN_WORDS_TABLE_SNAPSHOT"))
+
+    # The blocks only depend on the words that join them. A few are checked against the renderer, so that a snapshot
+    # written by a version that renders blocks differently is not used.
+    blocks = _snapshot.get((locale.conjunction, locale.block_separator))
+    if blocks is None or any(blocks[n] != locale.render_block(f"{n:03}") for n in (0, 7, 15, 90, 101, 999)):
+        return None
+    return blocks
+
+
+def _read_table_snapshot(path: Optional[str]) -> Dict[Tuple[str, str], Tuple[Tuple[str, str], ...]]:
+    if not path:
+        return {}
+
+    try:
+        with open(path, "rb") as f:
+            snapshot = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return {}
+    # Anything that isn't laid out the way write_table_snapshot lays it out is no snapshot at all, rather than a
+    # table that fails on some of its blocks later
+    tables = snapshot.get("tables")
+    if not isinstance(tables, dict) or not _is_pairs_of_str(tables):
+        return {}
+    if not all(isinstance(blocks, tuple) and len(blocks) == 1000 and _is_pairs_of_str(blocks)
+               for blocks in tables.values()):
+        return {}
+    return tables
+
+
+def _is_pairs_of_str(pairs: Iterable) -> bool:
+    # Types are collected into sets, rather than checked one by one, since there are 1000 blocks in every table
+    pairs = list(pairs)
+    return (set(map(type, pairs)) <= {tuple} and set(map(len, pairs)) <= {2}
+            and set(map(type, chain.from_iterable(pairs))) <= {str})
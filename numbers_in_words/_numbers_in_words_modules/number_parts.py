@@ -6,15 +6,26 @@ NAME
 DESCRIPTION
     A private module belonging to numbers_in_words package.
 
+    A NumberParts keeps a reference to the string that a number was found in, and the offsets of the number's
+    integer, decimals and suffix in it, rather than copies of them. Copies are only made when a part is asked
+    for, which is usually only when the number is rendered. Instances use __slots__, so they have no __dict__.
+
+    Every invalid number is represented by the same instance, INVALID.
+
 AUTHOR:
     Francois Wessels
     https://github.com/francoiswessels/numbers_in_words
 """
 
-from typing import Optional, Union
+from itertools import islice
+from typing import Iterator, Optional
 
 
 class NumberParts:
+    __slots__ = (
+        "source", "negative", "integer_start", "integer_end", "decimals_start", "decimals_end", "suffix_start",
+        "suffix_end", "separator")
+
     def __init__(
             self,
             integer: str = "",
@@ -22,16 +33,65 @@ class NumberParts:
             suffix: str = "",
             negative: bool = False):
 
+        self.source = f"{integer}{decimals}{suffix}"
         self.negative = negative
-        self.integer = integer
-        self.decimals = decimals
-        self.suffix = suffix
+        self.integer_start = 0
+        self.integer_end = self.decimals_start = len(integer)
+        self.decimals_end = self.suffix_start = len(integer) + len(decimals)
+        self.suffix_end = len(self.source)
+        self.separator = ""  # the thousands separator in the integer, if there is one
 
         # TODO: Consider extending this to accommodate regional number interpretation
 
+    @classmethod
+    def from_offsets(
+            cls,
+            source: str,
+            integer_start: int,
+            integer_end: int,
+            decimals_start: int,
+            decimals_end: int,
+            negative: bool = False,
+            separator: str = "",
+            suffix_end: Optional[int] = None) -> "NumberParts":
+        """Creates a NumberParts from the offsets of its parts in source. The suffix runs from decimals_end to
+        suffix_end, or to the end of source if suffix_end is None. If separator is given, it is removed from the
+        integer when the integer is asked for."""
+        number_parts = cls.__new__(cls)
+        number_parts.source = source
+        number_parts.negative = negative
+        number_parts.integer_start = integer_start
+        number_parts.integer_end = integer_end
+        number_parts.decimals_start = decimals_start
+        number_parts.decimals_end = number_parts.suffix_start = decimals_end
+        number_parts.suffix_end = len(source) if suffix_end is None else suffix_end
+        number_parts.separator = separator
+        return number_parts
+
+    @property
+    def integer(self) -> str:
+        integer = self.source[self.integer_start:self.integer_end]
+        return integer.replace(self.separator, "") if self.separator else integer
+
+    @property
+    def decimals(self) -> str:
+        return self.source[self.decimals_start:self.decimals_end]
+
+    @property
+    def suffix(self) -> str:
+        return self.source[self.suffix_start:self.suffix_end]
+
+    @property
+    def has_decimals(self) -> bool:
+        return self.decimals_end > self.decimals_start
+
+    def iter_decimals(self) -> Iterator[str]:
+        """Yields the decimal digits one at a time, without copying them."""
+        return islice(self.source, self.decimals_start, self.decimals_end)
+
     @property
     def is_valid(self) -> bool:
-        return True if self.integer else False
+        return self.integer_end > self.integer_start
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, NumberParts):
@@ -42,3 +102,7 @@ class NumberParts:
     def __repr__(self):
         neg = "-" if self.negative else ""
         return f"<NumberParts negative={neg} integer={self.integer} decimals={self.decimals} suffix={self.suffix}/>"
+
+
+# Shared by every invalid number, so that rejecting a candidate doesn't create a new object. Don't modify it.
+INVALID = NumberParts()
@@ -0,0 +1,102 @@
+"""Help on module parallel:
+
+NAME
+    parallel
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Converts a file in parallel, by splitting it into line-aligned byte ranges that are converted by a pool of
+    worker processes. Workers open (or memory-map) the file and read their own byte range, so that the parent
+    never has to send them any data, and send their results back a whole range at a time.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import io
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from . import streaming
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def convert_file_parallel(
+        file_name: str, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+        use_mmap=False, encoding="utf-8") -> Iterator[Tuple[str, str, str]]:
+    """Converts every line of a file, using a pool of worker processes.
+
+    Arguments:
+        file_name -- the name of the file to convert
+
+    Keyword arguments:
+        workers    -- default None, the number of worker processes. None uses one per CPU. With 1, the file is
+                        converted in this process.
+        chunk_size -- default 4 MiB, the approximate number of bytes that a worker converts at a time.
+        use_mmap   -- default False, indicates whether workers memory-map the file, instead of reading it.
+        encoding   -- default 'utf-8', the encoding of the file. It has to encode a newline as a single b"\\n".
+
+    Returns:
+        Iterator[Tuple[str, str, str]] -- the line (without its line ending), the number found in it and that
+                                            number in words, for every line, in the order of the file.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = _get_line_aligned_ranges(file_name, chunk_size)
+
+    if workers == 1:
+        for start, end in ranges:
+            yield from _convert_range(file_name, start, end, use_mmap, encoding)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Only a couple of ranges per worker are in flight at any time, so that memory use stays bounded
+        # when the results are consumed more slowly than they are produced.
+        pending: deque = deque()
+        ranges_iter = iter(ranges)
+        for start, end in ranges_iter:
+            pending.append(executor.submit(_convert_range, file_name, start, end, use_mmap, encoding))
+            if len(pending) == workers * 2:
+                break
+
+        while pending:
+            results = pending.popleft().result()
+            for start, end in ranges_iter:
+                pending.append(executor.submit(_convert_range, file_name, start, end, use_mmap, encoding))
+                break
+            yield from results
+
+
+def _get_line_aligned_ranges(file_name: str, chunk_size: int) -> List[Tuple[int, int]]:
+    size = os.path.getsize(file_name)
+    ranges = []
+
+    with open(file_name, "rb") as fread:
+        start = 0
+        while start < size:
+            fread.seek(min(start + chunk_size, size))
+            fread.readline()  # move on to the end of the line that the chunk ends in
+            end = min(fread.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def _convert_range(file_name: str, start: int, end: int, use_mmap: bool, encoding: str) -> List[Tuple[str, str, str]]:
+    with open(file_name, "rb") as fread:
+        if use_mmap:
+            with mmap.mmap(fread.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                data = mapped[start:end]
+        else:
+            fread.seek(start)
+            data = fread.read(end - start)
+
+    # Reading through a TextIOWrapper splits lines exactly as reading the file in text mode would
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding=encoding)
+    return list(streaming.convert_lines(lines))
@@ -0,0 +1,197 @@
+"""Help on module persistent_cache:
+
+NAME
+    persistent_cache
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    A cache of the results of number_in_words, kept in an SQLite database on disk, so that it outlives the
+    process and can be shared by several processes at once. The database is in WAL mode, so readers don't
+    wait for each other, or for a writer.
+
+    Every result is stored under a key of the number and the options that the words depend on: the version
+    of the key (CACHE_VERSION, which changes whenever the words of a number might) and the settings of the
+    locale. Results of other versions or locales are never returned, and make way for new results as they age.
+
+    The cache holds at most maxsize results. When it is full, the results that were stored first are evicted
+    first. Reads don't write to the database, so finding a result doesn't hold up other processes.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+from . import batch as bt
+from . import locales
+from . import string_processing as sp
+
+# Part of every key. Changed whenever the words of a number might change, so that older results aren't returned.
+CACHE_VERSION = 1
+
+# The most numbers that are looked up with one query, below SQLite's limit on the number of parameters
+_QUERY_SIZE = 30000 if sqlite3.sqlite_version_info >= (3, 32) else 900
+
+# Reading every result is about this many times quicker per row than looking results up one by one, so when a call
+# asks for more than this share of the results in the cache, they are all read instead
+_SCAN_RATIO = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    options TEXT NOT NULL,
+    number TEXT NOT NULL,
+    words TEXT NOT NULL,
+    PRIMARY KEY (options, number)
+)"""
+
+
+class PersistentCache:
+    """A cache of the results of number_in_words, in an SQLite database that several processes can share.
+
+    Example:
+        with PersistentCache("numbers.sqlite") as cache:
+            words = cache.numbers_in_words(prices)
+
+    Arguments:
+        path -- the path of the database, which is created if it doesn't exist
+
+    Keyword arguments:
+        maxsize -- default 1000000, the maximum number of results that are kept. The oldest are evicted first.
+        timeout -- default 30.0, the number of seconds to wait for another process that is writing to the database.
+
+    hits and misses count the distinct numbers of each call that were found in the cache, and that weren't.
+    A PersistentCache can be used by several threads, but not by several processes: each process opens its own.
+    """
+
+    def __init__(self, path: str, maxsize: int = 1000000, timeout: float = 30.0):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be 1 or more, not {maxsize}")
+
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+
+    def number_in_words(self, number: sp.Number, locale: sp.LocaleArgument = None) -> str:
+        """Returns the value of a number in words, exactly as number_in_words(number, locale=locale) does, from
+        the cache if it is there."""
+        return self.numbers_in_words((number,), locale)[0]
+
+    def numbers_in_words(self, numbers: Iterable[sp.Number], locale: sp.LocaleArgument = None) -> List[str]:
+        """Returns the values of a collection of numbers in words, in the order they were given. The numbers are
+        looked up together, and the ones that weren't in the cache are converted and stored together."""
+        locale = locales.EN_GB if locale is None else locales.get_locale(locale)
+        options = _get_options_key(locale)
+
+        numbers = list(numbers)
+        keys = [_get_number_key(number) for number in numbers]
+        found = self._get(options, set(keys))
+
+        missing: Dict[str, str] = {}
+        results = []
+        for number, key in zip(numbers, keys):
+            words = found.get(key)
+            if words is None:
+                words = missing.get(key)
+                if words is None:
+                    words = missing[key] = sp.number_in_words(number, block_table=True, locale=locale)
+            results.append(words)
+
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            self._put(options, missing.items())
+
+        return results
+
+    def warm(self, file_name: str, locale: sp.LocaleArgument = None, encoding: str = "utf-8",
+             batch_size: int = 10000) -> int:
+        """Converts and stores the numbers in a corpus file, one per line, that aren't in the cache yet. Returns
+        the number of results that were added."""
+        added = 0
+        with open(file_name, "r", encoding=encoding) as f:
+            for numbers in bt._iter_batches((line.strip() for line in f if line.strip()), batch_size):
+                misses = self.misses
+                self.numbers_in_words(numbers, locale)
+                added += self.misses - misses
+        return added
+
+    def clear(self):
+        """Removes every result, and resets the statistics."""
+        with self._lock:
+            self._connection.execute("DELETE FROM results")
+        self.hits = self.misses = 0
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT count(*) FROM results").fetchone()[0]
+
+    def __enter__(self) -> "PersistentCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get(self, options: str, keys: Set[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        with self._lock:
+            # The rowids of the results are about contiguous (see _put), so this is about the number of results
+            first, last = self._connection.execute(
+                "SELECT (SELECT min(rowid) FROM results), (SELECT max(rowid) FROM results)").fetchone()
+            if first is None:
+                return found
+
+            if len(keys) * _SCAN_RATIO >= last - first + 1:
+                for number, words in self._connection.execute(
+                        "SELECT number, words FROM results WHERE options = ?", (options,)):
+                    if number in keys:
+                        found[number] = words
+                return found
+
+            for batch in bt._iter_batches(keys, _QUERY_SIZE):
+                parameters = ",".join("?" * len(batch))
+                found.update(self._connection.execute(
+                    f"SELECT number, words FROM results WHERE options = ? AND number IN ({parameters})",
+                    [options, *batch]))
+        return found
+
+    def _put(self, options: str, results: Iterable[Tuple[str, str]]):
+        # Rows are only ever added at the end and evicted from the front, so the rowids of the oldest rows are the
+        # smallest, and the rows to evict are the ones more than maxsize rowids behind the newest.
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO results (options, number, words) VALUES (?, ?, ?)",
+                    ((options, number, words) for number, words in results))
+                connection.execute(
+                    "DELETE FROM results WHERE rowid <= (SELECT max(rowid) FROM results) - ?", (self.maxsize,))
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+
+def _get_options_key(locale: locales.Locale) -> str:
+    # Everything that the words of a number depend on, other than the number
+    return repr((CACHE_VERSION, locale.separator, locale.decimal_point, locale.grouping, locale.conjunction,
+                 locale.block_separator, locale.negative, locale.point))
+
+
+def _get_number_key(number: sp.Number) -> str:
+    # The type is part of the key of numbers that aren't strings, since e.g. the string "1/2" isn't a number, but
+    # Fraction(1, 2) is
+    return str(number) if isinstance(number, str) else f"{type(number).__name__}:{number}"
@@ -0,0 +1,120 @@
+"""Help on module scale_names:
+
+NAME
+    scale_names
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Generates the name of the scale of a block ("thousand", "million", ..., "centillion", ...) from the number
+    of groups of three zeros that follow it, using the Conway-Wechsler system, so that there is no upper limit
+    to the numbers that can be expressed. Names are generated on demand and remembered.
+
+    The name of 10^(3n+3) is built from the latin prefix of n: each group of three digits of n, from the most
+    significant, becomes a units, tens and hundreds prefix (or "ni" for 000), followed by "lli", and the whole
+    ends in "on". For example, n = 1 gives "million" and n = 1001 gives "millimillion".
+
+    scale_groups does the reverse: since no prefix contains "lli", a name splits into its prefixes at every "lli".
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+# The prefixes of 1 to 9, when they stand alone
+_small_prefixes = ("ni", "mi", "bi", "tri", "quadri", "quinti", "sexti", "septi", "octi", "noni")
+
+# Each of the prefixes below are followed by the markers that decide how a units prefix in front of them changes
+_units = ("", "un", "duo", "tre", "quattuor", "quinqua", "se", "septe", "octo", "nove")
+_tens = (
+    ("", ""), ("deci", "n"), ("viginti", "ms"), ("triginta", "ns"), ("quadraginta", "ns"), ("quinquaginta", "ns"),
+    ("sexaginta", "n"), ("septuaginta", "n"), ("octoginta", "mx"), ("nonaginta", ""))
+_hundreds = (
+    ("", ""), ("centi", "nx"), ("ducenti", "n"), ("trecenti", "ns"), ("quadringenti", "ns"), ("quingenti", "ns"),
+    ("sescenti", "n"), ("septingenti", "n"), ("octingenti", "mx"), ("nongenti", ""))
+
+# units prefix: ((marker, changed prefix), ...)
+_unit_changes = {
+    "tre": (("s", "tres"), ("x", "tres")),
+    "se": (("s", "ses"), ("x", "sex")),
+    "septe": (("m", "septem"), ("n", "septen")),
+    "nove": (("m", "novem"), ("n", "noven")),
+}
+
+
+@lru_cache(maxsize=None)
+def scale_name(num_of_groups: int) -> str:
+    """Returns the name of the scale of a block that is followed by num_of_groups groups of three zeros."""
+    if num_of_groups == 1:
+        return "thousand"
+
+    n = num_of_groups - 1
+    groups = []
+    while True:
+        n, group = divmod(n, 1000)
+        groups.append(group)
+        if not n:
+            break
+
+    return "".join(f"{_get_prefix(group)}lli" for group in reversed(groups)) + "on"
+
+
+def scale_groups(name: str) -> int:
+    """Returns the number of groups of three zeros that follow a block with the scale name. Raises ValueError if
+    name isn't the name of a scale."""
+    if name == "thousand":
+        return 1
+
+    prefixes = name[:-2].split("lli") if name.endswith("llion") else [""]
+    if prefixes[-1]:  # the name has to end in "llion"
+        raise ValueError(f"'{name}' is not the name of a scale")
+
+    prefix_values = _get_prefix_values()
+    n = 0
+    for prefix in prefixes[:-1]:
+        try:
+            n = n*1000 + prefix_values[prefix]
+        except KeyError:
+            raise ValueError(f"'{name}' is not the name of a scale") from None
+
+    # Leading "ni" prefixes would name a smaller scale in more than one way
+    if scale_name(n + 1) != name:
+        raise ValueError(f"'{name}' is not the name of a scale")
+
+    return n + 1
+
+
+# prefix : group, for every group 000 - 999
+_prefix_values: Optional[Dict[str, int]] = None
+
+
+def _get_prefix_values() -> Dict[str, int]:
+    global _prefix_values
+    if _prefix_values is None:
+        _prefix_values = {_get_prefix(group): group for group in range(1000)}
+    return _prefix_values
+
+
+def _get_prefix(group: int) -> str:
+    if group < 10:
+        return _small_prefixes[group]
+
+    hundreds, rest = divmod(group, 100)
+    tens, units = divmod(rest, 10)
+    tens_prefix, tens_markers = _tens[tens]
+    hundreds_prefix, hundreds_markers = _hundreds[hundreds]
+
+    # The units prefix changes according to the prefix that immediately follows it
+    markers = tens_markers if tens else hundreds_markers
+    units_prefix = _units[units]
+    for marker, changed_prefix in _unit_changes.get(units_prefix, ()):
+        if marker in markers:
+            units_prefix = changed_prefix
+            break
+
+    # The final vowel is replaced by an "i" e.g. "viginti" stays "viginti", but "triginta" becomes "triginti"
+    prefix = f"{units_prefix}{tens_prefix}{hundreds_prefix}"
+    return f"{prefix[:-1]}i"
@@ -0,0 +1,105 @@
+"""Help on module scanner:
+
+NAME
+    scanner
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Finds every number in a phrase in a single pass, with one compiled regular expression, instead of splitting
+    the phrase into words and validating each number-like word separately.
+
+    The expression accepts exactly the words that _get_number_parts_from_word accepts:
+        - an optional "-",
+        - an integer that is either plain digits, or digits with "," separators, where every group but the
+            first has 3 digits (if there are no decimals, the last group may have any number of digits),
+        - optionally, a "." followed by decimal digits,
+        - and a suffix of anything but digits and spaces.
+    The digits are ASCII digits. A word with anything else before its suffix (e.g. "5-10", "12a3" or "0.x0") isn't
+    a number.
+
+    The separator, decimal point and group sizes are those of a locale. The expression is compiled once for every
+    locale that is scanned for.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterator, List, Optional, Pattern, Tuple
+
+from . import locales
+from . import number_parts as np
+from . import string_processing as sp
+
+
+@lru_cache(maxsize=None)
+def _get_number_word(locale: locales.Locale) -> Pattern:
+    separator, decimal_point = re.escape(locale.separator), re.escape(locale.decimal_point)
+    # Every group after the first one (from the right) has the same size, and so does the leading group, at most
+    size_0, size_n = locale.group_size(0), locale.group_size(1)
+    grouped = f"[0-9]{{1,{size_n}}}(?:{separator}[0-9]{{{size_n}}})*{separator}"
+
+    # A word starts at the start of the phrase or after a space, and ends at the end of the phrase or before a space.
+    # The lookahead for a digit (or "-" and a digit) isn't needed for correctness, but it rejects most positions in a
+    # phrase before the alternatives below are tried, which makes scanning ordinary text about a third faster.
+    return re.compile(
+        r"(?<![^ ])(?=-?[0-9])"
+        r"(-)?"
+        r"(?:"
+        rf"({grouped}[0-9]{{{size_0}}}|[0-9]+){decimal_point}([0-9]+)"  # with decimals
+        rf"|({grouped}[0-9]+|[0-9]+)"  # without decimals
+        r")"
+        r"([^0-9 ]*)"
+        r"(?![^ ])")
+
+
+def scan_number_parts(
+        phrase: str, locale: locales.Locale = locales.EN_GB) -> Iterator[Tuple[Tuple[int, int], np.NumberParts]]:
+    """Yields the span of every number word in the phrase, with its NumberParts, from left to right."""
+    separator = locale.separator
+    for match in _get_number_word(locale).finditer(phrase):
+        # The parts refer to the phrase by their offsets, so no substrings are copied
+        if match.start(4) > -1:  # without decimals
+            integer_start, integer_end = match.span(4)
+            decimals_start = decimals_end = integer_end
+        else:
+            integer_start, integer_end = match.span(2)
+            decimals_start, decimals_end = match.span(3)
+
+        found_separator = separator if phrase.find(separator, integer_start, integer_end) > -1 else ""
+        yield match.span(), np.NumberParts.from_offsets(
+            phrase, integer_start, integer_end, decimals_start, decimals_end, match.start(1) > -1, found_separator,
+            match.end())
+
+
+def numbers_in_words_from_phrase(
+        phrase: str, cached_blocks: Optional[bool] = None, block_table=False,
+        locale: sp.LocaleArgument = None) -> List[str]:
+    """Finds every number in a phrase and returns their values in words.
+
+    Arguments:
+        phrase -- a collection of words, separated by spaces
+
+    Keyword arguments:
+        cached_blocks -- default None, indicates whether number BLOCKS (substrings) will be cached when
+                            procesing a string. None leaves it to the current cache_policy.
+        block_table   -- default False, indicates whether blocks are looked up in a precomputed table of
+                            all 1000 block values, instead of being rendered (or cached) per call.
+        locale        -- default None, the name of the locale (e.g. "en-US") or a Locale, that decides how numbers
+                            are written and said. None is "en-GB".
+
+    Returns:
+        List[str] -- the value of every number in the phrase in words, from left to right. Words that look like
+                        numbers, but can't be interpreted as one, are left out.
+    """
+    locale = locales.EN_GB if locale is None else locales.get_locale(locale)
+    if cached_blocks is None:
+        return [sp._get_number_in_words_from_parts(parts, block_table, locale)
+                for _, parts in scan_number_parts(phrase, locale)]
+
+    with sp.cache_policy(cached_blocks=cached_blocks):
+        return [sp._get_number_in_words_from_parts(parts, block_table, locale)
+                for _, parts in scan_number_parts(phrase, locale)]
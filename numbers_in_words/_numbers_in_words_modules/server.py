@@ -0,0 +1,322 @@
+"""Help on module server:
+
+NAME
+    server
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    A long-running conversion server, so that many processes can share one warm cache instead of each keeping
+    its own, and a client for it.
+
+    The server listens on a Unix domain socket or a TCP port, and speaks a line protocol. Every request is
+    one line of UTF-8 with three fields separated by tabs, and is answered with one line, in the order that
+    the requests of a connection were sent:
+
+        n<TAB>locale<TAB>number      -- number_in_words(number, locale=locale)
+        p<TAB>locale<TAB>phrase      -- number_in_words_from_phrase(phrase, locale=locale)
+
+        =words                       -- the answer
+        !message                     -- the request failed, e.g. because the locale is unknown
+
+    An empty locale is "en-GB". Requests that arrive together, from any number of connections, are answered
+    as one micro-batch: all of the requests that are read in one iteration of the event loop (or within
+    batch_delay seconds of the first of them) are converted in one go, through one shared cache, and the
+    answers for each connection are written with one write. Clients can send many requests before reading
+    the answers (pipelining). A connection stops being read while its answers aren't being read.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import asyncio
+import os
+import queue
+import signal
+import socket
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from . import conditional_cache as cc
+from . import string_processing as sp
+
+# A path (for a Unix domain socket) or (host, port)
+Address = Union[str, Tuple[str, int]]
+
+COMMANDS = ("n", "p")
+
+# The most characters that a request can have
+MAX_LINE = 1 << 20
+
+
+def parse_address(address: str) -> Address:
+    """Returns the address of a Unix domain socket, for a path, or of a TCP port, for "PORT" (on localhost) or
+    "HOST:PORT". An IPv6 host may be in brackets, e.g. "[::1]:8000", or not, e.g. "::1:8000"."""
+    if address.isdigit():
+        return "127.0.0.1", int(address)
+
+    host, _, port = address.rpartition(":")
+    if host.startswith("[") and host.endswith("]"):
+        host = host[1:-1]
+    # A host that ends in ":" is the "::" of an IPv6 address without a port, e.g. "::1"
+    if host and not host.endswith(":") and port.isdigit() and "/" not in address:
+        return host, int(port)
+
+    return address
+
+
+class ConversionServer:
+    """A server that converts numbers for its clients, in micro-batches, through one shared cache.
+
+    Example:
+        server = ConversionServer()
+        await server.start("/tmp/numbers_in_words.sock")
+        await server.serve_forever()
+
+    Keyword arguments:
+        cache_size  -- default 100000, the number of answers that are kept in the cache, which is reported by
+                        cache_info as "server" while the server is started.
+        batch_delay -- default 0.0, the number of seconds to wait for more requests before a batch is converted.
+                        0 converts every request that was read in one iteration of the event loop together.
+    """
+
+    def __init__(self, cache_size: int = 100000, batch_delay: float = 0.0):
+        self.batch_delay = batch_delay
+        self.requests = 0
+        self.batches = 0
+        # The cache belongs to this server, so it is only registered while the server is started
+        self._cache = cc.ConditionalLRUCache(starting_condition=True, maxsize=cache_size, name="server", register=False)
+        self._convert = self._cache(_convert)
+        self._pending: List[Tuple["_Connection", bytes]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._address: Optional[Address] = None
+
+    async def start(self, address: Address):
+        """Starts listening on a Unix domain socket (for a path) or a TCP port (for (host, port))."""
+        loop = asyncio.get_running_loop()
+        if isinstance(address, str):
+            if os.path.exists(address):  # left behind by a server that wasn't stopped
+                os.unlink(address)
+            self._server = await loop.create_unix_server(lambda: _Connection(self), address)
+        else:
+            self._server = await loop.create_server(lambda: _Connection(self), *address)
+        # The address of an IPv6 socket also has its flow info and scope id, which clients don't connect with
+        address = self._server.sockets[0].getsockname()
+        self._address = address if isinstance(address, str) else tuple(address[:2])
+        self._cache.register()
+
+    @property
+    def address(self) -> Address:
+        """The address the server listens on, e.g. to find the port it was given for port 0."""
+        assert self._address is not None, "the server hasn't been started"
+        return self._address
+
+    async def serve_forever(self):
+        assert self._server is not None, "the server hasn't been started"
+        await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            address = self.address
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            self._cache.unregister()
+            if isinstance(address, str) and os.path.exists(address):
+                os.unlink(address)
+
+    def _submit(self, connection: "_Connection", line: bytes):
+        if not self._pending:
+            loop = asyncio.get_running_loop()
+            if self.batch_delay:
+                loop.call_later(self.batch_delay, self._answer)
+            else:
+                loop.call_soon(self._answer)
+        self._pending.append((connection, line))
+
+    def _answer(self):
+        pending, self._pending = self._pending, []
+        self.requests += len(pending)
+        self.batches += 1
+
+        answers: Dict[_Connection, List[bytes]] = {}
+        for connection, line in pending:
+            answers.setdefault(connection, []).append(self._answer_line(line))
+
+        for connection, lines in answers.items():
+            if not connection.transport.is_closing():
+                connection.transport.write(b"".join(lines))
+
+    def _answer_line(self, line: bytes) -> bytes:
+        try:
+            command, locale, text = line.decode().rstrip("\r").split("\t", 2)
+            words = self._convert(command, locale, text)
+        except Exception as e:  # a bad request is answered, and never stops the server
+            return f"!{type(e).__name__}: {e}\n".encode()
+
+        return f"={words}\n".encode()
+
+
+def _convert(command: str, locale: str, text: str) -> str:
+    if command == "n":
+        return sp.number_in_words(text, block_table=True, locale=locale or None)
+    if command == "p":
+        return sp.number_in_words_from_phrase(text, block_table=True, locale=locale or None)
+    raise ValueError(f"unknown command '{command}', expected one of: {', '.join(COMMANDS)}")
+
+
+class _Connection(asyncio.Protocol):
+    def __init__(self, server: ConversionServer):
+        self.server = server
+        self.transport: asyncio.Transport
+        self.buffer = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        lines = (self.buffer + data if self.buffer else data).split(b"\n")
+        self.buffer = lines.pop()
+        if len(self.buffer) > MAX_LINE:
+            self.transport.write(f"!ValueError: requests can't be longer than {MAX_LINE} characters\n".encode())
+            self.transport.close()
+            return
+
+        for line in lines:
+            self.server._submit(self, line)
+
+    # The client isn't reading its answers, so its requests aren't read either, until it catches up
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+def serve(address: Address, cache_size: int = 100000, batch_delay: float = 0.0):
+    """Runs a ConversionServer on address until the process is interrupted or terminated."""
+    async def run():
+        server = ConversionServer(cache_size, batch_delay)
+        await server.start(address)
+        try:
+            # Stopped cleanly on SIGTERM too (e.g. by a service manager), where signal handlers are supported
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, AttributeError):
+            pass
+
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+class ConversionClient:
+    """A client of a ConversionServer, with a pool of connections that can be shared by threads.
+
+    Example:
+        client = ConversionClient("/tmp/numbers_in_words.sock")
+        client.number_in_words("1234")
+        client.batch(invoice_totals, locale="en-US")
+
+    Arguments:
+        address -- the address of the server: a path (for a Unix domain socket) or (host, port)
+
+    Keyword arguments:
+        pool_size      -- default 8, the most idle connections that are kept open, to be used again.
+        pipeline_depth -- default 1000, the most requests of a batch that are sent before their answers are read.
+        timeout        -- default 30.0, the number of seconds to wait for the server.
+    """
+
+    def __init__(self, address: Address, pool_size: int = 8, pipeline_depth: int = 1000, timeout: float = 30.0):
+        self.address = address
+        self.pool_size = pool_size
+        self.pipeline_depth = pipeline_depth
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[_ClientConnection]" = queue.LifoQueue()
+
+    def number_in_words(self, number: str, locale: Optional[str] = None) -> str:
+        return self._request([_encode("n", locale, number)])[0]
+
+    def number_in_words_from_phrase(self, phrase: str, locale: Optional[str] = None) -> str:
+        return self._request([_encode("p", locale, phrase)])[0]
+
+    def batch(self, texts: Iterable[str], phrases=False, locale: Optional[str] = None) -> List[str]:
+        """Returns the values of a collection of numbers (or of the numbers in phrases) in words, in the order
+        they were given. The requests are pipelined, pipeline_depth at a time, over one connection."""
+        command = "p" if phrases else "n"
+        return self._request([_encode(command, locale, text) for text in texts])
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+    def __enter__(self) -> "ConversionClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, requests: List[bytes]) -> List[str]:
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = _ClientConnection(self.address, self.timeout)
+
+        try:
+            answers = []
+            for start in range(0, len(requests), self.pipeline_depth):
+                answers.extend(connection.send(requests[start:start + self.pipeline_depth]))
+        except BaseException:
+            connection.close()  # its answers may be out of step with its requests now
+            raise
+
+        if self._idle.qsize() < self.pool_size:
+            self._idle.put(connection)
+        else:
+            connection.close()
+
+        # Every answer has been read, so the connection can be used again, even if some requests failed
+        for answer in answers:
+            if answer[0] == "!":
+                raise ValueError(answer[1:])
+        return [answer[1:] for answer in answers]
+
+
+class _ClientConnection:
+    def __init__(self, address: Address, timeout: float):
+        if isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            try:
+                self.socket.connect(address)
+            except BaseException:
+                self.socket.close()
+                raise
+        else:  # IPv4 or IPv6, whichever the host resolves to
+            self.socket = socket.create_connection(address, timeout)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.socket.makefile("rb")
+
+    def send(self, requests: List[bytes]) -> List[str]:
+        self.socket.sendall(b"".join(requests))
+        answers = []
+        for _ in requests:
+            line = self.file.readline()
+            if not line.endswith(b"\n"):
+                raise ConnectionError("the server closed the connection")
+            answers.append(line[:-1].decode())
+        return answers
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+def _encode(command: str, locale: Optional[str], text: str) -> bytes:
+    if "\n" in text or "\r" in text:
+        raise ValueError("requests can't contain line breaks")
+    return f"{command}\t{locale or ''}\t{text}\n".encode()
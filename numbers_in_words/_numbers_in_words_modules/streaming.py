@@ -0,0 +1,83 @@
+"""Help on module streaming:
+
+NAME
+    streaming
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    Converts a stream of lines into a stream of results, one generator stage at a time, so that memory use
+    stays constant however long the stream is. Results are written out in batches, as TSV or JSON Lines.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import json
+from typing import Callable, Dict, Iterable, Iterator, TextIO, Tuple
+
+from . import number_parts as np
+from . import string_processing as sp
+
+# line, number, words
+Result = Tuple[str, str, str]
+
+
+def convert_lines(lines: Iterable[str], block_table=True) -> Iterator[Result]:
+    """Yields the line (without its line ending), the number found in it and that number in words, for every line."""
+    for line in lines:
+        line = line.rstrip("\r\n")
+        number_parts = sp._get_number_parts_from_phrase(line)
+
+        if not number_parts.is_valid:
+            yield line, "", "number invalid"
+        else:
+            yield line, _format_number(number_parts), sp._get_number_in_words_from_parts(number_parts, block_table)
+
+
+def _format_number(number_parts: np.NumberParts) -> str:
+    negative = "-" if number_parts.negative else ""
+    decimals = f".{number_parts.decimals}" if number_parts.decimals else ""
+    return f"{negative}{number_parts.integer}{decimals}"
+
+
+def format_tsv(result: Result) -> str:
+    return "\t".join(_escape_tsv(field) for field in result) + "\n"
+
+
+def _escape_tsv(field: str) -> str:
+    if "\\" in field or "\t" in field or "\r" in field:
+        field = field.replace("\\", "\\\\").replace("\t", "\\t").replace("\r", "\\r")
+    return field
+
+
+def format_jsonl(result: Result) -> str:
+    line, number, words = result
+    return json.dumps({"line": line, "number": number, "words": words}, ensure_ascii=False) + "\n"
+
+
+FORMATTERS: Dict[str, Callable[[Result], str]] = {
+    "tsv": format_tsv,
+    "jsonl": format_jsonl,
+}
+
+
+def write_results(results: Iterable[Result], output: TextIO, output_format="tsv", batch_size=4096) -> int:
+    """Writes results to output in batches of batch_size lines, and returns the number of results written."""
+    formatter = FORMATTERS[output_format]
+
+    count = 0
+    batch = []
+    for result in results:
+        batch.append(formatter(result))
+        if len(batch) == batch_size:
+            output.write("".join(batch))
+            count += len(batch)
+            batch.clear()
+
+    if batch:
+        output.write("".join(batch))
+        count += len(batch)
+
+    return count
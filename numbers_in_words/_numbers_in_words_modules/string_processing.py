@@ -11,201 +11,700 @@ AUTHOR:
     https://github.com/francoiswessels/numbers_in_words
 """
 
+import os
+from contextlib import contextmanager
 from math import ceil
 from functools import lru_cache
-from typing import Union, Tuple, cast
-from enum import Enum
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, TextIO, Union, Sequence, Tuple, Optional, cast
 
 from . import conditional_cache as cc
+from . import locales
 from . import number_parts as np
+from . import scale_names as scales
+from . import styles
 from . import value_maps as maps
 
-conditional_block_cache = cc.ConditionalLRUCache()
-conditional_number_cache = cc.ConditionalLRUCache()
+# decimal, fractions and numbers are only imported when a number that isn't a str or an int is converted, which
+# means whoever made it has imported them already, so that importing the package doesn't pay for them.
+if TYPE_CHECKING:
+    from decimal import Decimal
+    from fractions import Fraction
 
+conditional_block_cache = cc.ConditionalLRUCache(starting_condition=True, name="block")
+conditional_number_cache = cc.ConditionalLRUCache(starting_condition=False, name="number")
 
-def number_in_words_from_phrase(phrase: str, cached_blocks=True, cached_numbers=False) -> str:
+# The name of a locale e.g. "en-US", a Locale, or None for "en-GB"
+LocaleArgument = Union[str, locales.Locale, None]
+
+# What number_in_words accepts. Decimals and fractions are rendered as exact decimals.
+Number = Union[str, int, "Decimal", "Fraction"]
+
+# The code of a currency e.g. "ZAR", a Currency, or None
+CurrencyArgument = Union[str, styles.Currency, None]
+
+# Ints of more blocks than this are split in halves, by powers of 1000, rather than one block at a time, because
+# every divmod of a huge int takes time linear in its size.
+_DIVMOD_BLOCKS = 64
+
+# number of blocks : 1000 ** number of blocks, for the powers that huge ints are split by
+_powers_of_1000: Dict[int, int] = {}
+
+
+@contextmanager
+def cache_policy(cached_blocks: Optional[bool] = None, cached_numbers: Optional[bool] = None):
+    """Sets whether blocks and/or numbers are cached, for the duration of a with block.
+
+    The policy only applies to the current thread or asyncio task, and to calls that don't set cached_blocks or
+    cached_numbers themselves. Arguments that are None leave the current policy in place.
+
+    Example:
+        with cache_policy(cached_numbers=True):
+            words = [number_in_words(n) for n in numbers]
+    """
+    tokens = _set_cache_policy(cached_blocks, cached_numbers)
+    try:
+        yield
+    finally:
+        _reset_cache_policy(tokens)
+
+
+def number_in_words_from_phrase(
+        phrase: str, cached_blocks: Optional[bool] = None, cached_numbers: Optional[bool] = None,
+        block_table=False, locale: LocaleArgument = None, style: str = "cardinal",
+        currency: CurrencyArgument = None) -> str:
     """Finds a number-like substring in a phrase and returns the value in words.
 
     Arguments:
         phrase -- a collection of words, separated by spaces
 
     Keyword arguments:
-        cached_blocks  -- default True, indicates whether number BLOCKS (substrings) will be cached when
+        cached_blocks  -- default None, indicates whether number BLOCKS (substrings) will be cached when
                             procesing a string. This will decrease runtime, but increase memory consumption.
-        cached_numbers -- default False, indicates whether entire number strings will be cached when
+                            None leaves it to the current cache_policy, which caches blocks by default.
+        cached_numbers -- default None, indicates whether entire number strings will be cached when
                             procesing a string. This will decrease runtime, but increase memory consumption.
+                            None leaves it to the current cache_policy, which doesn't cache numbers by default.
+        block_table    -- default False, indicates whether blocks are looked up in a precomputed table of
+                            all 1000 block values, instead of being rendered (or cached) per call.
+                            Takes precedence over cached_blocks.
+        locale         -- default None, the name of the locale (e.g. "en-US") or a Locale, that decides how the
+                            number is written and said. None is "en-GB". Locales other than "en-GB" always
+                            look blocks up in their table.
+        style          -- default "cardinal", how the number is said: "cardinal" ("twenty-one"), "ordinal"
+                            ("twenty-first"), "cheque" ("twenty-one and 45/100") or "currency"
+                            ("twenty-one rand and forty-five cents"). Numbers in any style other than
+                            "cardinal" are never cached, and raise ValueError if they can't be said in it.
+        currency       -- default None, the code of a currency (e.g. "ZAR") or a Currency, for the "currency"
+                            style, which needs one, and the "cheque" style, which names its major unit.
 
     Returns:
         str -- the value of a number in words or, 'number invalid' if no suitable
                 number was found.
     """
 
-    conditional_block_cache.enabled = cached_blocks
-    conditional_number_cache.enabled = cached_numbers
+    if style != "cardinal" or currency is not None:
+        return _styled_number_in_words(phrase, True, cached_blocks, cached_numbers, block_table, locale, style,
+                                       currency)
 
-    number_parts = _get_number_parts_from_phrase(phrase)
+    if locale is not None:
+        return _number_in_words_from_phrase_with_policy(
+            phrase, cached_blocks, cached_numbers, block_table, locales.get_locale(locale))
 
-    if not number_parts.is_valid:
-        return "number invalid"
+    if cached_blocks is None and cached_numbers is None:
+        return _number_in_words_from_phrase(phrase, block_table)
 
-    number_str = _get_number_in_words_from_parts(number_parts)
+    tokens = _set_cache_policy(cached_blocks, cached_numbers)
+    try:
+        return _number_in_words_from_phrase(phrase, block_table)
+    finally:
+        _reset_cache_policy(tokens)
 
-    return number_str
 
+def number_in_words(
+        number: Number, cached_blocks: Optional[bool] = None, cached_numbers: Optional[bool] = None,
+        block_table=False, locale: LocaleArgument = None, style: str = "cardinal",
+        currency: CurrencyArgument = None) -> str:
+    """Returns the value of an integer-like string, an int, a Decimal or a Fraction in words.
 
-@conditional_number_cache
-def number_in_words(number: str, cached_blocks=True, cached_numbers=False) -> str:
-    """Returns the value of an integer-like string in words.
+    Ints are split into blocks with arithmetic, and Decimals and Fractions are rendered as exact decimals,
+    without being checked like strings are. Numbers that aren't strings are never cached, and their blocks are
+    always looked up in the block table. A Fraction that has no exact decimal representation raises ValueError.
 
     Arguments:
-        phrase -- a string, representing an integer number
+        number -- a string, representing a number, or an int, Decimal or Fraction
 
     Keyword arguments:
-        cached_blocks  -- default True, indicates whether number BLOCKS (substrings) will be cached when
+        cached_blocks  -- default None, indicates whether number BLOCKS (substrings) will be cached when
                             procesing a string. This will decrease runtime, but increase memory consumption.
-        cached_numbers -- default False, indicates whether entire number strings will be cached when
+                            None leaves it to the current cache_policy, which caches blocks by default.
+        cached_numbers -- default None, indicates whether entire number strings will be cached when
                             procesing a string. This will decrease runtime, but increase memory consumption.
+                            None leaves it to the current cache_policy, which doesn't cache numbers by default.
+        block_table    -- default False, indicates whether blocks are looked up in a precomputed table of
+                            all 1000 block values, instead of being rendered (or cached) per call.
+                            Takes precedence over cached_blocks.
+        locale         -- default None, the name of the locale (e.g. "en-US") or a Locale, that decides how the
+                            number is written and said. None is "en-GB". Locales other than "en-GB" always
+                            look blocks up in their table.
+        style          -- default "cardinal", how the number is said: "cardinal" ("twenty-one"), "ordinal"
+                            ("twenty-first"), "cheque" ("twenty-one and 45/100") or "currency"
+                            ("twenty-one rand and forty-five cents"). Numbers in any style other than
+                            "cardinal" are never cached, and raise ValueError if they can't be said in it.
+        currency       -- default None, the code of a currency (e.g. "ZAR") or a Currency, for the "currency"
+                            style, which needs one, and the "cheque" style, which names its major unit.
 
     Returns:
         str -- the value of a number in words or, 'number invalid' if no suitable
                 number was found."""
 
-    conditional_block_cache.enabled = cached_blocks
-    conditional_number_cache.enabled = cached_numbers
+    if style != "cardinal" or currency is not None:
+        return _styled_number_in_words(number, False, cached_blocks, cached_numbers, block_table, locale, style,
+                                       currency)
+
+    if not isinstance(number, str):
+        return _get_number_in_words_from_value(
+            number, locales.EN_GB if locale is None else locales.get_locale(locale))
+
+    if locale is not None:
+        return _number_in_words_with_policy(
+            number, cached_blocks, cached_numbers, block_table, locales.get_locale(locale))
+
+    if cached_blocks is None and cached_numbers is None:
+        return _number_in_words(number, block_table)
+
+    tokens = _set_cache_policy(cached_blocks, cached_numbers)
+    try:
+        return _number_in_words(number, block_table)
+    finally:
+        _reset_cache_policy(tokens)
+
+
+def iter_number_in_words(
+        number: str, block_table=True, chunk_size=65536, locale: LocaleArgument = None) -> Iterator[str]:
+    """Yields the value of an integer-like string in words, in chunks, without ever building the whole string.
+
+    Meant for very long numbers, e.g. constants with millions of decimals, whose value in words would take up a lot
+    of memory. Numbers are never cached.
+
+    Arguments:
+        number -- a string, representing a number
+
+    Keyword arguments:
+        block_table -- default True, indicates whether blocks are looked up in the precomputed block table.
+        chunk_size  -- default 65536, the approximate number of characters in each chunk.
+        locale      -- default None, the name of the locale or a Locale. None is "en-GB".
+
+    Yields:
+        str -- consecutive chunks of the value of the number in words. Joined, they are what number_in_words
+                returns.
+    """
+    locale = locales.EN_GB if locale is None else locales.get_locale(locale)
+    parts = _get_number_parts_from_word.__wrapped__(number, locale)
+
+    chunk, size = [], 0
+    for words in _iter_number_words(parts, block_table, locale):
+        chunk.append(words)
+        size += len(words)
+        if size >= chunk_size:
+            yield "".join(chunk)
+            chunk, size = [], 0
+
+    if chunk:
+        yield "".join(chunk)
+
+
+def write_number_in_words(
+        number: str, output: TextIO, block_table=True, chunk_size=65536, locale: LocaleArgument = None) -> int:
+    """Writes the value of an integer-like string in words to output (e.g. a file or a socket), in chunks, without
+    ever building the whole string. See iter_number_in_words.
+
+    Returns:
+        int -- the number of characters written.
+    """
+    written = 0
+    for chunk in iter_number_in_words(number, block_table, chunk_size, locale):
+        output.write(chunk)
+        written += len(chunk)
+
+    return written
+
 
-    parts = _get_number_parts_from_word(number)
+def _set_cache_policy(cached_blocks: Optional[bool], cached_numbers: Optional[bool]):
+    block_token = None if cached_blocks is None else conditional_block_cache.set_enabled(cached_blocks)
+    number_token = None if cached_numbers is None else conditional_number_cache.set_enabled(cached_numbers)
+    return block_token, number_token
 
-    return _get_number_in_words_from_parts(parts)
+
+def _reset_cache_policy(tokens):
+    block_token, number_token = tokens
+    if number_token is not None:
+        conditional_number_cache.reset_enabled(number_token)
+    if block_token is not None:
+        conditional_block_cache.reset_enabled(block_token)
 
 
-def _get_number_in_words_from_parts(number_parts: np.NumberParts):
+def _number_in_words_with_policy(
+        number: str, cached_blocks: Optional[bool], cached_numbers: Optional[bool], block_table: bool,
+        locale: locales.Locale) -> str:
+    if cached_blocks is None and cached_numbers is None:
+        return _number_in_words(number, block_table, locale)
+
+    tokens = _set_cache_policy(cached_blocks, cached_numbers)
+    try:
+        return _number_in_words(number, block_table, locale)
+    finally:
+        _reset_cache_policy(tokens)
+
+
+def _number_in_words_from_phrase_with_policy(
+        phrase: str, cached_blocks: Optional[bool], cached_numbers: Optional[bool], block_table: bool,
+        locale: locales.Locale) -> str:
+    if cached_blocks is None and cached_numbers is None:
+        return _number_in_words_from_phrase(phrase, block_table, locale)
+
+    tokens = _set_cache_policy(cached_blocks, cached_numbers)
+    try:
+        return _number_in_words_from_phrase(phrase, block_table, locale)
+    finally:
+        _reset_cache_policy(tokens)
+
+
+def _styled_number_in_words(
+        number: Number, phrase: bool, cached_blocks: Optional[bool], cached_numbers: Optional[bool],
+        block_table: bool, locale: LocaleArgument, style: str, currency: CurrencyArgument) -> str:
+    if style not in styles.STYLES:
+        raise ValueError(f"unknown style '{style}', expected one of: {', '.join(styles.STYLES)}")
+    if currency is not None and style not in ("cheque", "currency"):
+        raise ValueError(f"a currency can't be given for the '{style}' style")
+    if currency is None and style == "currency":
+        raise ValueError("the 'currency' style needs a currency")
+
+    locale = locales.EN_GB if locale is None else locales.get_locale(locale)
+    currency = None if currency is None else styles.get_currency(currency)
+
+    tokens = _set_cache_policy(cached_blocks, cached_numbers)
+    try:
+        number_parts = _get_styled_number_parts(number, phrase, locale)
+        if not number_parts.is_valid:
+            return "number invalid"
+        if style == "ordinal":
+            return _get_ordinal_words(number_parts, block_table, locale)
+        if style == "cheque":
+            return _get_cheque_words(number_parts, block_table, locale, currency)
+        return _get_currency_words(number_parts, block_table, locale, cast(styles.Currency, currency))
+    finally:
+        _reset_cache_policy(tokens)
+
+
+def _get_styled_number_parts(number: Number, phrase: bool, locale: locales.Locale) -> np.NumberParts:
+    if phrase:
+        return _get_number_parts_from_phrase(cast(str, number), locale)
+    if isinstance(number, str):
+        return _get_number_parts_from_word(number, locale)
+
+    from numbers import Integral
+
+    if isinstance(number, Integral) and not isinstance(number, bool):
+        blocks, negative = _get_blocks_from_int(int(number))
+        digits = _get_digits_from_blocks(blocks)
+        return np.NumberParts.from_offsets(digits, 0, len(digits), len(digits), len(digits), negative)
+
+    from decimal import Decimal
+    from fractions import Fraction
+
+    if isinstance(number, (Decimal, Fraction)):
+        return _get_number_parts_from_value(number)
+
+    raise TypeError(f"Expected a str, an int, a Decimal or a Fraction, but got {type(number).__name__}: {number!r}")
+
+
+def _get_integer_parts(number_str: str, block_table: bool, locale: locales.Locale) -> List[str]:
+    # The words of an integer, from the same block results and scale names as cardinals, or [] for zero
+    if locale.grouping == (3,):
+        return list(_iter_block_parts(*_get_block_results(number_str, block_table, locale)))
+    return list(_iter_lakh_crore_parts(number_str, locale))
+
+
+def _get_ordinal_words(number_parts: np.NumberParts, block_table: bool, locale: locales.Locale) -> str:
+    if number_parts.decimals.strip("0"):
+        raise ValueError(f"{number_parts.source} has decimals, and has no ordinal")
+
+    parts = _get_integer_parts(cast(str, number_parts.integer), block_table, locale)
+    if not parts:
+        return "zeroth"
+
+    # Only the last word changes e.g. "one hundred and twenty-one" becomes "one hundred and twenty-first", and
+    # "one thousand" becomes "one thousandth". Parts can be empty, but never all of them.
+    last = len(parts) - 1
+    while not parts[last]:
+        last -= 1
+    parts[last] = styles.get_ordinal(parts[last])
+
+    words = "".join(parts)
+    return f"{locale.negative} {words}" if number_parts.negative else words
+
+
+def _get_cheque_words(
+        number_parts: np.NumberParts, block_table: bool, locale: locales.Locale,
+        currency: Optional[styles.Currency]) -> str:
+    if number_parts.negative:
+        raise ValueError(f"{number_parts.source} is negative, and can't be written on a cheque")
+
+    minor_digits = 2 if currency is None else currency.minor_digits
+    minor = styles.get_minor_units(number_parts.decimals, minor_digits)
+    words = "".join(_get_integer_parts(cast(str, number_parts.integer), block_table, locale)) or "zero"
+    if minor_digits:
+        words = f"{words}{locale.conjunction}{minor:0{minor_digits}}/{10 ** minor_digits}"
+
+    return words if currency is None else f"{words} {currency.major_plural}"
+
+
+def _get_currency_words(
+        number_parts: np.NumberParts, block_table: bool, locale: locales.Locale, currency: styles.Currency) -> str:
+    number_str = cast(str, number_parts.integer)
+    minor = styles.get_minor_units(number_parts.decimals, currency.minor_digits)
+    words = "".join(_get_integer_parts(number_str, block_table, locale))
+
+    # The minor units are at most 999, so they are always a single block of the table
+    if minor:
+        minor_words = f"{locale.blocks[minor][0]} {currency.minor if minor == 1 else currency.minor_plural}"
+        if words:
+            major = currency.major if number_str.lstrip("0") == "1" else currency.major_plural
+            words = f"{words} {major}{locale.conjunction}{minor_words}"
+        else:
+            words = minor_words
+    elif words:
+        words = f"{words} {currency.major if number_str.lstrip('0') == '1' else currency.major_plural}"
+    else:
+        return f"zero {currency.major_plural}"
+
+    return f"{locale.negative} {words}" if number_parts.negative else words
+
+
+def _number_in_words_from_phrase(phrase: str, block_table=False, locale: locales.Locale = locales.EN_GB) -> str:
+    number_parts = _get_number_parts_from_phrase(phrase, locale)
+
+    if not number_parts.is_valid:
+        return "number invalid"
+
+    return _get_number_in_words_from_parts(number_parts, block_table, locale)
+
+
+@conditional_number_cache
+def _number_in_words(number: str, block_table=False, locale: locales.Locale = locales.EN_GB) -> str:
+    parts = _get_number_parts_from_word(number, locale)
+
+    return _get_number_in_words_from_parts(parts, block_table, locale)
+
+
+def _get_number_in_words_from_parts(
+        number_parts: np.NumberParts, block_table=False, locale: locales.Locale = locales.EN_GB) -> str:
+    return "".join(_iter_number_words(number_parts, block_table, locale))
+
+
+def _iter_number_words(
+        number_parts: np.NumberParts, block_table=False, locale: locales.Locale = locales.EN_GB) -> Iterator[str]:
+    # Yields the value of a number in words, a few words at a time, so that it can be written out as it is produced
+    if not number_parts.is_valid:  # e.g. "abc" or "12a3", which would otherwise have an empty integer, i.e. "zero"
+        yield "number invalid"
+        return
+
     number_str: str = cast(str, number_parts.integer)
+
+    if number_str.count("0") == len(number_str):  # Every block is empty
+        yield "zero"
+        return
+
+    if number_parts.negative:
+        yield f"{locale.negative} "
+
+    if locale.grouping == (3,):
+        yield from _iter_block_parts(*_get_block_results(number_str, block_table, locale))
+    else:
+        yield from _iter_lakh_crore_parts(number_str, locale)
+
+    if number_parts.has_decimals:
+        words = maps.num_to_words_map
+        decimals = number_parts.iter_decimals()
+        yield f" {locale.point} {words[next(decimals)]}"
+        for d in decimals:
+            yield f" {words[d]}"
+
+
+def _get_block_results(
+        number_str: str, block_table: bool, locale: locales.Locale) -> Tuple[Iterator[Tuple[str, str]], int]:
+    # Returns the (words, glue) of every block of an integer, and the number of blocks
     num_of_blocks = ceil(len(number_str)/3)  # A block is three digits, always
     number_str = number_str.zfill(num_of_blocks*3)
 
-    integer_result = ""
-    for i in range(num_of_blocks):
-        block_result, block_glue = _get_block_result(number_str[i*3:(i+1)*3])
+    # Only en-GB can render blocks per call; every other locale has nothing but its table
+    if block_table or locale is not locales.EN_GB:
+        table = locale.blocks
+        return (table[int(number_str[i*3:(i+1)*3])] for i in range(num_of_blocks)), num_of_blocks
 
-        if block_result:
-            if i == (num_of_blocks - 1):
-                if i == 0:  # There was only one block
-                    integer_result += block_result
-                else:  # The last block, but not the only block
-                    integer_result += f"{block_glue}{block_result}"
-            elif i == 0:  # The first block, but not the only block
-                integer_result += f"{block_result} {maps.block_num_to_thousands_map[num_of_blocks - i - 1]}"
-            else:  # Neither the first, nor the last block
-                integer_result += f"{block_glue}{block_result} {maps.block_num_to_thousands_map[num_of_blocks - i - 1]}"
+    return (_get_block_result(number_str[i*3:(i+1)*3]) for i in range(num_of_blocks)), num_of_blocks
+
+
+def _iter_lakh_crore_parts(number_str: str, locale: locales.Locale) -> Iterator[str]:
+    # The integer is split, from the right, into groups of hundreds (3 digits), thousands (2) and lakhs (2), which
+    # repeat for every crore (10^7), e.g. 12,34,56,78,901 is "one thousand two hundred and thirty-four crore, ..."
+    values = []  # least significant first
+    end, size_index = len(number_str), 0
+    while end > 0:
+        size = (3, 2, 2)[size_index % 3]
+        values.append(int(number_str[max(end - size, 0):end]))
+        end -= size
+        size_index += 1
+
+    # "crore" is said once per level, after the least significant group in that level that isn't zero
+    crore_groups = {}
+    for i, value in enumerate(values):
+        if value:
+            crore_groups.setdefault(i // 3, i)
+
+    table = locale.blocks
+    first = True
+    for i in range(len(values) - 1, -1, -1):
+        if not values[i]:
+            continue
+
+        block_result, block_glue = table[values[i]]
+        if not first:
+            # Only the last group is joined with the conjunction, as in "one lakh and five"
+            yield block_glue if i == 0 else locale.block_separator
+        first = False
+
+        yield block_result
+        yield ("", " thousand", " lakh")[i % 3]
+        if i >= 3 and crore_groups[i // 3] == i:
+            yield " crore" * (i // 3)
+
+
+def _get_number_in_words_from_value(number: Union[int, "Decimal", "Fraction"], locale: locales.Locale) -> str:
+    if type(number) is int:
+        return _get_number_in_words_from_blocks(*_get_blocks_from_int(number), locale)
+
+    from decimal import Decimal
+    from fractions import Fraction
+    from numbers import Integral
+
+    if isinstance(number, Integral) and not isinstance(number, bool):
+        return _get_number_in_words_from_blocks(*_get_blocks_from_int(int(number)), locale)
+
+    if isinstance(number, (Decimal, Fraction)):
+        return _get_number_in_words_from_parts(_get_number_parts_from_value(number), True, locale)
+
+    raise TypeError(f"Expected a str, an int, a Decimal or a Fraction, but got {type(number).__name__}: {number!r}")
+
+
+def _get_number_parts_from_value(number: Union["Decimal", "Fraction"]) -> np.NumberParts:
+    from decimal import Decimal
+
+    if isinstance(number, Decimal):
+        if not number.is_finite():
+            raise ValueError(f"{number} is not a finite number")
+        digits = format(number, "f")  # never in scientific notation
+    else:
+        digits = _get_digits_from_fraction(number)
+
+    negative = digits[0] == "-"
+    decimal_index = digits.find(".")
+    if decimal_index == -1:
+        return np.NumberParts.from_offsets(digits, int(negative), len(digits), len(digits), len(digits), negative)
+
+    return np.NumberParts.from_offsets(digits, int(negative), decimal_index, decimal_index+1, len(digits), negative)
+
+
+def _get_digits_from_fraction(number: "Fraction") -> str:
+    # A fraction has an exact decimal representation if its denominator has no prime factors other than 2 and 5,
+    # and then it has as many decimals as the larger of the two powers.
+    denominator, twos, fives = number.denominator, 0, 0
+    while not denominator % 2:
+        denominator //= 2
+        twos += 1
+    while not denominator % 5:
+        denominator //= 5
+        fives += 1
+    if denominator != 1:
+        raise ValueError(f"{number} has no exact decimal representation")
+
+    num_of_decimals = max(twos, fives)
+    blocks, negative = _get_blocks_from_int(number.numerator * 10**num_of_decimals // number.denominator)
+    digits = _get_digits_from_blocks(blocks).zfill(num_of_decimals + 1)
+
+    sign = "-" if negative else ""
+    if not num_of_decimals:
+        return f"{sign}{digits}"
+    return f"{sign}{digits[:-num_of_decimals]}.{digits[-num_of_decimals:]}"
+
+
+def _get_digits_from_blocks(blocks: Sequence[int]) -> str:
+    # Unlike str(int), this isn't limited to sys.get_int_max_str_digits() digits
+    return "".join([str(blocks[0])] + [f"{block:03}" for block in blocks[1:]])
+
+
+def _get_blocks_from_int(number: int) -> Tuple[List[int], bool]:
+    # Returns the integer values of the blocks, most significant first, without leading zero blocks
+    negative = number < 0
+    number = abs(number)
+
+    num_of_blocks = _DIVMOD_BLOCKS
+    while number >= _get_power_of_1000(num_of_blocks):
+        num_of_blocks *= 2
+
+    blocks: List[int] = []
+    _append_blocks(number, num_of_blocks, False, blocks)
+
+    return blocks or [0], negative
+
+
+def _append_blocks(number: int, num_of_blocks: int, padded: bool, blocks: List[int]):
+    # Appends the blocks of a number that has at most num_of_blocks blocks. If padded, leading zero blocks are
+    # appended too, so that exactly num_of_blocks blocks are appended.
+    if num_of_blocks <= _DIVMOD_BLOCKS:
+        chunk = []
+        while number:
+            number, block = divmod(number, 1000)
+            chunk.append(block)
+        if padded:
+            chunk.extend([0] * (num_of_blocks - len(chunk)))
+        blocks.extend(reversed(chunk))
+        return
+
+    half = num_of_blocks // 2
+    high, low = divmod(number, _get_power_of_1000(half))
+    if high or padded:
+        _append_blocks(high, half, padded, blocks)
+    _append_blocks(low, half, padded or high > 0, blocks)
+
+
+def _get_power_of_1000(num_of_blocks: int) -> int:
+    power = _powers_of_1000.get(num_of_blocks)
+    if power is None:
+        power = _powers_of_1000[num_of_blocks] = 1000 ** num_of_blocks
+    return power
+
+
+def _get_number_in_words_from_blocks(
+        blocks: Sequence[int], negative: bool = False, locale: locales.Locale = locales.EN_GB) -> str:
+    # blocks are the integer values of the blocks, most significant first, without leading zero blocks
+    if locale.grouping == (3,):
+        table = locale.blocks
+        integer_result = _join_block_results((table[block] for block in blocks), len(blocks))
+    else:
+        integer_result = "".join(_iter_lakh_crore_parts(_get_digits_from_blocks(blocks), locale))
 
     if not integer_result:
         return "zero"
 
-    negative = "negative " if number_parts.negative else ""
+    return f"{locale.negative} {integer_result}" if negative else integer_result
 
-    if number_parts.decimals:
-        decimals = " ".join([maps.num_to_words_map[d] for d in number_parts.decimals])
-        # TODO: 'point' will have to change in response to regional settings, once they are integrated
-        decimals = f" point {decimals}"
-        return f"{negative}{integer_result}{decimals}"
 
-    return f"{negative}{integer_result}"
+def _join_block_results(block_results: Iterable[Tuple[str, str]], num_of_blocks: int) -> str:
+    return "".join(_iter_block_parts(block_results, num_of_blocks))
 
 
-def _get_number_parts_from_phrase(phrase: str) -> np.NumberParts:
-    # Only clean up numbers that have a chance of being a number
-    maybe_numbers = [_get_number_parts_from_word(word) for word in phrase.split(" ") if _is_number_like(word)]
+def _iter_block_parts(block_results: Iterable[Tuple[str, str]], num_of_blocks: int) -> Iterator[str]:
+    # The parts are joined (or written out) by the caller, rather than added to a string one block at a time, so
+    # that the time it takes stays linear in the number of blocks, however many there are.
+    for i, (block_result, block_glue) in enumerate(block_results):
+        if block_result:
+            if i > 0:  # Not the first block
+                yield block_glue
+            yield block_result
+            if i < num_of_blocks - 1:  # Not the last block
+                yield f" {scales.scale_name(num_of_blocks - i - 1)}"
+
+
+def _get_number_parts_from_phrase(phrase: str, locale: locales.Locale = locales.EN_GB) -> np.NumberParts:
+    # Only clean up numbers that have a chance of being a number, and stop looking as soon as there are two of them
+    number_parts = None
+    for word in phrase.split(" "):
+        if _is_number_like(word):
+            if number_parts is not None:
+                return np.INVALID
+            number_parts = _get_number_parts_from_word(word, locale)
 
     # If only one number-like string was found and we can actually interpret it as a number,
     # then we have found what we are looking for.
-    if len(maybe_numbers) == 1 and maybe_numbers[0].is_valid:
-        return maybe_numbers[0]
+    if number_parts is not None and number_parts.is_valid:
+        return number_parts
 
-    return np.NumberParts()
+    return np.INVALID
 
 
 def _is_number_like(word: str) -> bool:
-    # If the first char in the string is a number, we deem it number-like
-    return word[0].isdigit() or (word[0] == "-" and word[1].isdigit())
+    # If the first char in the string is a number, we deem it number-like. Slicing, rather than indexing, means that
+    # empty words (from consecutive spaces or empty lines) and a lone "-" are simply not number-like.
+    return word[:1].isdigit() or (word[:1] == "-" and word[1:2].isdigit())
 
 
 @conditional_number_cache
-def _get_number_parts_from_word(word: str, separator: str = ",", decimal_point: str = ".") -> np.NumberParts:
-    decimals, suffix = "", ""
-
-    while not word[-1].isdigit():  # strip off any suffix
-        suffix = f"{word[-1]}{suffix}"
-        word = word[:-1]
-
-    last_separator_index, decimal_index = -1, -1
-    for i in range(len(word), 0, -1):  # from right to left
+def _get_number_parts_from_word(word: str, locale: locales.Locale = locales.EN_GB) -> np.NumberParts:
+    # Works with offsets into word, rather than slices of it, so that nothing is copied while the word is checked
+    separator, decimal_point = locale.separator, locale.decimal_point
+    end = len(word)
+    while end and not "0" <= word[end-1] <= "9":  # find the start of any suffix
+        end -= 1
+
+    if not end:  # there are no digits at all
+        return np.INVALID
+
+    negative = word[0] == "-"
+    integer_start = 1 if negative else 0
+    if not "0" <= word[integer_start] <= "9":  # the integer can't be empty, or start with a separator
+        return np.INVALID
+
+    last_separator_index, decimal_index, separators = -1, -1, 0
+    for i in range(end, integer_start, -1):  # from right to left
         if word[i-1] == decimal_point:
             if decimal_index > -1:  # there can be only one decimal point
-                return np.NumberParts()
+                return np.INVALID
             decimal_index = i-1
             if last_separator_index > -1:  # if the decimal point is left of a separator, something is wrong
-                return np.NumberParts()
+                return np.INVALID
         elif word[i-1] == separator:
             if last_separator_index > -1:  # if we had already found a separator character
-                if not (last_separator_index - i == 4):  # spacing has to be exactly 3, plus a separator character
-                    return np.NumberParts()
+                # spacing has to be exactly the size of the group (3, in most locales), plus a separator character
+                if not (last_separator_index - i == locale.group_size(separators) + 1):
+                    return np.INVALID
                 else:
                     last_separator_index = i
             elif decimal_index > -1:  # if we had already found a decimal character
                 last_separator_index = i
-                if not (decimal_index - last_separator_index == 3):  # spacing has to be exactly 3
-                    return np.NumberParts()
+                if not (decimal_index - last_separator_index == locale.group_size(0)):
+                    return np.INVALID
             else:
                 last_separator_index = i
-
-    if not word[0] == "-":  # there is no negative indicator
-        if (last_separator_index - i > 3):
-            return np.NumberParts()
-        if (decimal_index > -1):
-            decimals = word[decimal_index+1:]
-            integer = word[:decimal_index].replace(",", "")
-        else:
-            integer = word.replace(",", "")
-        return np.NumberParts(integer, decimals, suffix)
-
-    if (last_separator_index - i > 4):  # we have a negative indicator that makes it 3 + 1
-        return np.NumberParts()
-
+            separators += 1
+        elif not "0" <= word[i-1] <= "9":  # anything else before the suffix (e.g. "5-10", or "12a3") isn't a number
+            return np.INVALID
+
+    if negative:
+        # we have a negative indicator that makes it the size of the group + 1
+        if (last_separator_index - 1 > locale.group_size(separators) + 1):
+            return np.INVALID
+    elif (last_separator_index - 1 > locale.group_size(separators)):
+        return np.INVALID
+
+    found_separator = separator if last_separator_index > -1 else ""
     if (decimal_index > -1):
-        decimals = word[decimal_index+1:]
-        integer = word[1:decimal_index].replace(",", "")
-    else:
-        integer = word[1:].replace(",", "")
+        return np.NumberParts.from_offsets(word, integer_start, decimal_index, decimal_index+1, end, negative,
+                                           found_separator)
 
-    return np.NumberParts(integer, decimals, suffix, True)
+    return np.NumberParts.from_offsets(word, integer_start, end, end, end, negative, found_separator)
 
 
 @conditional_block_cache
 def _get_block_result(block: str) -> Tuple[str, str]:
-    num_100 = block[0]
-    num_10 = block[1]
-    num_1 = block[2]
-
-    words_100, words_10, words_1 = "", "", ""
-    glue_100_to_10, glue_10_to_1, block_glue = "", "", ", "
-
-    if not num_100 == "0":  # This block has a 100 value
-        words_100 = f"{maps.num_to_words_map[num_100]} hundred"
-        if not (num_10 == "0" and num_1 == "0"):  # ... and this block has either a 10 or a 1 value
-            glue_100_to_10 = " and "
-    elif not (num_10 == "0" and num_1 == "0"):  # This block has NO 100 value and has either a 10 or a 1 value
-        block_glue = " and "
-
-    if not (num_10 == "0" or num_1 == "0"):  # There is a 10 and a 1 that need to be joined.
-        glue_10_to_1 = "-"
-
-    if num_10 == "1":  # Number is in the teens
-        words_teen = maps.num_to_words_map[f"{num_10}{num_1}"]
-        block_result = f"{words_100}{glue_100_to_10}{words_teen}"
-    else:  # Number is NOT in the teens
-        words_10 = "" if num_10 == "0" else maps.num_to_words_map[f"{num_10}0"]
-        words_1 = "" if num_1 == "0" else maps.num_to_words_map[num_1]
-        block_result = f"{words_100}{glue_100_to_10}{words_10}{glue_10_to_1}{words_1}"
-
-    return block_result, block_glue
+    return locales.EN_GB.render_block(block)
+
+
+def _get_block_table() -> Tuple[Tuple[str, str], ...]:
+    # The rendering of every possible block value (000 - 999) in en-GB, indexed by the integer value of the block.
+    # Built lazily on first use, unless NUMBERS_IN_WORDS_EAGER_TABLES is set, in which case it is built at import.
+    return locales.EN_GB.blocks
+
+
+if os.environ.get("NUMBERS_IN_WORDS_EAGER_TABLES"):
+    _get_block_table()
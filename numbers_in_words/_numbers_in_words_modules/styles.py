@@ -0,0 +1,102 @@
+"""Help on module styles:
+
+NAME
+    styles
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    The styles that numbers can be said in, other than as plain cardinals:
+        ordinal  -- "twenty-first", "one hundred and first", "one millionth"
+        cheque   -- "fifty-four and 45/100", as written on a cheque
+        currency -- "fifty-four rand and forty-five cents"
+
+    The styles are rendered by string_processing from the same block results and scale names as cardinals,
+    so they share the block cache and tables. This module has what they need on top of that: the ordinal of a
+    word, the currencies, and the minor units (e.g. cents) of a number.
+
+    Currencies that ship with the package: ZAR, USD, GBP, EUR and INR. Other currencies can be added with
+    register_currency.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+from typing import Dict, NamedTuple, Union
+
+from . import value_maps as maps
+
+STYLES = ("cardinal", "ordinal", "cheque", "currency")
+
+
+class Currency(NamedTuple):
+    """The names of the units of a currency.
+
+    Arguments:
+        code         -- the code that the currency is registered under e.g. "ZAR"
+        major        -- the name of one major unit e.g. "rand"
+        major_plural -- the name of several major units e.g. "rand"
+        minor        -- the name of one minor unit e.g. "cent"
+        minor_plural -- the name of several minor units e.g. "cents"
+
+    Keyword arguments:
+        minor_digits -- default 2, the number of decimals that are minor units (0 to 3)
+    """
+    code: str
+    major: str
+    major_plural: str
+    minor: str
+    minor_plural: str
+    minor_digits: int = 2
+
+
+CURRENCIES: Dict[str, Currency] = {
+    "ZAR": Currency("ZAR", "rand", "rand", "cent", "cents"),
+    "USD": Currency("USD", "dollar", "dollars", "cent", "cents"),
+    "GBP": Currency("GBP", "pound", "pounds", "penny", "pence"),
+    "EUR": Currency("EUR", "euro", "euros", "cent", "cents"),
+    "INR": Currency("INR", "rupee", "rupees", "paisa", "paise"),
+}
+
+
+def register_currency(currency: Currency):
+    """Makes a currency available by its code, replacing any currency that was registered under the same code."""
+    if not 0 <= currency.minor_digits <= 3:
+        raise ValueError(f"minor_digits must be 0 to 3, not {currency.minor_digits}")
+    CURRENCIES[currency.code] = currency
+
+
+def get_currency(currency: Union[str, Currency]) -> Currency:
+    """Returns the currency registered under a code. Currencies are returned as they are."""
+    if isinstance(currency, Currency):
+        return currency
+
+    try:
+        return CURRENCIES[currency]
+    except KeyError:
+        raise ValueError(f"unknown currency '{currency}', expected one of: {', '.join(CURRENCIES)}") from None
+
+
+def get_ordinal(words: str) -> str:
+    """Returns the ordinal of a cardinal e.g. "twenty-first" for "twenty-one", by changing its last word."""
+    end = max(words.rfind(" "), words.rfind("-")) + 1
+    last = words[end:]
+    if not last:
+        return words
+
+    ordinal = maps.cardinal_to_ordinal_map.get(last)
+    if ordinal is None:
+        ordinal = f"{last[:-1]}ieth" if last.endswith("y") else f"{last}th"
+    return f"{words[:end]}{ordinal}"
+
+
+def get_minor_units(decimals: str, minor_digits: int) -> int:
+    """Returns the value of the first minor_digits decimals e.g. 45 for "45" or "450", and 50 for "5".
+
+    Raises:
+        ValueError -- if any of the other decimals isn't zero, since they can't be said in minor units.
+    """
+    if decimals[minor_digits:].strip("0"):
+        raise ValueError(f"'{decimals}' has more than {minor_digits} decimals")
+    return int(decimals[:minor_digits].ljust(minor_digits, "0") or 0)
@@ -47,3 +47,14 @@ block_num_to_thousands_map = {
     13: "duodecillion",
     14: "tredecillion"
 }
+
+# cardinal word : ordinal word, for the words whose ordinal isn't the word + "th" (or "ieth", for "-ty")
+cardinal_to_ordinal_map = {
+    "one": "first",
+    "two": "second",
+    "three": "third",
+    "five": "fifth",
+    "eight": "eighth",
+    "nine": "ninth",
+    "twelve": "twelfth"
+}
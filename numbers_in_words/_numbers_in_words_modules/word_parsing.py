@@ -0,0 +1,152 @@
+"""Help on module word_parsing:
+
+NAME
+    word_parsing
+
+DESCRIPTION
+    A private module belonging to numbers_in_words package.
+
+    The reverse of number_in_words: turns the value of a number in words back into a string of digits, e.g. for
+    checking the words on a cheque against the amount.
+
+    The words are read in a single pass. Every word is looked up in a vocabulary built from value_maps, which
+    says what kind of word it is ("seven", "seventeen", "seventy", "hundred", "million", ...) and its value.
+    Scales that aren't in value_maps are read with scale_names.scale_groups. The value of the current block
+    is built up from its words and, on every scale word, stored with the number of groups of three zeros that
+    follow it. The digits are only put together at the end, so parsing is linear in the length of the words.
+
+AUTHOR:
+    Francois Wessels
+    https://github.com/francoiswessels/numbers_in_words
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from . import scale_names as scales
+from . import value_maps as maps
+
+# The kinds of words
+_UNIT, _TEEN, _TENS, _HUNDRED, _SCALE, _ZERO, _AND, _NEGATIVE, _POINT = range(9)
+
+
+def _build_vocabulary() -> Dict[str, Tuple[int, int]]:
+    vocabulary = {"hundred": (_HUNDRED, 100), "and": (_AND, 0), "negative": (_NEGATIVE, 0), "point": (_POINT, 0)}
+    for digits, word in maps.num_to_words_map.items():
+        value = int(digits)
+        if value == 0:
+            vocabulary[word] = (_ZERO, 0)
+        elif value < 10:
+            vocabulary[word] = (_UNIT, value)
+        elif value < 20:
+            vocabulary[word] = (_TEEN, value)
+        else:
+            vocabulary[word] = (_TENS, value)
+
+    for groups, word in maps.block_num_to_thousands_map.items():
+        vocabulary[word] = (_SCALE, groups)
+
+    return vocabulary
+
+
+# word : (kind, value)
+_vocabulary = _build_vocabulary()
+
+# Words are separated by spaces, commas and hyphens, as number_in_words writes them
+_words = re.compile(r"[a-z]+")
+_allowed = re.compile(r"[a-z ,\-]*")
+
+
+def words_to_number(words: str) -> str:
+    """Returns the digits of a number, from its value in words. The reverse of number_in_words.
+
+    Arguments:
+        words -- the value of a number in words, as number_in_words writes it e.g. "negative one thousand,
+                    two hundred and thirty-four point five". "and" and commas are optional, so the words of
+                    the "en-US" locale can be read too.
+
+    Returns:
+        str -- the number, without thousands separators or leading zeros e.g. "-1234.5".
+
+    Raises:
+        ValueError -- if the words aren't the value of a number.
+    """
+    if not _allowed.fullmatch(words):
+        raise ValueError(f"'{words}' contains characters that aren't part of a number in words")
+
+    blocks: List[Tuple[int, int]] = []  # (the number of groups of three zeros that follow it, value)
+    value, negative, zero = 0, False, False
+    decimals = None
+    for i, match in enumerate(_words.finditer(words)):
+        word = match.group()
+        try:
+            kind, word_value = _vocabulary[word]
+        except KeyError:
+            kind, word_value = _SCALE, _get_scale_groups(word)
+
+        if decimals is not None:  # after "point", there can only be digits
+            if not (kind == _UNIT or kind == _ZERO):
+                raise ValueError(f"'{word}' is not a digit, after 'point'")
+            decimals.append(str(word_value))
+        elif kind == _UNIT:
+            if value % 10 or 10 <= value % 100 < 20 or zero:
+                raise ValueError(f"'{word}' can't follow the words before it")
+            value += word_value
+        elif kind == _TEEN or kind == _TENS:
+            if value % 100 or zero:
+                raise ValueError(f"'{word}' can't follow the words before it")
+            value += word_value
+        elif kind == _HUNDRED:
+            if not 0 < value < 10:
+                raise ValueError("'hundred' has to follow a single digit")
+            value *= 100
+        elif kind == _SCALE:
+            if not value:
+                raise ValueError(f"'{word}' has to follow a number")
+            if blocks and blocks[-1][0] <= word_value:
+                raise ValueError(f"'{word}' can't follow a smaller scale")
+            blocks.append((word_value, value))
+            value = 0
+        elif kind == _ZERO:
+            if value or blocks or zero:
+                raise ValueError("'zero' can only be said on its own")
+            zero = True
+        elif kind == _NEGATIVE:
+            if i:
+                raise ValueError("'negative' can only be the first word")
+            negative = True
+        elif kind == _POINT:
+            if not (value or blocks or zero):
+                raise ValueError("'point' has to follow a number")
+            decimals = []
+        # "and" only makes the words easier to read
+
+    if value:
+        blocks.append((0, value))
+    if not (blocks or zero):
+        raise ValueError(f"'{words}' is not the value of a number")
+    if decimals == []:
+        raise ValueError("'point' has to be followed by digits")
+
+    digits = ["-"] if negative else []
+    if zero:
+        digits.append("0")
+    else:
+        digits.append(str(blocks[0][1]))
+        for (previous_groups, _), (groups, block_value) in zip(blocks, blocks[1:]):
+            digits.append("000" * (previous_groups - groups - 1))  # the blocks that are zero, and not said
+            digits.append(f"{block_value:03}")
+        digits.append("000" * blocks[-1][0])
+
+    if decimals:
+        digits.append(".")
+        digits.extend(decimals)
+
+    return "".join(digits)
+
+
+def _get_scale_groups(word: str) -> int:
+    try:
+        return scales.scale_groups(word)
+    except ValueError:
+        raise ValueError(f"'{word}' is not part of a number in words") from None
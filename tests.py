@@ -1,9 +1,39 @@
 from typing import List, Union, Tuple
+from decimal import Decimal
+from fractions import Fraction
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest as ut
+import unittest.mock
 
+import benchmark_suite
+import fuzz
+import main
 import numbers_in_words as niw
+import numbers_in_words._numbers_in_words_modules.async_api as async_api
+import numbers_in_words._numbers_in_words_modules.columns as columns
+import numbers_in_words._numbers_in_words_modules.conditional_cache as cc
+import numbers_in_words._numbers_in_words_modules.locales as locales
 import numbers_in_words._numbers_in_words_modules.string_processing as sp
 import numbers_in_words._numbers_in_words_modules.number_parts as np
+import numbers_in_words._numbers_in_words_modules.value_maps as maps
+import numbers_in_words._numbers_in_words_modules.parallel as parallel
+import numbers_in_words._numbers_in_words_modules.persistent_cache as persistent_cache
+import numbers_in_words._numbers_in_words_modules.scale_names as scale_names
+import numbers_in_words._numbers_in_words_modules.scanner as scanner
+import numbers_in_words._numbers_in_words_modules.server as server
+import numbers_in_words._numbers_in_words_modules.streaming as streaming
+import numbers_in_words._numbers_in_words_modules.styles as styles
 
 
 class TestModuleAPI(ut.TestCase):
@@ -11,7 +41,31 @@ class TestModuleAPI(ut.TestCase):
         self.public_members = [m for m in dir(niw) if not m[0] == "_"]
         self.expected_members = [
                         "number_in_words",
-                        "number_in_words_from_phrase"]
+                        "number_in_words_from_phrase",
+                        "numbers_in_words_from_phrase",
+                        "iter_number_in_words",
+                        "write_number_in_words",
+                        "IncrementalConverter",
+                        "numbers_in_words_batch",
+                        "cache_policy",
+                        "cache_info",
+                        "configure_cache",
+                        "PersistentCache",
+                        "Locale",
+                        "register_locale",
+                        "Currency",
+                        "register_currency",
+                        "words_to_number",
+                        "profile",
+                        "add_instrumentation_hook",
+                        "remove_instrumentation_hook",
+                        "convert_file_parallel",
+                        "convert_column",
+                        "ConversionServer",
+                        "ConversionClient",
+                        "number_in_words_async",
+                        "number_in_words_from_phrase_async",
+                        "convert_lines_async"]
 
     def test_expected_public_module_members(self):
         for em in self.expected_members:
@@ -94,18 +148,1078 @@ class TestAdditionalTestCases(ut.TestCase):
             ("The rocket travels at 1,965.38kph.", np.NumberParts("1965", "38", "kph.")),
             ("Is the sun more than 10,000,000km away from us?.", np.NumberParts("10000000", suffix="km")),
             ("The pump is 536 deep underground.", np.NumberParts("536")),
-            ("There is 0 chance of fell freezing over!", np.NumberParts("0"))]
+            ("There is 0 chance of fell freezing over!", np.NumberParts("0")),
+            ("See pages 5-10 for details.", np.NumberParts()),
+            ("Tel 555-1234.", np.NumberParts()),
+            ("Model 12a3.", np.NumberParts())]
 
     def test_additional_scenarios(self):
         for scenario in self.full_scenarios:
             outcome = niw.number_in_words_from_phrase(scenario.input_value)
             self.assertEqual(outcome, scenario.expected_value, msg=f"Output incorrect for '{scenario.input_value}'")
 
+    def test_words_that_are_not_numbers(self):
+        for word in ["abc", "", "-", "12a3", "5-10", "1e5", "１２"]:
+            for _ in range(2):  # the second time from the number cache
+                self.assertEqual(niw.number_in_words(word, cached_numbers=True), "number invalid", msg=repr(word))
+            self.assertEqual(niw.number_in_words(word, block_table=True), "number invalid", msg=repr(word))
+            self.assertEqual("".join(niw.iter_number_in_words(word)), "number invalid", msg=repr(word))
+            self.assertEqual(niw.numbers_in_words_batch([word]), ["number invalid"], msg=repr(word))
+            self.assertEqual(niw.IncrementalConverter().number_in_words(word), "number invalid", msg=repr(word))
+        self.assertEqual(niw.number_in_words("0"), "zero")
+
     def test_additional_number_extraction(self):
         for case in self.number_extraction_cases:
             outcome = sp._get_number_parts_from_phrase(case[0])
             self.assertEqual(outcome, case[1], msg=f"Output incorrect for '{case[0]}'")
 
 
+class TestBlockTable(ut.TestCase):
+    def test_block_table_matches_block_rendering(self):
+        table = sp._get_block_table()
+        self.assertEqual(len(table), 1000)
+        for n in range(1000):
+            block = f"{n:03}"
+            self.assertEqual(table[n], sp._get_block_result(block), msg=f"Table entry incorrect for '{block}'")
+
+    def test_block_table_output_matches_default_output(self):
+        for number in ["0", "7", "99", "100", "1001", "-273", "66723107008", "1,965.38", "9" * 42]:
+            self.assertEqual(
+                niw.number_in_words(number, block_table=True),
+                niw.number_in_words(number),
+                msg=f"Output incorrect for '{number}'")
+
+
+class TestBatch(ut.TestCase):
+    def setUp(self):
+        self.numbers: List[Union[str, int]] = [
+            "536", "9121", "0", "-273", "66723107008", "1,965.38", "10,000,000", "1,2", "007", "9" * 42,
+            536, 0, -273, 1000000, 66723107008, -(2**63), 2**64 - 1, 10**41]
+
+    def test_batch_matches_number_in_words(self):
+        outcome = niw.numbers_in_words_batch(self.numbers + self.numbers)
+        expected = [niw.number_in_words(str(n)) for n in self.numbers + self.numbers]
+        self.assertEqual(outcome, expected)
+
+    def test_batch_rejects_other_types(self):
+        for value in [1.5, True, None]:
+            with self.assertRaises(TypeError, msg=f"Expected a TypeError for {value!r}"):
+                niw.numbers_in_words_batch([value])
+
+    def test_equal_values_of_other_types_are_converted_separately(self):
+        numbers = [1, Decimal("1.0"), Fraction(1), "1", Decimal("1.0"), 1]
+        self.assertEqual(niw.numbers_in_words_batch(numbers), [niw.number_in_words(n) for n in numbers])
+        with self.assertRaises(TypeError):
+            niw.numbers_in_words_batch([1, True])
+
+    def test_str_subclasses_are_strings(self):
+        class Text(str):  # e.g. numpy.str_, or the strings of a pandas column
+            pass
+
+        for number in ["536", "1,965.38", "-273", "007"]:
+            expected = niw.number_in_words(number)
+            self.assertEqual(niw.number_in_words(Text(number)), expected)
+            self.assertEqual(niw.numbers_in_words_batch([Text(number)]), [expected])
+            self.assertEqual(niw.IncrementalConverter().number_in_words(Text(number)), expected)
+        self.assertEqual(niw.number_in_words(Text("42"), style="ordinal"), "forty-second")
+
+    @ut.skipUnless(importlib.util.find_spec("numpy"), "NumPy is not installed")
+    def test_batch_from_numpy_arrays(self):
+        import numpy
+
+        ints = [n for n in self.numbers if isinstance(n, int)]
+        expected = [niw.number_in_words(str(n)) for n in ints]
+        signed = [n for n in ints if -(2**63) <= n < 2**63]
+        self.assertEqual(
+            niw.numbers_in_words_batch(numpy.array(signed, dtype=numpy.int64)),
+            [niw.number_in_words(str(n)) for n in signed])
+        unsigned = [n for n in ints if 0 <= n < 2**64]
+        self.assertEqual(
+            niw.numbers_in_words_batch(numpy.array(unsigned, dtype=numpy.uint64)),
+            [niw.number_in_words(str(n)) for n in unsigned])
+        self.assertEqual(niw.numbers_in_words_batch(numpy.array(ints, dtype=object)), expected)
+
+
+class TestCachePolicy(ut.TestCase):
+    def test_number_cache_returns_words(self):
+        for _ in range(2):
+            self.assertEqual(
+                niw.number_in_words("9121", cached_numbers=True), "nine thousand, one hundred and twenty-one")
+
+    def test_caches_have_separate_stores(self):
+        sp.conditional_block_cache.clear()
+        sp.conditional_number_cache.clear()
+        niw.number_in_words("123456", cached_blocks=True, cached_numbers=False)
+        self.assertEqual(len(sp.conditional_block_cache), 2)
+        self.assertEqual(len(sp.conditional_number_cache), 0)
+
+    def test_policy_is_restored_after_call(self):
+        niw.number_in_words("99", cached_blocks=False, cached_numbers=True)
+        self.assertTrue(sp.conditional_block_cache.enabled)
+        self.assertFalse(sp.conditional_number_cache.enabled)
+
+    def test_cache_policy_context(self):
+        with niw.cache_policy(cached_blocks=False, cached_numbers=True):
+            self.assertFalse(sp.conditional_block_cache.enabled)
+            self.assertTrue(sp.conditional_number_cache.enabled)
+        self.assertTrue(sp.conditional_block_cache.enabled)
+        self.assertFalse(sp.conditional_number_cache.enabled)
+
+    def test_policy_does_not_leak_between_threads(self):
+        barrier = threading.Barrier(2)
+        seen: List[bool] = []
+
+        def disable_caching():
+            with niw.cache_policy(cached_blocks=False):
+                barrier.wait()  # the other thread checks its policy while this one has caching disabled
+                barrier.wait()
+
+        def check_caching():
+            barrier.wait()
+            seen.append(sp.conditional_block_cache.enabled)
+            barrier.wait()
+
+        threads = [threading.Thread(target=disable_caching), threading.Thread(target=check_caching)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(seen, [True])
+
+
+class TestCacheConfiguration(ut.TestCase):
+    def setUp(self):
+        self.cache = cc.ConditionalLRUCache(maxsize=4, name="test", stripes=1)
+        self.calls: List[int] = []
+
+        @self.cache
+        def square(n: int) -> int:
+            self.calls.append(n)
+            return n * n
+
+        self.square = square
+
+    def tearDown(self):
+        del cc._caches["test"]
+
+    def test_statistics(self):
+        for n in [1, 2, 1, 1, 3]:
+            self.square(n)
+        info = niw.cache_info()["test"]
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (2, 3, 0, 3))
+        self.assertGreater(info.memory, 0)
+        self.assertEqual(self.calls, [1, 2, 3])
+
+    def test_lru_eviction(self):
+        for n in [1, 2, 3, 4, 1, 5]:
+            self.square(n)
+        self.square(2)  # 2 was the least recently used, so it was evicted to make room for 5
+        self.assertEqual(self.calls, [1, 2, 3, 4, 5, 2])
+        self.assertEqual(niw.cache_info()["test"].evictions, 2)
+
+    def test_lfu_eviction(self):
+        niw.configure_cache("test", policy="lfu")
+        for n in [1, 1, 2, 2, 3, 4, 5]:
+            self.square(n)
+        self.square(3)  # 3 was used least (and longest ago), so it was evicted to make room for 5
+        self.square(1)
+        self.assertEqual(self.calls, [1, 2, 3, 4, 5, 3])
+
+    def test_ttl_expiry(self):
+        niw.configure_cache("test", policy="ttl", ttl=0.05)
+        self.square(1)
+        self.square(1)
+        time.sleep(0.06)
+        self.square(1)
+        self.assertEqual(self.calls, [1, 1])
+
+    def test_maxsize(self):
+        niw.configure_cache("test", maxsize=2)
+        for n in range(10):
+            self.square(n)
+        self.assertEqual(niw.cache_info()["test"].currsize, 2)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            niw.configure_cache("nope", maxsize=10)
+        with self.assertRaises(ValueError):
+            niw.configure_cache("test", policy="mru")
+        with self.assertRaises(ValueError):
+            niw.configure_cache("test", policy="ttl")
+        with self.assertRaises(ValueError):
+            niw.configure_cache("test", maxsize=-1)
+
+    def test_package_caches_are_registered(self):
+        self.assertIn("block", niw.cache_info())
+        self.assertIn("number", niw.cache_info())
+
+
+class TestStreaming(ut.TestCase):
+    def test_convert_lines(self):
+        lines = ["The pump is 536 deep underground.\n", "\n", "Two  spaces -54,343,234.45!\r\n", "-"]
+        self.assertEqual(list(streaming.convert_lines(lines)), [
+            ("The pump is 536 deep underground.", "536", "five hundred and thirty-six"),
+            ("", "", "number invalid"),
+            ("Two  spaces -54,343,234.45!", "-54343234.45",
+             "negative fifty-four million, three hundred and forty-three thousand, "
+             "two hundred and thirty-four point four five"),
+            ("-", "", "number invalid")])
+
+    def test_write_results(self):
+        results = [("a\tb 5", "5", "five"), ("no number", "", "number invalid")]
+
+        output = io.StringIO()
+        self.assertEqual(streaming.write_results(results, output, "tsv", batch_size=1), 2)
+        self.assertEqual(output.getvalue(), "a\\tb 5\t5\tfive\nno number\t\tnumber invalid\n")
+
+        output = io.StringIO()
+        streaming.write_results(results, output, "jsonl")
+        self.assertEqual(
+            [json.loads(line) for line in output.getvalue().splitlines()],
+            [{"line": "a\tb 5", "number": "5", "words": "five"},
+             {"line": "no number", "number": "", "words": "number invalid"}])
+
+
+class TestParallel(ut.TestCase):
+    def setUp(self):
+        with open("example.txt", "r") as fread:
+            lines = fread.read().splitlines(keepends=True)
+        handle, self.file_name = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(handle, "w", newline="") as fwrite:
+            fwrite.writelines((lines + ["\r\n", "no line ending 42"]) * 20)
+        with open(self.file_name, "r") as fread:
+            self.expected = list(streaming.convert_lines(fread))
+
+    def tearDown(self):
+        os.remove(self.file_name)
+
+    def test_parallel_results_are_in_order(self):
+        for workers, use_mmap in [(1, False), (2, False), (2, True)]:
+            outcome = list(niw.convert_file_parallel(self.file_name, workers, chunk_size=100, use_mmap=use_mmap))
+            self.assertEqual(outcome, self.expected, msg=f"Output incorrect for {workers} workers, mmap={use_mmap}")
+
+    def test_ranges_are_line_aligned(self):
+        ranges = parallel._get_line_aligned_ranges(self.file_name, 100)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.file_name))
+        with open(self.file_name, "rb") as fread:
+            data = fread.read()
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+
+
+class TestScanner(ut.TestCase):
+    def test_scan_number_parts(self):
+        phrase = "Pump 536.5m deep, 1,965.38kph, 19,65.38kph, -273 and #65678 or 1,2 at 10,000,000km"
+        outcome = [(phrase[start:end], parts) for (start, end), parts in scanner.scan_number_parts(phrase)]
+        self.assertEqual(outcome, [
+            ("536.5m", np.NumberParts("536", "5", "m")),
+            ("1,965.38kph,", np.NumberParts("1965", "38", "kph,")),
+            ("-273", np.NumberParts("273", negative=True)),
+            ("1,2", np.NumberParts("12")),
+            ("10,000,000km", np.NumberParts("10000000", suffix="km"))])
+
+    def test_scanner_agrees_with_word_parser(self):
+        words = ["536", "536.5m", "-273", "1,965.38kph.", "19,65.38kph", "1,2", "-1234,567", "1.2.3", "1.2,3",
+                 "1.km", "0", "007", "-0.5", "10,000,000.5km", "1,234,5", "1,23,456", "--1", "5-10", "555-1234",
+                 "12a3", "0.x0", "1.5e3", "1,2a3", "٣", "5m²", "-5-"]
+        for word in words:
+            expected = sp._get_number_parts_from_word(word) if sp._is_number_like(word) else np.NumberParts()
+            outcome = [parts for _, parts in scanner.scan_number_parts(word)]
+            self.assertEqual(outcome, [expected] if expected.is_valid else [], msg=f"Output incorrect for '{word}'")
+
+    def test_accepted_words(self):
+        accepted = [
+            ("-1,234.5", np.NumberParts("1234", "5", negative=True)),
+            ("1,2345", np.NumberParts("12345")),  # without decimals, the last group may have any number of digits
+            ("5-", np.NumberParts("5", suffix="-")),
+            ("1.5kg.", np.NumberParts("1", "5", "kg.")),  # the suffix starts after the last digit
+            ("5m²", np.NumberParts("5", suffix="m²"))]
+        for word, expected in accepted:
+            self.assertEqual(sp._get_number_parts_from_word(word), expected, msg=f"Output incorrect for '{word}'")
+            self.assertEqual([parts for _, parts in scanner.scan_number_parts(word)], [expected])
+
+        # Anything but digits, the separator and the decimal point before the suffix isn't part of a number
+        for word in ["5-10", "555-1234", "12a3", "0.x0", "1.5e3", "1,2a3", "-a5", ",123", ".5", "-.5", "٣", "1,23.4"]:
+            self.assertFalse(sp._get_number_parts_from_word(word).is_valid, msg=f"Accepted '{word}'")
+            self.assertEqual(list(scanner.scan_number_parts(word)), [], msg=f"Scanned '{word}'")
+
+    def test_numbers_in_words_from_phrase(self):
+        self.assertEqual(
+            niw.numbers_in_words_from_phrase("I received 23 KGs, and 0 of them -7. 19,65.38kph"),
+            ["twenty-three", "zero", "negative seven"])
+        self.assertEqual(niw.numbers_in_words_from_phrase("No numbers  here #65678"), [])
+
+
+class TestAsync(ut.TestCase):
+    def test_async_functions(self):
+        async def convert():
+            return [
+                await niw.number_in_words_async("9121"),
+                await niw.number_in_words_async("9121", offload=True),
+                await niw.number_in_words_from_phrase_async("We processed 9121 records."),
+                await niw.number_in_words_from_phrase_async("We processed 9121 records.", offload=True)]
+
+        self.assertEqual(asyncio.run(convert()), ["nine thousand, one hundred and twenty-one"] * 4)
+
+    def test_async_numbers_that_are_not_strings(self):
+        async def convert(number):
+            return [await niw.number_in_words_async(number), await niw.number_in_words_async(number, offload=True)]
+
+        for number in (9121, Decimal("9121"), Fraction(9121)):
+            self.assertEqual(asyncio.run(convert(number)), ["nine thousand, one hundred and twenty-one"] * 2)
+        # Offloaded by size, like a string of as many digits
+        large = 10 ** async_api.OFFLOAD_THRESHOLD
+        self.assertEqual(asyncio.run(convert(large)), [niw.number_in_words(large)] * 2)
+        self.assertEqual(async_api._size(large), async_api.OFFLOAD_THRESHOLD + 1)
+
+    def test_offloaded_calls_keep_the_cache_policy(self):
+        async def enabled():
+            with niw.cache_policy(cached_blocks=False):
+                return await async_api._run(lambda: sp.conditional_block_cache.enabled, 0, True, None)
+
+        self.assertFalse(asyncio.run(enabled()))
+
+    def test_convert_lines_async(self):
+        lines = ["The pump is 536 deep underground.\n", "No number here.\n", "-273"]
+
+        async def line_source():
+            for line in lines:
+                yield line
+
+        async def convert(**kwargs):
+            return [result async for result in niw.convert_lines_async(line_source(), **kwargs)]
+
+        expected = list(streaming.convert_lines(lines))
+        self.assertEqual(asyncio.run(convert(batch_size=2)), expected)
+        self.assertEqual(asyncio.run(convert(batch_size=2, offload=True)), expected)
+
+
+class TestScaleNames(ut.TestCase):
+    def test_scale_names_match_value_map(self):
+        for num_of_groups, name in maps.block_num_to_thousands_map.items():
+            self.assertEqual(scale_names.scale_name(num_of_groups), name)
+
+    def test_generated_scale_names(self):
+        expected = {
+            15: "quattuordecillion", 21: "vigintillion", 24: "tresvigintillion", 27: "sesvigintillion",
+            28: "septemvigintillion", 31: "trigintillion", 101: "centillion", 107: "sexcentillion",
+            108: "septencentillion", 1001: "millinillion", 1002: "millimillion", 1000001: "millinillinillion"}
+        for num_of_groups, name in expected.items():
+            self.assertEqual(scale_names.scale_name(num_of_groups), name)
+
+    def test_numbers_beyond_tredecillion(self):
+        self.assertEqual(niw.number_in_words("1" + "0" * 45), "one quattuordecillion")
+        self.assertEqual(niw.number_in_words("-2" + "0" * 302 + "5"), "negative two centillion and five")
+        self.assertEqual(niw.numbers_in_words_batch([10**303]), ["one centillion"])
+
+
+class TestStreamedRendering(ut.TestCase):
+    def test_streamed_output_matches_number_in_words(self):
+        for number in ["0", "-0", "0.5", "7", "-273", "1,965.38", "1000001", "1" * 100 + "." + "1234567890" * 100]:
+            expected = niw.number_in_words(number)
+            self.assertEqual("".join(niw.iter_number_in_words(number, chunk_size=10)), expected)
+            self.assertEqual("".join(niw.iter_number_in_words(number, block_table=False)), expected)
+
+            output = io.StringIO()
+            self.assertEqual(niw.write_number_in_words(number, output), len(expected))
+            self.assertEqual(output.getvalue(), expected)
+
+    def test_chunk_size(self):
+        chunks = list(niw.iter_number_in_words("1." + "7" * 1000, chunk_size=100))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(100 <= len(chunk) < 120 for chunk in chunks[:-1]))
+
+
+class TestNumberParts(ut.TestCase):
+    def test_parts_are_compact(self):
+        parts = sp._get_number_parts_from_word("1,965.38kph")
+        self.assertFalse(hasattr(parts, "__dict__"))
+        self.assertEqual((parts.integer, parts.decimals, parts.suffix), ("1965", "38", "kph"))
+        self.assertEqual("".join(parts.iter_decimals()), "38")
+
+    def test_parts_refer_to_the_word(self):
+        word = "-1,965.38kph"
+        parts = sp._get_number_parts_from_word(word)
+        self.assertIs(parts.source, word)
+        self.assertEqual((parts.integer_start, parts.integer_end, parts.decimals_start, parts.decimals_end),
+                         (1, 6, 7, 9))
+
+    def test_invalid_parts_are_shared(self):
+        for word in ["1.2.3", "1,23,456", "-", "abc"]:
+            self.assertIs(sp._get_number_parts_from_word(word), np.INVALID, msg=f"Output incorrect for '{word}'")
+        self.assertIs(sp._get_number_parts_from_phrase("1 and 2"), np.INVALID)
+        self.assertFalse(np.INVALID.is_valid)
+
+    def test_parts_from_offsets_in_a_phrase(self):
+        parts = np.NumberParts.from_offsets("at 1,000.5km now", 3, 8, 9, 10, separator=",", suffix_end=12)
+        self.assertEqual(parts, np.NumberParts("1000", "5", "km"))
+
+
+class TestLocales(ut.TestCase):
+    def test_locales(self):
+        test_cases = [
+            ("en-GB", "1,234,567.89", "one million, two hundred and thirty-four thousand, five hundred and sixty-seven "
+                                      "point eight nine"),
+            ("en-US", "1,234,567.89", "one million two hundred thirty-four thousand five hundred sixty-seven "
+                                      "point eight nine"),
+            ("en-US", "1005", "one thousand five"),
+            ("en-IN", "12,34,567.89", "twelve lakh thirty-four thousand five hundred and sixty-seven point eight nine"),
+            ("en-IN", "1000005", "ten lakh and five"),
+            ("en-IN", "5,10,00,00,000", "five hundred and ten crore"),
+            ("en-IN", "1234567800000", "one lakh twenty-three thousand four hundred and fifty-six crore seventy-eight "
+                                       "lakh"),
+            ("en-150", "-1.234,5", "negative one thousand, two hundred and thirty-four point five"),
+        ]
+        for locale, number, expected in test_cases:
+            self.assertEqual(niw.number_in_words(number, locale=locale), expected, msg=f"{locale} '{number}'")
+
+    def test_separators_follow_the_locale(self):
+        self.assertEqual(niw.number_in_words_from_phrase("Pay 1,00,000 now", locale="en-IN"), "one lakh")
+        self.assertEqual(niw.number_in_words_from_phrase("Pay 100,000 now", locale="en-IN"), "number invalid")
+        self.assertEqual(niw.number_in_words_from_phrase("Pay 1,234.5 now", locale="en-150"), "number invalid")
+        self.assertEqual(niw.numbers_in_words_from_phrase("1.234,5 or 12,34,567", locale="en-150"),
+                         ["one thousand, two hundred and thirty-four point five"])
+        self.assertEqual(niw.numbers_in_words_from_phrase("1,234 or 12,34,567", locale="en-IN"),
+                         ["one thousand two hundred and thirty-four",
+                          "twelve lakh thirty-four thousand five hundred and sixty-seven"])
+
+    def test_locale_objects(self):
+        self.assertEqual(locales.EN_GB.blocks, sp._get_block_table())
+        custom = niw.Locale("en-XX", separator=" ", decimal_point=",", conjunction=" ", negative="minus")
+        self.assertEqual(niw.number_in_words("-1 000,5", locale=custom), "minus one thousand point five")
+
+        niw.register_locale(custom)
+        try:
+            self.assertEqual(niw.number_in_words("-7", locale="en-XX"), "minus seven")
+        finally:
+            del locales.LOCALES["en-XX"]
+
+        with self.assertRaises(ValueError):
+            niw.number_in_words("7", locale="xx-XX")
+        with self.assertRaises(ValueError):
+            niw.Locale("xx", grouping=(4,))
+
+
+class TestWordsToNumber(ut.TestCase):
+    def test_round_trip(self):
+        numbers = ["1", "7", "10", "19", "100", "101", "1000", "1001", "1005000", "-273", "1965.38", "66723107008",
+                   "-10.05", "1" + "0" * 45, "9" * 100, "1" + "0" * 3003 + "7"]
+        for number in numbers:
+            for locale in ("en-GB", "en-US"):
+                words = niw.number_in_words(number, locale=locale)
+                self.assertEqual(niw.words_to_number(words), number, msg=f"Output incorrect for '{words}'")
+
+    def test_words(self):
+        self.assertEqual(niw.words_to_number("zero"), "0")
+        self.assertEqual(niw.words_to_number("zero point zero five"), "0.05")
+        self.assertEqual(niw.words_to_number("sixty-six billion, seven hundred and twenty-three million"),
+                         "66723000000")
+        self.assertEqual(niw.words_to_number("one quattuordecillion"), "1" + "0" * 45)
+
+    def test_invalid_words(self):
+        for words in ["", "one two", "hundred", "twenty thirty", "one million one billion", "point five",
+                      "one point", "negative", "one hundred hundred", "zero one", "fivety", "one point ten", "7"]:
+            with self.assertRaises(ValueError, msg=f"No error for '{words}'"):
+                niw.words_to_number(words)
+
+
+class TestNativeNumbers(ut.TestCase):
+    def test_ints(self):
+        for number in [0, 7, -273, 1000, 1005000, 10**42 + 1, -(10**300), 10**5000 + 7]:
+            digits = ("-" if number < 0 else "") + sp._get_digits_from_blocks(sp._get_blocks_from_int(number)[0])
+            for locale in ("en-GB", "en-IN"):
+                self.assertEqual(niw.number_in_words(number, locale=locale),
+                                 niw.number_in_words(digits, locale=locale), msg=f"Output incorrect for {digits[:50]}")
+
+    def test_int_blocks(self):
+        for number in [0, 999, 1000, 10**191, 10**192 - 1, 10**192, 10**1000 + 1]:
+            blocks, negative = sp._get_blocks_from_int(number)
+            self.assertEqual(int(sp._get_digits_from_blocks(blocks)), number)
+            self.assertTrue(all(0 <= block < 1000 for block in blocks))
+            self.assertTrue(blocks[0] or number == 0, msg="There should be no leading zero blocks")
+            self.assertFalse(negative)
+
+    def test_decimals_and_fractions(self):
+        test_cases = [
+            (Decimal("1965.38"), "one thousand, nine hundred and sixty-five point three eight"),
+            (Decimal("-1.50"), "negative one point five zero"),
+            (Decimal("1E+3"), "one thousand"),
+            (Fraction(-1234, 8), "negative one hundred and fifty-four point two five"),
+            (Fraction(10, 2), "five"),
+        ]
+        for number, expected in test_cases:
+            self.assertEqual(niw.number_in_words(number), expected, msg=f"Output incorrect for {number!r}")
+
+    def test_unsupported_values(self):
+        for number in [Fraction(1, 3), Decimal("NaN"), Decimal("-Infinity")]:
+            with self.assertRaises(ValueError, msg=f"No error for {number!r}"):
+                niw.number_in_words(number)
+        for number in [1.5, True, None]:
+            with self.assertRaises(TypeError, msg=f"No error for {number!r}"):
+                niw.number_in_words(number)
+
+
+class TestStyles(ut.TestCase):
+    def test_ordinals(self):
+        test_cases = [
+            ("0", "zeroth"), ("1", "first"), ("2", "second"), ("3", "third"), ("5", "fifth"), ("8", "eighth"),
+            ("9", "ninth"), ("11", "eleventh"), ("12", "twelfth"), ("20", "twentieth"), ("21", "twenty-first"),
+            ("100", "one hundredth"), ("101", "one hundred and first"), ("1,000", "one thousandth"),
+            ("1001", "one thousand and first"), ("1000000", "one millionth"), ("-3", "negative third"),
+            ("1234.00", "one thousand, two hundred and thirty-fourth"), (112, "one hundred and twelfth"),
+        ]
+        for number, expected in test_cases:
+            for block_table in (False, True):
+                self.assertEqual(niw.number_in_words(number, block_table=block_table, style="ordinal"), expected,
+                                 msg=f"Output incorrect for {number!r}")
+
+        self.assertEqual(niw.number_in_words("1,00,021", style="ordinal", locale="en-IN"), "one lakh and twenty-first")
+        self.assertEqual(niw.number_in_words("2000", style="ordinal", locale="en-US"), "two thousandth")
+        self.assertEqual(niw.number_in_words_from_phrase("She came 42nd.", style="ordinal"), "forty-second")
+
+    def test_cheques(self):
+        self.assertEqual(niw.number_in_words("54.45", style="cheque"), "fifty-four and 45/100")
+        self.assertEqual(niw.number_in_words("1,234.5", style="cheque"),
+                         "one thousand, two hundred and thirty-four and 50/100")
+        self.assertEqual(niw.number_in_words("0.07", style="cheque"), "zero and 07/100")
+        self.assertEqual(niw.number_in_words(Decimal("12"), style="cheque", currency="USD"),
+                         "twelve and 00/100 dollars")
+        # The conjunction of the locale joins the amount and its minor units too
+        self.assertEqual(niw.number_in_words("101.5", style="cheque", locale="en-US"), "one hundred one 50/100")
+        plus = locales.Locale("plus", conjunction=" plus ")
+        self.assertEqual(niw.number_in_words("101.5", style="cheque", locale=plus), "one hundred plus one plus 50/100")
+
+    def test_currency(self):
+        test_cases = [
+            ("54.45", "ZAR", "fifty-four rand and forty-five cents"),
+            ("1.01", "USD", "one dollar and one cent"),
+            ("1", "GBP", "one pound"),
+            ("2.5", "GBP", "two pounds and fifty pence"),
+            ("0.01", "EUR", "one cent"),
+            ("0", "EUR", "zero euros"),
+            ("-0.00", "EUR", "zero euros"),
+            ("-10.99", "INR", "negative ten rupees and ninety-nine paise"),
+            (Fraction(7, 4), "ZAR", "one rand and seventy-five cents"),
+        ]
+        for number, currency, expected in test_cases:
+            self.assertEqual(niw.number_in_words(number, style="currency", currency=currency), expected,
+                             msg=f"Output incorrect for {number!r} {currency}")
+
+        self.assertEqual(niw.number_in_words_from_phrase("Total: 1,200.50 incl. VAT", style="currency", currency="ZAR"),
+                         "one thousand, two hundred rand and fifty cents")
+        self.assertEqual(niw.number_in_words("1.5", style="currency", currency="USD", locale="en-US"),
+                         "one dollar fifty cents")
+        plus = locales.Locale("plus", conjunction=" plus ")
+        self.assertEqual(niw.number_in_words("101.5", style="currency", currency="USD", locale=plus),
+                         "one hundred plus one dollars plus fifty cents")
+
+    def test_registered_currencies(self):
+        dinar = niw.Currency("KWD", "dinar", "dinars", "fils", "fils", minor_digits=3)
+        self.assertEqual(niw.number_in_words("3.5", style="currency", currency=dinar),
+                         "three dinars and five hundred fils")
+
+        niw.register_currency(dinar)
+        try:
+            self.assertEqual(niw.number_in_words("3.005", style="cheque", currency="KWD"), "three and 005/1000 dinars")
+        finally:
+            del styles.CURRENCIES["KWD"]
+
+        with self.assertRaises(ValueError):
+            niw.register_currency(niw.Currency("XXX", "x", "x", "y", "y", minor_digits=4))
+
+    def test_numbers_that_cant_be_said_in_a_style(self):
+        self.assertEqual(niw.number_in_words("abc", style="ordinal"), "number invalid")
+        self.assertEqual(niw.number_in_words_from_phrase("no number", style="currency", currency="ZAR"),
+                         "number invalid")
+
+        cases = [
+            ("1.5", dict(style="ordinal")),
+            ("1.005", dict(style="currency", currency="ZAR")),
+            ("-5", dict(style="cheque")),
+            ("5", dict(style="ordinal", currency="ZAR")),
+            ("5", dict(style="currency")),
+            ("5", dict(style="currency", currency="XXX")),
+            ("5", dict(style="roman")),
+        ]
+        for number, kwargs in cases:
+            with self.assertRaises(ValueError, msg=f"No error for {number} {kwargs}"):
+                niw.number_in_words(number, **kwargs)
+
+    def test_cardinal_is_unchanged(self):
+        for number in ["0.5", "1,234.56", "-7", "9" * 50]:
+            self.assertEqual(niw.number_in_words(number, style="cardinal"), niw.number_in_words(number))
+
+
+class TestIncrementalConverter(ut.TestCase):
+    def test_matches_number_in_words(self):
+        for locale in (None, "en-US", "en-IN"):
+            for block_table in (True, False):
+                converter = niw.IncrementalConverter(block_table=block_table, locale=locale)
+                numbers = [998, 999, 1000, 1001, "1002", -1003, 0, "0.5", "-12.50", "abc", "12kg", 10**29 - 1, 10**29,
+                           str(10**29 + 1), 10**29 + 10**15, Decimal("1.5"), 7, "1" + "0" * 45, 1000]
+                for number in numbers:
+                    self.assertEqual(converter.number_in_words(number),
+                                     niw.number_in_words(number, block_table=block_table, locale=locale),
+                                     msg=f"Output incorrect for {number!r} in {locale}")
+
+    def test_only_changed_blocks_are_rendered(self):
+        converter = niw.IncrementalConverter()
+        start = 10**29 + 123
+        self.assertEqual(converter.number_in_words(start), niw.number_in_words(start))
+        self.assertEqual(converter.blocks_rendered, 10)
+
+        # The blocks of strings and ints are never mixed up, so the first tick of each is rendered in full
+        for numbers in (map(str, range(start + 1, start + 101)), range(start + 101, start + 201)):
+            for number in numbers:
+                self.assertEqual(converter.number_in_words(number), niw.number_in_words(number))
+        self.assertEqual(converter.blocks_rendered, 10 + 2 * (10 + 99))
+
+        self.assertEqual(converter.number_in_words(start + 200 + 10**6), niw.number_in_words(start + 200 + 10**6))
+        self.assertEqual(converter.blocks_rendered, 10 + 2 * (10 + 99) + 1)
+
+        converter.reset()
+        converter.number_in_words(start)
+        self.assertEqual(converter.blocks_rendered, 10 + 2 * (10 + 99) + 1 + 10)
+
+    def test_phrases(self):
+        converter = niw.IncrementalConverter()
+        self.assertEqual(converter.number_in_words_from_phrase("We processed 9121 records."),
+                         "nine thousand, one hundred and twenty-one")
+        self.assertEqual(converter.number_in_words_from_phrase("We processed 9,122 records."),
+                         "nine thousand, one hundred and twenty-two")
+        self.assertEqual(converter.number_in_words_from_phrase("We processed no records."), "number invalid")
+
+
+class TestBenchmarkSuite(ut.TestCase):
+    def test_corpora(self):
+        self.assertTrue(all(len(n) == 6 for n in benchmark_suite.digits_corpus(6, 50)))
+        self.assertTrue(all(len(n.split(" ")) == 20 for n in benchmark_suite.phrase_corpus(20, 50)))
+        self.assertEqual(benchmark_suite.zipf_corpus(1.1, 50), benchmark_suite.zipf_corpus(1.1, 50))
+        self.assertLess(len(set(benchmark_suite.hit_rate_corpus(0.9, 1000))), 300)
+
+    def test_run_and_compare(self):
+        cases = [case for case in benchmark_suite.build_cases() if case.name.startswith(("digits/3/", "stage/"))]
+        results = benchmark_suite.run_suite(cases, size=5, repeats=2)
+        self.assertEqual([result.name for result in results], [case.name for case in cases])
+        self.assertTrue(all(result.minimum <= result.median for result in results))
+
+        saved = json.loads(json.dumps(benchmark_suite.to_json(results)))
+        self.assertFalse(any(c.regressed for c in benchmark_suite.compare(results, saved)))
+
+        slower = [result._replace(median=result.median * 2) for result in results]
+        comparisons = benchmark_suite.compare(slower, saved, threshold=0.5)
+        self.assertTrue(all(c.regressed for c in comparisons))
+        self.assertEqual(len(comparisons), len(cases))
+
+
+class TestFuzz(ut.TestCase):
+    def test_every_engine_agrees_with_the_reference(self):
+        report = fuzz.run_fuzz(cases=500, seed=0)
+        self.assertEqual(report.failures, [], msg="".join(
+            f"\n{f.engine}: {f.shrunk.text!r} is {f.actual!r}, not {f.expected!r}" for f in report.failures))
+        self.assertEqual(set(report.stats), {"reference"} | {engine.name for engine in fuzz.build_engines()})
+        self.assertTrue(all(stats.cases > 0 for stats in report.stats.values()))
+
+    def test_cases_are_repeatable(self):
+        for seed in (0, 1):
+            rng_1, rng_2 = fuzz.random.Random(seed), fuzz.random.Random(seed)
+            self.assertEqual([fuzz.generate_case(rng_1) for _ in range(100)],
+                             [fuzz.generate_case(rng_2) for _ in range(100)])
+
+    def test_failures_are_shrunk(self):
+        def convert(case):
+            return None if case.phrase else fuzz.reference(case).replace("seven", "eight")
+
+        broken = fuzz.Engine("broken", convert)
+        report = fuzz.run_fuzz(cases=200, seed=0, engines=[broken])
+        self.assertEqual(len(report.failures), 1)
+        failure = report.failures[0]
+        self.assertEqual(failure.shrunk, fuzz.Case("7", False))
+        self.assertEqual((failure.expected, failure.actual), ("seven", "eight"))
+
+        raising = fuzz.Engine("raising", lambda case: niw.number_in_words(case.text) if "5" not in case.text else 1/0)
+        failure = fuzz.run_fuzz(cases=200, seed=0, engines=[raising]).failures[0]
+        self.assertEqual(failure.shrunk.text, "5")
+        self.assertTrue(failure.actual.startswith("ZeroDivisionError"))
+
+    def test_reference_failures_are_shrunk(self):
+        original = fuzz.reference
+
+        def reference(case):
+            return original(case) if "5" not in case.text else {}[case.text]
+
+        with ut.mock.patch.object(fuzz, "reference", reference):
+            report = fuzz.run_fuzz(cases=200, seed=0, engines=[])
+        self.assertEqual(len(report.failures), 1)
+        failure = report.failures[0]
+        self.assertEqual((failure.engine, failure.shrunk.text), (fuzz.REFERENCE, "5"))
+        self.assertTrue(failure.actual.startswith("KeyError"))
+        self.assertEqual(report.stats[fuzz.REFERENCE].cases, 200)
+
+    def test_reference_is_independent_of_the_engines(self):
+        cases = [
+            ("1,000,001.05kg", "one million and one point zero five"), ("-0001", "negative  and one"),
+            ("101000", "one hundred and one thousand"), ("1,2", "twelve"), ("0.5", "zero"),
+            ("5-10", "number invalid"), ("1,23.5", "number invalid"), ("１２", "number invalid"),
+            ("a 1 b 2", "number invalid"), ("-", "number invalid")]
+        # Neither the parser nor the renderer of the package is used
+        with ut.mock.patch.object(sp, "_get_number_parts_from_word", side_effect=AssertionError), \
+                ut.mock.patch.object(locales.Locale, "render_block", side_effect=AssertionError):
+            for text, words in cases:
+                self.assertEqual(fuzz.reference(fuzz.Case(text, " " in text)), words, msg=text)
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(fuzz.main(["--cases", "50", "--engines", "int", "block_table"]), 0)
+        self.assertIn("block_table", output.getvalue())
+
+
+class TestInstrumentation(ut.TestCase):
+    def test_profile(self):
+        output = io.StringIO()
+        with niw.profile(output) as p:
+            niw.number_in_words_from_phrase("We processed 9,121 records in 1.5s")
+            niw.number_in_words_from_phrase("We processed 9,121 records.")
+            niw.number_in_words("1,23,4")
+
+        self.assertEqual(p.counters, {"tokens": 10, "rejected": 1, "numbers": 2, "blocks": 2})
+        self.assertEqual({stage: stats.calls for stage, stats in p.stages.items()},
+                         {"tokenize": 2, "validate": 3, "render": 2, "join": 2})
+        self.assertTrue(all(stats.seconds >= 0 for stats in p.stages.values()))
+        self.assertIn("validate", output.getvalue())
+
+    def test_hooks(self):
+        events = []
+        hook = lambda name, value: events.append(name)  # noqa: E731
+        niw.add_instrumentation_hook(hook)
+        try:
+            niw.number_in_words("7")
+        finally:
+            niw.remove_instrumentation_hook(hook)
+        niw.number_in_words("8")
+        self.assertEqual(events, ["validate", "numbers", "blocks", "render", "join"])
+
+    def test_every_path_is_instrumented(self):
+        with niw.cache_policy(cached_numbers=False), niw.profile(output=None) as p:
+            niw.number_in_words(7)  # looked up in the table as it is joined
+            niw.number_in_words("1234", block_table=True)
+            "".join(niw.iter_number_in_words("1234567"))  # streamed, so never joined
+            niw.numbers_in_words_batch(["1234", 5, 5])
+
+        self.assertEqual(p.counters, {"tokens": 0, "rejected": 0, "numbers": 5, "blocks": 9})
+        self.assertEqual({stage: stats.calls for stage, stats in p.stages.items()},
+                         {"tokenize": 0, "validate": 3, "render": 7, "join": 4})
+
+    def test_originals_are_restored(self):
+        names = ("_get_number_parts_from_phrase", "_get_number_parts_from_word", "_get_block_result",
+                 "_get_block_results", "_iter_number_words", "_get_number_in_words_from_parts",
+                 "_get_number_in_words_from_blocks")
+        functions = [getattr(sp, name) for name in names]
+        with niw.profile(output=None):
+            self.assertIsNot(sp._get_block_result, functions[2])
+            with niw.profile(output=None):
+                pass
+            self.assertIsNot(sp._get_block_result, functions[2])
+        self.assertEqual(functions, [getattr(sp, name) for name in names])
+
+
+class TestStartup(ut.TestCase):
+    heavy_modules = ("asyncio", "multiprocessing", "concurrent.futures", "decimal", "fractions")
+
+    def setUp(self):
+        self.snapshot = locales._snapshot
+
+    def tearDown(self):
+        locales._snapshot = self.snapshot
+
+    def _imported_after(self, code: str) -> List[str]:
+        code = f"""import sys\n{code}\nprint(" ".join(m for m in {self.heavy_modules} if m in sys.modules))"""
+        return subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, universal_newlines=True,
+                              check=True).stdout.split()
+
+    def test_import_is_lazy(self):
+        self.assertEqual(self._imported_after("import numbers_in_words"), [])
+        self.assertEqual(self._imported_after(
+            "import numbers_in_words as niw; niw.number_in_words('1234'); niw.number_in_words_from_phrase('1 km')"),
+            [])
+        self.assertIn("asyncio", self._imported_after("from numbers_in_words import number_in_words_async"))
+
+    def test_import_is_lean(self):
+        # typing, importlib and threading are most of what importing the package used to cost
+        code = "import sys; import numbers_in_words; print(' '.join(m for m in ('typing', 'importlib', 'threading') " \
+               "if m in sys.modules))"
+        self.assertEqual(subprocess.run([sys.executable, "-S", "-c", code], stdout=subprocess.PIPE,
+                                        universal_newlines=True, check=True).stdout.split(), [])
+
+        # The command line tool only imports the streaming module for --stream
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "main.py", "-f", "example.txt"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True,
+                                check=True).stderr
+        self.assertIn("numbers_in_words._numbers_in_words_modules.string_processing", stderr)
+        self.assertNotIn("numbers_in_words._numbers_in_words_modules.streaming", stderr)
+        self.assertEqual(main.OUTPUT_FORMATS, tuple(streaming.FORMATTERS))
+
+    def test_lazy_members(self):
+        for name in niw.__all__:
+            self.assertTrue(callable(getattr(niw, name)), msg=name)
+        with self.assertRaises(AttributeError):
+            niw.number_in_word  # noqa: B018
+
+    def test_caches_are_built_on_first_use(self):
+        cache = cc.ConditionalLRUCache(name="test_startup")
+        try:
+            self.assertIsInstance(cache._stripes[0], cc._UnbuiltStore)
+            square = cache(lambda n: n * n)
+            self.assertEqual((square(3), square(3)), (9, 9))
+            self.assertEqual(len(cache._stripes), 16)
+            self.assertEqual((cache.info().hits, cache.info().misses, len(cache)), (1, 1, 1))
+        finally:
+            del cc._caches["test_startup"]
+
+    def test_table_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables.snapshot")
+            locales.write_table_snapshot(path, [locales.Locale("test", conjunction=" plus ")])
+            locales._snapshot = locales._read_table_snapshot(path)
+            blocks = locales._snapshot[(" plus ", ", ")]
+
+            self.assertIs(locales.Locale("same", conjunction=" plus ").blocks, blocks)
+            self.assertEqual(blocks[101], ("one hundred plus one", ", "))
+            self.assertEqual(niw.number_in_words("1001", locale=locales.Locale("same", conjunction=" plus ")),
+                             "one thousand plus one")
+
+            with open(path, "wb") as f:
+                f.write(b"not a snapshot")
+            self.assertEqual(locales._read_table_snapshot(path), {})
+            self.assertEqual(locales._read_table_snapshot(os.path.join(directory, "missing")), {})
+
+            # Snapshots of the right version that aren't laid out like a snapshot are no snapshot at all
+            table = locales.EN_GB.blocks
+            for tables in (None, [], {" and ": table}, {(" and ", ", "): table[:999]}, {(" and ", ", "): list(table)},
+                           {(" and ", ", "): table[:999] + (("one", 1),)}, {(" and ", ", "): table, ("", ""): "x"}):
+                with open(path, "wb") as f:
+                    locales.marshal.dump({"version": locales.SNAPSHOT_VERSION, "tables": tables}, f)
+                self.assertEqual(locales._read_table_snapshot(path), {}, msg=repr(tables)[:50])
+            with open(path, "wb") as f:
+                locales.marshal.dump({"version": locales.SNAPSHOT_VERSION}, f)
+            self.assertEqual(locales._read_table_snapshot(path), {})
+
+        # A snapshot that doesn't match the way blocks are rendered is not used
+        locales._snapshot = {(" plus ", ", "): (("wrong", ", "),) * 1000}
+        self.assertEqual(locales.Locale("same", conjunction=" plus ").blocks[7], ("seven", " plus "))
+
+
+class TestPersistentCache(ut.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_words_as_number_in_words(self):
+        numbers = ["1234", "-5.50", "12,34,567", 42, Decimal("0.125"), Fraction(3, 8), "abc", "1234"]
+        with niw.PersistentCache(self.path) as cache:
+            for locale in (None, "en-US", "en-IN"):
+                expected = [niw.number_in_words(n, locale=locale) for n in numbers]
+                self.assertEqual(cache.numbers_in_words(numbers, locale), expected)
+                self.assertEqual(cache.numbers_in_words(numbers, locale), expected)
+                self.assertEqual(cache.number_in_words("1234", locale), expected[0])
+            self.assertEqual((cache.hits, cache.misses), (24, 21))
+
+    def test_persists_across_instances(self):
+        with niw.PersistentCache(self.path) as cache:
+            cache.numbers_in_words([str(n) for n in range(100)])
+        with niw.PersistentCache(self.path) as cache:
+            self.assertEqual(len(cache), 100)
+            self.assertEqual(cache.number_in_words("99"), "ninety-nine")  # looked up with IN
+            self.assertEqual(cache.numbers_in_words(["1", "2"] * 20), ["one", "two"] * 20)  # every result is read
+            self.assertEqual((cache.hits, cache.misses), (3, 0))
+
+    def test_eviction(self):
+        with niw.PersistentCache(self.path, maxsize=3) as cache:
+            cache.numbers_in_words(["1", "2"])
+            cache.numbers_in_words(["3", "4"])
+            self.assertEqual(len(cache), 3)
+            cache.numbers_in_words(["2", "3", "4"])
+            self.assertEqual(cache.hits, 3)
+            cache.numbers_in_words(["1"])
+            self.assertEqual(cache.misses, 5)
+
+            cache.clear()
+            self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+        with self.assertRaises(ValueError):
+            niw.PersistentCache(self.path, maxsize=0)
+
+    def test_versioned_key(self):
+        version = persistent_cache.CACHE_VERSION
+        with niw.PersistentCache(self.path) as cache:
+            cache.number_in_words("7")
+            persistent_cache.CACHE_VERSION = version + 1
+            try:
+                cache.number_in_words("7")
+            finally:
+                persistent_cache.CACHE_VERSION = version
+            cache.number_in_words("7", locale=locales.Locale("x", negative="minus"))
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 3, 3))
+
+    def test_warm(self):
+        corpus = os.path.join(self.directory.name, "corpus.txt")
+        with open(corpus, "w") as f:
+            f.write("1\n2\n\n2\n1001\n")
+        with niw.PersistentCache(self.path) as cache:
+            self.assertEqual(cache.warm(corpus), 3)
+            self.assertEqual(cache.warm(corpus), 0)
+            self.assertEqual(cache.number_in_words("1001"), "one thousand and one")
+
+
+class TestConvertColumn(ut.TestCase):
+    source = 'id,total,note\n1,"1,234.50",a\n2,-7,"two\nlines"\n3,,c\n4,abc,d\n5,12kg,e\n6,1234.50\n'
+
+    def _convert(self, column="total", **kwargs) -> str:
+        output = io.StringIO()
+        self.assertEqual(niw.convert_column(io.StringIO(self.source), output, column, **kwargs), 6)
+        return output.getvalue()
+
+    def test_csv(self):
+        self.assertEqual(self._convert(batch_size=4).split("\n"), [
+            "id,total,note,total_words",
+            '1,"1,234.50",a,"one thousand, two hundred and thirty-four point five zero"',
+            '2,-7,"two',
+            'lines",negative seven',
+            "3,,c,",
+            "4,abc,d,number invalid",
+            "5,12kg,e,twelve",
+            '6,1234.50,,"one thousand, two hundred and thirty-four point five zero"',
+            ""])
+
+    def test_options(self):
+        self.assertEqual(self._convert("id", words_column="words", locale="en-US", cache_size=2).split("\n")[:2],
+                         ["id,total,note,words", '1,"1,234.50",a,one'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            source, destination = os.path.join(directory, "in.csv"), os.path.join(directory, "out.csv")
+            with open(source, "w", newline="") as f:
+                f.write(self.source)
+            self.assertEqual(niw.convert_column(source, destination, "total"), 6)
+            with open(destination, newline="") as f:
+                self.assertEqual(f.read(), self._convert())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self._convert("amount")
+        with self.assertRaises(ValueError):
+            self._convert(words_column="note")
+        with self.assertRaises(ValueError):
+            self._convert(file_format="xlsx")
+        with self.assertRaises(ValueError):
+            niw.convert_column(io.StringIO(""), io.StringIO(), "total")
+
+    def test_values(self):
+        convert = columns._get_converter(locales.EN_GB, cache_size=100)
+        self.assertEqual(convert([None, 7, 2.675, 1e20, float("nan"), Decimal("2.50"), True]), [
+            None, "seven", "two point six seven five", "one hundred quintillion", "number invalid",
+            "two point five zero", "number invalid"])
+
+    def test_cache_evicts_the_least_recently_used_value(self):
+        convert = columns._get_converter(locales.EN_GB, cache_size=2)
+        with ut.mock.patch.object(columns, "_get_words", wraps=columns._get_words) as get_words:
+            self.assertEqual(convert(["1", "2", "1", "3", "1", "2"]), ["one", "two", "one", "three", "one", "two"])
+        # "1" is used again before "3" comes in, so "2" is evicted instead, and only "2" is converted again
+        self.assertEqual([c.args[0] for c in get_words.call_args_list], ["1", "2", "3", "2"])
+
+    @ut.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow isn't installed")
+    def test_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as directory:
+            source, destination = os.path.join(directory, "in.parquet"), os.path.join(directory, "out.parquet")
+            pq.write_table(pa.table({"id": [1, 2, 3], "total": [1234.5, None, -7.0]}), source)
+            self.assertEqual(niw.convert_column(source, destination, "total", batch_size=2), 3)
+            self.assertEqual(pq.read_table(destination).column("total_words").to_pylist(), [
+                "one thousand, two hundred and thirty-four point five", None, "negative seven point zero"])
+
+
+class TestConversionServer(ut.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = niw.ConversionServer()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.directory.cleanup()
+
+    def _start(self, address):
+        asyncio.run_coroutine_threadsafe(self.server.start(address), self.loop).result()
+        return niw.ConversionClient(self.server.address, pipeline_depth=100)
+
+    def test_requests(self):
+        for address in (os.path.join(self.directory.name, "niw.sock"), ("127.0.0.1", 0)):
+            with self._start(address) as client:
+                self.assertEqual(client.number_in_words("1234"), niw.number_in_words("1234"))
+                self.assertEqual(client.number_in_words_from_phrase("It is 12 km"), "twelve")
+                self.assertEqual(client.number_in_words("1234", locale="en-US"),
+                                 "one thousand two hundred thirty-four")
+                with self.assertRaises(ValueError):
+                    client.number_in_words("1", locale="xx")
+                with self.assertRaises(ValueError):
+                    client.number_in_words("1\n2")
+                self.assertEqual(client.number_in_words("5"), "five")  # the connection is still in step
+                self.assertEqual(client._idle.qsize(), 1)
+            asyncio.run_coroutine_threadsafe(self.server.stop(), self.loop).result()
+
+    def test_batches(self):
+        with self._start(("127.0.0.1", 0)) as client:
+            numbers = [str(n) for n in range(1000)]
+            self.assertEqual(client.batch(numbers), [niw.number_in_words(n) for n in numbers])
+            self.assertEqual(client.batch(["a 1", "b"], phrases=True), ["one", "number invalid"])
+        # The requests that were sent together were answered together
+        self.assertEqual(self.server.requests, 1002)
+        self.assertLess(self.server.batches, 100)
+        self.assertEqual(niw.cache_info()["server"].misses, 1002)
+
+    def test_cache_is_registered_while_started(self):
+        self.assertNotIn("server", niw.cache_info())
+        with self._start(("127.0.0.1", 0)) as client:
+            client.number_in_words("1")
+        self.assertEqual(niw.cache_info()["server"].misses, 1)
+
+        other = niw.ConversionServer()  # isn't started, so the started server stays registered
+        self.assertEqual(niw.cache_info()["server"].misses, 1)
+        asyncio.run_coroutine_threadsafe(other.stop(), self.loop).result()
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self.loop).result()
+        self.assertNotIn("server", niw.cache_info())
+
+    def test_parse_address(self):
+        self.assertEqual(server.parse_address("8000"), ("127.0.0.1", 8000))
+        self.assertEqual(server.parse_address("0.0.0.0:8000"), ("0.0.0.0", 8000))
+        self.assertEqual(server.parse_address("/tmp/niw.sock"), "/tmp/niw.sock")
+        self.assertEqual(server.parse_address("[::1]:8000"), ("::1", 8000))
+        self.assertEqual(server.parse_address("::1:8000"), ("::1", 8000))
+        self.assertEqual(server.parse_address("::1"), "::1")
+
+    @ut.skipUnless(socket.has_ipv6, "IPv6 is not supported")
+    def test_ipv6(self):
+        try:
+            client = self._start(("::1", 0))
+        except OSError as e:  # e.g. no IPv6 loopback interface
+            self.skipTest(str(e))
+        with client:
+            self.assertEqual(self.server.address, ("::1", self.server.address[1]))
+            self.assertEqual(client.number_in_words("1234"), niw.number_in_words("1234"))
+
+
 if __name__ == "__main__":
     ut.main()